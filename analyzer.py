@@ -1,6 +1,9 @@
+import numpy as np
 import pandas as pd
 import os
-from datetime import datetime
+from collections import Counter
+
+from src import clock, budget, keyword_matcher, history_store, rollups, excel_export
 
 
 def analyze_discussion_trend(data_list):
@@ -21,11 +24,19 @@ def analyze_discussion_trend(data_list):
         print(f"Sort failed: {e}")
         df_sorted = df
         
-    # 추가 분석: 감성 분석 및 키워드 요약
-    df_analyzed = analyze_sentiment(df_sorted)
+    # 추가 분석: 감성 분석 및 키워드 요약 (기본: 컬럼 단위 일괄 계산, STOCKBOT_ANALYSIS=rowwise 로 기존 방식)
+    if COLUMNAR_ANALYSIS:
+        df_analyzed = analyze_sentiment_columnar(df_sorted)
+    else:
+        df_analyzed = analyze_sentiment(df_sorted)
     
-    # 추가 분석: 과거 이력 비교
-    df_final = compare_with_history(df_analyzed)
+    # 추가 분석: 과거 이력 비교 (--budget 마감 임박 시 생략)
+    if budget.allow('history_compare'):
+        df_final = compare_with_history(df_analyzed)
+    else:
+        budget.skip('history_compare')
+        df_final = df_analyzed
+        df_final['is_last_captured'] = False
     
     # [사용자 요청] 컬럼 순서 및 한글 이름 변경
     # 순서: 현재가, 현재 외국인 비중, 어제 종가, 어제 외국인 비중, 어제 대비 등락률, 당일 게시글 수, 당일 게시물 주요 내용 요약 (3문장 이내), 감정 분석, top keyword, 연속 등록
@@ -74,42 +85,120 @@ def analyze_discussion_trend(data_list):
     return df_sorted
 
 
-def save_data(df, filename_prefix="trending_stocks"):
+# 엑셀은 기본적으로 실행 후 별도 단계(src/excel_export.py reports)에서 생성, STOCKBOT_EXCEL=inline 이면 즉시 생성
+INLINE_EXCEL = os.environ.get('STOCKBOT_EXCEL', 'deferred') == 'inline'
+
+
+def save_data(df, filename_prefix="trending_stocks", run_at=None):
     """
-    DataFrame을 CSV 및 Excel 파일로 저장합니다.
-    파일명에 타임스탬프를 포함합니다.
+    DataFrame을 이력 저장소(data/history, 거래일별 파일)에 저장합니다.
+    run_at: 실행 시각 (KST, 기본값 현재 KST). Excel 파일명(타임스탬프 포함)은 미리 정해 두고,
+    파일 자체는 excel_export가 이력에서 나중에 만듭니다 (saved_files['excel_deferred'] = True).
     저장된 파일명의 딕셔너리를 반환합니다.
     """
     if df.empty:
         print("No data to save.")
+        # 통과 종목이 없는 실행도 실행일은 주간/월간 집계에 남김 (없으면 연속 등장 일수가 그날을 건너뜀)
+        try:
+            rollups.update(df, run_at or clock.kst_now())
+        except Exception as e:
+            print(f"Error updating rollups: {e}")
         return {}
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = clock.now().strftime("%Y%m%d_%H%M%S")
     base_name = f"{filename_prefix}_{timestamp}"
-    csv_filename = f"{base_name}.csv"
     xlsx_filename = f"{base_name}.xlsx"
     
     saved_files = {}
 
-    # 1. Save CSV
+    # 1. History Store (기존 타임스탬프 CSV 대체)
     try:
-        df.to_csv(csv_filename, index=False, encoding='utf-8-sig')
-        print(f"\nData saved to CSV: {os.path.abspath(csv_filename)}")
-        saved_files['csv'] = csv_filename
+        run_at = run_at or clock.kst_now()
+        written = history_store.append_run(df, run_at)
+        saved_files['history'] = history_store.partition_path(run_at.strftime('%Y-%m-%d'))
+        print(f"\nData appended to history: {saved_files['history']} ({written} rows)")
+        # 주간/월간 집계 갱신 (같은 실행이 이미 저장된 경우 written=0 -> 중복 집계 안 함)
+        if written:
+            rollups.update(df, run_at)
     except Exception as e:
-        print(f"Error saving to CSV: {e}")
+        print(f"Error saving to history: {e}")
+        return saved_files
 
-    # 2. Save Excel
-    try:
-        df.to_excel(xlsx_filename, index=False, engine='openpyxl')
-        print(f"Data saved to Excel: {os.path.abspath(xlsx_filename)}")
-        saved_files['excel'] = xlsx_filename
-    except Exception as e:
-        print(f"Error saving to Excel: {e}")
+    # 2. Excel (deferred)
+    saved_files['excel'] = xlsx_filename
+    saved_files['excel_deferred'] = not INLINE_EXCEL
+    if INLINE_EXCEL:
+        try:
+            excel_export.export_run(run_at, xlsx_filename)
+        except Exception as e:
+            print(f"Error saving to Excel: {e}")
+            del saved_files['excel']
+    else:
+        print(f"Excel export deferred: {xlsx_filename}")
         
     return saved_files
 
 
+# --- Deep Dive Post Scoring (V7.5) ---
+PREDICTION_KEYWORDS = ['목표', '예상', '전망', '된다', '간다', '분석', '이유']
+PREDICTION_MATCHER = keyword_matcher.KeywordMatcher(PREDICTION_KEYWORDS)
+PREDICTION_BONUS = 2000
+SHORT_BODY_FACTOR = 0.2
+SUMMARY_TOP_POSTS = 4 # 게시물_요약에 쓰이는 상위 글 수
+
+
+def post_base_score(p):
+    """본문 없이 계산 가능한 기본 점수 (Views + Likes*30)."""
+    try:
+        views = int(p.get('views', '0').replace(',', ''))
+    except:
+        views = 0
+    try:
+        likes = int(p.get('likes', '0'))
+    except:
+        likes = 0
+    
+    return views + (likes * 30)
+
+
+def post_score_upper_bound(p):
+    """
+    본문을 가져오기 전 알 수 있는 최대 점수.
+    본문은 점수를 깎거나(짧은 글 x0.2) 최대 PREDICTION_BONUS만큼 올릴 수 있으므로 base + bonus 가 상한.
+    """
+    return post_base_score(p) + PREDICTION_BONUS
+
+
+def score_post(p):
+    """게시글 가중 점수 (기본 점수 + 본문 길이 페널티 + 예측 키워드 보너스)."""
+    # 1. Base Score (Views + Likes*30)
+    score = post_base_score(p)
+
+    # 2. Body Analysis (Length Penalty & Prediction Bonus)
+    body = p.get('body', '')
+    if body:
+        # Penalty: Short Content (<= 2 lines or < 50 chars)
+        if len(body) < 50 or len(body.split('\n')) <= 2:
+            score *= SHORT_BODY_FACTOR
+        
+        # Bonus: Prediction Keywords
+        if PREDICTION_MATCHER.contains_any(body):
+            score += PREDICTION_BONUS
+    # No body (scrape failed or skipped by lazy deep dive) -> keeps base score
+
+    return score
+
+
+# --- Title Sentiment Lexicon (키워드 추가 시 여기만 수정) ---
+# KeywordMatcher는 키워드가 AUTOMATON_MIN_KEYWORDS(40) 이상일 때만 Aho–Corasick 오토마톤을 씁니다.
+# 현재 어휘(20개, 예측 키워드 7개)는 더 빠른 substring 검사 경로로 계산되며, 오토마톤은 어휘가 커질 때를 위한 것입니다.
+SENTIMENT_LEXICON = {
+    'positive': ['상승', '급등', '호재', '대박', '매수', '가즈아', '축하', '수익', '기대', '찬티'],
+    'negative': ['하락', '폭락', '악재', '손절', '매도', '망', '개미털기', '설거지', '폭망', '안티'],
+}
+SENTIMENT_MATCHER = keyword_matcher.KeywordMatcher(SENTIMENT_LEXICON)
+
+
 def analyze_sentiment(df):
     """
     게시글 제목을 기반으로 긍정/부정 비율과 주요 키워드를 분석합니다.
@@ -117,14 +206,14 @@ def analyze_sentiment(df):
     if 'all_posts_titles' not in df.columns:
         return df
 
-    positive_keywords = ['상승', '급등', '호재', '대박', '매수', '가즈아', '축하', '수익', '기대', '찬티']
-    negative_keywords = ['하락', '폭락', '악재', '손절', '매도', '망', '개미털기', '설거지', '폭망', '안티']
+    # 전체 종목의 제목을 한 번에 채점 (종목별 긍정/부정 키워드 수)
+    sentiment_scores = SENTIMENT_MATCHER.score_batch(df['all_posts_titles'])
     
     sentiment_summaries = []
     keyword_summaries = []
     posts_summaries = [] 
 
-    for idx, row in df.iterrows():
+    for (idx, row), (label_counts, _) in zip(df.iterrows(), sentiment_scores):
         titles = row.get('all_posts_titles', [])
         latest_posts = row.get('latest_posts', [])
         
@@ -133,40 +222,11 @@ def analyze_sentiment(df):
         if isinstance(latest_posts, list) and latest_posts:
             # Score Calculation
             for p in latest_posts:
-                # 1. Base Score (Views + Likes*30)
-                try:
-                    views = int(p.get('views', '0').replace(',', ''))
-                except:
-                    views = 0
-                try:
-                    likes = int(p.get('likes', '0'))
-                except:
-                    likes = 0
-                
-                score = views + (likes * 30)
-
-                # 2. Body Analysis (Length Penalty & Prediction Bonus)
-                body = p.get('body', '')
-                if body:
-                    # Penalty: Short Content (<= 2 lines or < 50 chars)
-                    if len(body) < 50 or len(body.split('\n')) <= 2:
-                        score *= 0.2
-                    
-                    # Bonus: Prediction Keywords
-                    prediction_keywords = ['목표', '예상', '전망', '된다', '간다', '분석', '이유']
-                    if any(kw in body for kw in prediction_keywords):
-                        score += 2000
-                else: 
-                     # No body (maybe scrape failed or not top 10) -> Default penalty or neutral?
-                     # If these are top 10 recommended, they should have body. 
-                     # If not in top 10, they keep base score.
-                     pass
-
-                p['score'] = score
+                p['score'] = score_post(p)
             
             # Sort by Score Descending
             sorted_posts = sorted(latest_posts, key=lambda x: x.get('score', 0), reverse=True)
-            top_posts = sorted_posts[:4] # Top 4 Weighted Summaries
+            top_posts = sorted_posts[:SUMMARY_TOP_POSTS] # Top 4 Weighted Summaries
             summary_text = " / ".join([p.get('title', '') for p in top_posts])
             
         posts_summaries.append(summary_text)
@@ -176,19 +236,12 @@ def analyze_sentiment(df):
             keyword_summaries.append("")
             continue
             
-        pos_count = 0
-        neg_count = 0
+        # 1. 감성 점수 (제목별로 포함된 키워드 수)
+        pos_count = label_counts['positive']
+        neg_count = label_counts['negative']
         word_counts = {}
         
         for title in titles:
-            # 1. 감성 점수 계산
-            for kw in positive_keywords:
-                if kw in title:
-                    pos_count += 1
-            for kw in negative_keywords:
-                if kw in title:
-                    neg_count += 1
-            
             # 2. 단어 빈도 계산 (간단하게 공백 기준 분리 - 조사 처리는 생략)
             words = title.split()
             for word in words:
@@ -220,71 +273,137 @@ def analyze_sentiment(df):
     return df
 
 
+# --- Columnar Analysis Path ---
+COLUMNAR_ANALYSIS = os.environ.get('STOCKBOT_ANALYSIS', 'columnar') != 'rowwise'
+_INT_PATTERN = r'\s*[+-]?\d+\s*'
+
+
+def _int_column(values, strip_commas=False):
+    """int(v) for each value (0 where int() would fail), like post_base_score."""
+    s = pd.Series(values, dtype=object)
+    is_str = s.map(lambda v: isinstance(v, str))
+    text = s.where(is_str, '').astype(str)
+    if strip_commas:
+        text = text.str.replace(',', '', regex=False)
+    ok = is_str & text.str.fullmatch(_INT_PATTERN)
+    out = pd.Series(0, index=s.index, dtype='int64')
+    out[ok] = text[ok].astype('int64')
+    return out
+
+
+def flatten_posts(df):
+    """
+    latest_posts를 한 번에 펼쳐 게시글 단위 배열로 만듭니다.
+    Returns DataFrame[stock, pos, title, views, likes, body_len, body_lines, prediction, post].
+    """
+    stock_idx, pos, posts = [], [], []
+    for i, latest_posts in enumerate(df['latest_posts'] if 'latest_posts' in df.columns else []):
+        if isinstance(latest_posts, list):
+            stock_idx.extend([i] * len(latest_posts))
+            pos.extend(range(len(latest_posts)))
+            posts.extend(latest_posts)
+
+    bodies = [p.get('body', '') or '' for p in posts]
+    likes = [p.get('likes', '0') for p in posts]
+    return pd.DataFrame({
+        'stock': np.array(stock_idx, dtype='int64'),
+        'pos': np.array(pos, dtype='int64'),
+        'title': [p.get('title', '') for p in posts],
+        # views는 문자열만 허용 (post_base_score와 같은 규칙)
+        'views': _int_column([p.get('views', '0') for p in posts], strip_commas=True).to_numpy(),
+        'likes': np.array([v if isinstance(v, int) else 0 for v in likes], dtype='int64')
+                 + _int_column(likes).to_numpy(),
+        'body_len': np.array([len(b) for b in bodies], dtype='int64'),
+        'body_lines': np.array([b.count('\n') + 1 for b in bodies], dtype='int64'),
+        'prediction': np.array([PREDICTION_MATCHER.contains_any(b) for b in bodies], dtype=bool),
+        'post': posts,
+    })
+
+
+def _word_top_keywords(title_lists, top=3):
+    """종목별 제목 단어 빈도 Top 3 (동률은 먼저 나온 단어 우선, 1글자 제외)."""
+    summaries = []
+    for titles in title_lists:
+        # 공백으로 이어 붙여 한 번에 split/count (제목별 split과 같은 단어열, 첫 등장 순서 유지)
+        counts = Counter(" ".join(titles).split())
+        words = sorted(((w, c) for w, c in counts.items() if len(w) > 1), key=lambda x: x[1], reverse=True)
+        summaries.append(", ".join(w for w, _ in words[:top]))
+    return summaries
+
+
+def analyze_sentiment_columnar(df):
+    """
+    analyze_sentiment와 같은 결과(sentiment, top_keywords, posts_summary)를 컬럼 단위로 계산합니다.
+    게시글/제목을 한 번씩 펼친 뒤 종목별 집계는 groupby로 처리합니다.
+    """
+    if 'all_posts_titles' not in df.columns:
+        return df
+    n = len(df)
+
+    # 1. Deep Dive 게시글 점수 -> 종목별 Top 4 제목 (동점은 원래 순서 유지)
+    posts = flatten_posts(df)
+    base = posts['views'].to_numpy() + posts['likes'].to_numpy() * 30
+    has_body = posts['body_len'].to_numpy() > 0
+    short = has_body & ((posts['body_len'].to_numpy() < 50) | (posts['body_lines'].to_numpy() <= 2))
+    score = np.where(short, base * SHORT_BODY_FACTOR, base) + np.where(has_body & posts['prediction'].to_numpy(),
+                                                                       PREDICTION_BONUS, 0)
+    for p, value, is_float in zip(posts['post'], score, short):
+        p['score'] = float(value) if is_float else int(value)
+    posts['score'] = score
+    top = posts.sort_values(['stock', 'score', 'pos'], ascending=[True, False, True], kind='mergesort')
+    top = top.groupby('stock').head(SUMMARY_TOP_POSTS).groupby('stock', sort=False)['title'].agg(' / '.join)
+    posts_summaries = [top.get(i, '') for i in range(n)]
+
+    # 2. 제목 감성 (종목별 긍정/부정 키워드 수) + 단어 빈도
+    title_lists = [t if isinstance(t, list) else [] for t in df['all_posts_titles']]
+    scores = SENTIMENT_MATCHER.score_batch(title_lists)
+    pos_count = np.array([c['positive'] for c, _ in scores], dtype='int64')
+    neg_count = np.array([c['negative'] for c, _ in scores], dtype='int64')
+    total = pos_count + neg_count
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pos_pct = np.floor(pos_count / total * 100)
+        neg_pct = np.floor(neg_count / total * 100)
+    sentiment_summaries = [
+        "Neutral" if not titles or t == 0
+        else f"Positive ({int(pp)}%)" if p > q
+        else f"Negative ({int(np_)}%)" if q > p
+        else "Mixed"
+        for titles, t, p, q, pp, np_ in zip(title_lists, total, pos_count, neg_count, pos_pct, neg_pct)
+    ]
+
+    keyword_summaries = _word_top_keywords(title_lists)
+
+    df['sentiment'] = sentiment_summaries
+    df['top_keywords'] = keyword_summaries
+    df['posts_summary'] = posts_summaries
+
+    return df
+
+
 def compare_with_history(current_df):
     """
-    가장 최근에 저장된 CSV 파일과 비교하여 '연속 포착(is_consecutive)' 여부를 확인합니다.
+    직전 실행 결과와 비교하여 '연속 포착(is_last_captured)' 여부를 확인합니다.
+    (User Request: "어제 마지막 데이터"와 비교 -> 이전 거래일의 마지막 실행, 없으면 오늘 앞선 실행)
+    주의: 이 함수는 save_data 호출 '전'에 불려야 함.
     """
     try:
-        # 현재 디렉토리의 csv 파일 목록 검색
-        files = [f for f in os.listdir('.') if f.startswith('trending_stocks_') and f.endswith('.csv')]
-        if not files:
+        today_str = clock.kst_now().strftime('%Y-%m-%d')
+        history_df = history_store.previous_run(today_str, columns=['code'])
+        if history_df.empty:
             current_df['is_last_captured'] = False
             return current_df
-            
-        # 가장 최신 파일 찾기 (User Request: "어제 마지막 데이터"와 비교)
-        # 파일명 형식: trending_stocks_YYYYMMDD_HHMMSS.csv
-        # 날짜 파싱 -> 오늘 날짜와 비교 -> 어제(또는 그 이전) 중 가장 최신 파일 선택
-        
-        files.sort(reverse=True) # 최신순 정렬
-        
-        today_str = datetime.now().strftime("%Y%m%d")
-        target_file = None
-        
-        for f in files:
-            # 파일명에서 날짜 추출 (trending_stocks_20240501_120000.csv)
-            try:
-                parts = f.split('_') # ['trending', 'stocks', '20240501', '120000.csv']
-                if len(parts) >= 3:
-                    file_date = parts[2]
-                    # 오늘 날짜보다 작은 것 중 가장 먼저 나오는 것 (정렬되어 있으므로)
-                    if file_date < today_str:
-                        target_file = f
-                        break
-            except:
-                continue
-        
-        # 만약 어제 데이터가 없으면? (오늘 첫 실행인데 어제 데이터 없으면 그냥 가장 최신 파일이라도 비교? 아니면 False?)
-        # 사용자 의도: "새로운 데이터와 비교" -> 보통 연속성은 "바로 직전"보다는 "이전 사이클"의 의미가 강함.
-        # 일단 어제 데이터 없으면, 전체 중 두번째 파일(오늘 이전 실행)이라도 가져옴.
-        if not target_file and len(files) > 1:
-             # 오늘 실행된 것 중 이전에 실행된 것
-             # 현재 생성될 파일은 아직 리스트에 없으므로, files[0]이 바로 직전 파일임.
-             target_file = files[0]
-
-        if not target_file:
-             current_df['is_last_captured'] = False
-             return current_df
-             
-        last_file = target_file
-        # 주의: 이 함수는 save_to_csv 호출 '전'에 불려야 함.
-        
-        print(f"Comparing with history file: {last_file}")
-        try:
-             history_df = pd.read_csv(last_file)
-        except:
-             # 빈 파일 등 에러 처리
-             history_df = pd.DataFrame(columns=['code'])
-        
+
+        print(f"Comparing with history run: {history_df['run_at'].iloc[0]}")
         # 과거에 존재했던 종목 코드 집합
-        prev_codes = set(history_df['code'].astype(str))
-        
-        # 현재 코드와 비교
-        current_df['is_last_captured'] = current_df['code'].astype(str).isin(prev_codes)
-        
+        prev_codes = set(history_df['code'])
+
+        # 현재 코드와 비교 (코드는 6자리 문자열로 맞춤)
+        current_df['is_last_captured'] = current_df['code'].astype(str).str.zfill(6).isin(prev_codes)
+
     except Exception as e:
         print(f"Error checking history: {e}")
         current_df['is_last_captured'] = False
-        
+
     return current_df
 
 def filter_promising_stocks(df, criteria):
@@ -0,0 +1,97 @@
+"""
+Naver 페이지 파서 벤치마크.
+
+저장된 HTML(fixtures/naver/*.html, EUC-KR 원본 bytes)을 페이지 종류별로
+각 백엔드(bs4 = 기존 방식, lxml, targeted)로 파싱해 1페이지당 시간과
+메모리 할당량(tracemalloc peak / 총 할당)을 비교하고, 결과가 bs4와 같은지 확인합니다.
+
+    python bench_parsers.py
+    python bench_parsers.py --dir my_saved_pages --number 50
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+
+from src import naver_parsers
+
+PAGE_TYPES = [
+    # (파일명, 파서)
+    ('sise_quant.html', lambda markup, backend: naver_parsers.parse_sise_quant(markup, 'KOSPI', backend=backend)),
+    ('frgn.html', lambda markup, backend: naver_parsers.parse_frgn(markup, backend=backend)),
+    ('board.html', lambda markup, backend: naver_parsers.parse_board_list(markup, backend=backend)),
+    ('board_read.html', lambda markup, backend: naver_parsers.parse_board_read(markup, backend=backend)),
+    ('research_read.html', lambda markup, backend: naver_parsers.parse_research_read(markup, backend=backend)),
+]
+
+
+def measure_allocations(fn):
+    """Returns (peak_bytes, total_allocated_bytes) for one call of fn."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(s.size_diff for s in after.compare_to(before, 'filename') if s.size_diff > 0)
+    return peak, allocated
+
+
+def bench_page(path, parse, number):
+    with open(path, 'rb') as f:
+        markup = f.read()
+
+    reference = parse(markup, 'bs4')
+    results = []
+    for backend in naver_parsers.BACKENDS:
+        effective = naver_parsers._resolve_backend(backend)
+        seconds = min(timeit.repeat(lambda: parse(markup, backend), number=number, repeat=3)) / number
+        peak, allocated = measure_allocations(lambda: parse(markup, backend))
+        results.append({
+            'backend': backend if effective == backend else f"{backend}->{effective}",
+            'ms': seconds * 1000,
+            'peak_kb': peak / 1024,
+            'alloc_kb': allocated / 1024,
+            'same': parse(markup, backend) == reference,
+        })
+    return len(markup), results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Naver HTML parser backends")
+    parser.add_argument('--dir', default=os.path.join('fixtures', 'naver'), help="HTML fixture directory")
+    parser.add_argument('--number', type=int, default=20, help="parses per timing repeat")
+    args = parser.parse_args(argv)
+
+    if not naver_parsers.HAS_LXML:
+        print("[Bench] lxml not installed: 'lxml' backend falls back to 'targeted'")
+
+    mismatches = 0
+    for filename, parse in PAGE_TYPES:
+        path = os.path.join(args.dir, filename)
+        if not os.path.exists(path):
+            print(f"[Bench] skip {filename} (not found in {args.dir})")
+            continue
+
+        size, results = bench_page(path, parse, args.number)
+        base = results[0]
+        print(f"\n{filename} ({size / 1024:.1f} KB)")
+        print(f"  {'backend':<16}{'ms/page':>10}{'speedup':>9}{'peak KB':>10}{'alloc KB':>10}  same")
+        for r in results:
+            speedup = base['ms'] / r['ms'] if r['ms'] else 0
+            print(f"  {r['backend']:<16}{r['ms']:>10.2f}{speedup:>8.1f}x{r['peak_kb']:>10.0f}{r['alloc_kb']:>10.0f}  {'OK' if r['same'] else 'DIFF'}")
+            if not r['same']:
+                mismatches += 1
+
+    if mismatches:
+        print(f"\n❌ {mismatches} backend result(s) differ from bs4")
+        return 1
+    print("\n✅ All backends return the same results as bs4")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
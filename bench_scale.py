@@ -0,0 +1,197 @@
+"""
+수집 파이프라인 규모 벤치마크 (합성 Naver stand-in 서버 대상).
+
+시장당 종목 수(--stocks 20,100,200)마다 src/naver_standin.py 서버를 띄우고,
+별도 프로세스에서 실제 파이프라인(get_top_trending_stocks -> collect_market_stocks -> analyze_discussion_trend)을
+실행해 wall time, 초당 요청 수, 요청 지연 p50/p99, 최대 RSS를 보고합니다.
+(텔레그램/리서치/파일 저장은 실행하지 않음)
+
+    python bench_scale.py --stocks 20,100,200 --latency-ms 80
+    python bench_scale.py --stocks 200 --latency-ms 300 --slow-rate 0.05 --error-rate 0.02
+    python bench_scale.py --json bench_result.json                # 결과 저장
+    python bench_scale.py --baseline bench_result.json            # 이전 결과 대비 회귀 검사 (exit 1)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+DEFAULT_NOW = "2025-12-26T14:30" # 게시글/임계값 기준 시각 (KST)
+RESULT_PREFIX = "BENCH_RESULT "
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def run_pipeline(args):
+    """Child process: runs the collection pipeline against STOCKBOT_NAVER_BASE and prints one result line."""
+    import resource
+    import threading
+    from datetime import datetime
+
+    from src import clock, http_client, rate_governor
+    import scraper
+    import analyzer
+
+    # 로컬 시간 = KST 로 고정 (stand-in 서버와 같은 기준 시각)
+    now_kst = datetime.fromisoformat(args.now)
+    clock.pin(now_kst - clock.KST_OFFSET, local_offset=clock.KST_OFFSET)
+    rate_governor.GOVERNOR.enabled = args.rate_limit
+
+    events = []
+    events_lock = threading.Lock()
+
+    def on_attempt(event):
+        with events_lock:
+            events.append(event)
+
+    http_client.add_hook(on_attempt)
+
+    started = time.perf_counter()
+    all_data = []
+    for market in ['KOSPI', 'KOSDAQ']:
+        stocks = scraper.get_top_trending_stocks(market, limit=max(30, args.run_stocks))
+        all_data.extend(scraper.collect_market_stocks(stocks[:args.run_stocks], args.threshold, set(),
+                                                      workers=args.workers, count_mode=args.board_count_mode,
+                                                      cursor_store=None, prune_margin=args.prune_margin))
+    if all_data:
+        analyzer.analyze_discussion_trend(all_data)
+    wall = time.perf_counter() - started
+
+    latencies = [e['elapsed'] * 1000 for e in events]
+    result = {
+        'stocks_per_market': args.run_stocks,
+        'kept': len(all_data),
+        'wall_s': round(wall, 3),
+        'requests': len(events),
+        'rps': round(len(events) / wall, 1) if wall else 0,
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'errors': sum(1 for e in events if e['error'] or (e['status'] or 0) >= 400),
+        'mbytes': round(sum(e['bytes'] for e in events) / 1e6, 2),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1), # Linux: KB
+    }
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+def start_standin(args, stocks):
+    cmd = [sys.executable, os.path.join('src', 'naver_standin.py'), '--port', '0', '--stocks', str(stocks),
+           '--posts-per-hour', str(args.posts_per_hour), '--posts-skew', str(args.posts_skew),
+           '--latency-ms', str(args.latency_ms), '--slow-rate', str(args.slow_rate),
+           '--error-rate', str(args.error_rate), '--now', args.now]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    if 'http://' not in line:
+        proc.kill()
+        raise RuntimeError(f"Stand-in server failed to start: {line!r}")
+    return proc, line.strip().split()[-1]
+
+
+def run_scale(args, stocks):
+    server, base_url = start_standin(args, stocks)
+    try:
+        cmd = [sys.executable, __file__, '--run-stocks', str(stocks), '--workers', str(args.workers),
+               '--threshold', str(args.threshold), '--prune-margin', str(args.prune_margin), '--now', args.now]
+        if args.rate_limit:
+            cmd.append('--rate-limit')
+        if args.board_count_mode:
+            cmd.append('--board-count-mode')
+        env = dict(os.environ, STOCKBOT_NAVER_BASE=base_url, STOCKBOT_HTTP_MODE='live', PYTHONUNBUFFERED='1')
+        child = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    finally:
+        server.terminate()
+        server.wait()
+
+    for line in reversed(child.stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"Pipeline run failed (exit {child.returncode}):\n{child.stderr[-2000:]}")
+
+
+def compare(results, baseline, tolerance):
+    """Prints deltas against a saved run. Returns the number of regressions."""
+    previous = {r['stocks_per_market']: r for r in baseline.get('results', [])}
+    regressions = 0
+    for r in results:
+        old = previous.get(r['stocks_per_market'])
+        if not old:
+            continue
+        for metric in ('wall_s', 'p99_ms', 'peak_rss_mb', 'requests'):
+            if not old.get(metric):
+                continue
+            change = (r[metric] - old[metric]) / old[metric]
+            flag = ""
+            if change > tolerance:
+                flag = "  <-- REGRESSION"
+                regressions += 1
+            print(f"  {r['stocks_per_market']:>5} stocks {metric:<12} {old[metric]:>10} -> {r[metric]:>10} ({change:+.0%}){flag}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scale benchmark for the scraper collection pipeline")
+    parser.add_argument('--stocks', default='20,100,200', help="comma separated stocks-per-market scales")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threshold', type=int, default=40)
+    parser.add_argument('--prune-margin', type=float, default=3.0)
+    parser.add_argument('--board-count-mode', action='store_true')
+    parser.add_argument('--rate-limit', action='store_true', help="keep the adaptive rate governor on (production pacing)")
+    parser.add_argument('--posts-per-hour', type=float, default=10.0)
+    parser.add_argument('--posts-skew', type=float, default=1.0)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--now', default=DEFAULT_NOW, help="pinned KST time for the run and the stand-in")
+    parser.add_argument('--json', help="write results to this file")
+    parser.add_argument('--baseline', help="compare against a previous --json result")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed relative regression (default 0.2)")
+    parser.add_argument('--run-stocks', type=int, help=argparse.SUPPRESS) # child process mode
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    if args.run_stocks:
+        run_pipeline(args)
+        return 0
+
+    scales = [int(s) for s in args.stocks.split(',') if s.strip()]
+    print(f"[Bench] workers={args.workers} latency={args.latency_ms}ms slow={args.slow_rate} "
+          f"errors={args.error_rate} rate_limit={'on' if args.rate_limit else 'off'}")
+    print(f"  {'stocks':>6}{'kept':>6}{'wall s':>9}{'reqs':>7}{'req/s':>8}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'errors':>8}{'MB':>7}{'RSS MB':>8}")
+
+    results = []
+    for stocks in scales:
+        r = run_scale(args, stocks)
+        results.append(r)
+        print(f"  {r['stocks_per_market']:>6}{r['kept']:>6}{r['wall_s']:>9.2f}{r['requests']:>7}{r['rps']:>8.1f}"
+              f"{r['p50_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['errors']:>8}{r['mbytes']:>7.1f}{r['peak_rss_mb']:>8.1f}",
+              flush=True)
+
+    report = {'config': {k: v for k, v in vars(args).items() if k not in ('json', 'baseline', 'run_stocks')},
+              'results': results}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"[Bench] Results saved to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"[Bench] Compared with {args.baseline}:")
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -35,6 +35,81 @@ type Stock = {
 const REPO_OWNER = "hoonnamkoong";
 const REPO_NAME = "stockbot";
 const WORKFLOW_ID = "scraper.yml";
+const DATA_BASE = `https://raw.githubusercontent.com/${REPO_OWNER}/${REPO_NAME}/main/data`;
+
+// --- Published Payloads (data/manifest.json, src/publish.py) ---
+// pub/*.json.gz 는 파일명에 내용 해시가 있어 바뀌지 않으므로 해시 기준으로 localStorage에 보관하고,
+// 종목 데이터는 직전 스냅샷을 갖고 있으면 delta만 받아 조립합니다.
+type PublishedEntry = {
+    hash: string;
+    path: string;
+    bytes: number;
+    gz_bytes: number;
+    delta?: { from: string; path: string; gz_bytes: number };
+};
+type Manifest = { version: number; generated_at: string; files: Record<string, PublishedEntry> };
+type StockDelta = { order: string[]; patch: Record<string, Partial<Stock>>; add: Record<string, Stock> };
+
+const PUB_CACHE_PREFIX = 'pub:';
+
+const readPublishedCache = (hash: string) => {
+    try {
+        const text = localStorage.getItem(PUB_CACHE_PREFIX + hash);
+        return text ? JSON.parse(text) : null;
+    } catch (e) {
+        return null;
+    }
+};
+
+const writePublishedCache = (hash: string, data: any) => {
+    try {
+        localStorage.setItem(PUB_CACHE_PREFIX + hash, JSON.stringify(data));
+    } catch (e) { console.error(e); } // quota exceeded -> 캐시 없이 사용
+};
+
+// manifest가 참조하지 않는 해시는 삭제 (delta 기준이 될 수 있는 from 해시는 유지)
+const prunePublishedCache = (manifest: Manifest) => {
+    const live = new Set<string>();
+    Object.values(manifest.files).forEach(e => {
+        live.add(PUB_CACHE_PREFIX + e.hash);
+        if (e.delta) live.add(PUB_CACHE_PREFIX + e.delta.from);
+    });
+    for (let i = localStorage.length - 1; i >= 0; i--) {
+        const key = localStorage.key(i);
+        if (key?.startsWith(PUB_CACHE_PREFIX) && !live.has(key)) localStorage.removeItem(key);
+    }
+};
+
+const fetchGzipJson = async (path: string) => {
+    const res = await fetch(`${DATA_BASE}/${path}`); // immutable -> 브라우저 캐시 허용 (?t= 없음)
+    if (!res.ok || !res.body) throw new Error(`${path}: ${res.status} ${res.statusText}`);
+    const text = await new Response(res.body.pipeThrough(new DecompressionStream('gzip'))).text();
+    return JSON.parse(text);
+};
+
+const applyStockDelta = (base: Stock[], delta: StockDelta): Stock[] => {
+    const byCode = new Map(base.map(s => [s.code, s]));
+    return delta.order.map(code => delta.add[code] ?? { ...byCode.get(code)!, ...(delta.patch[code] || {}) });
+};
+
+// Returns [data, source] or null if `name` is not published.
+const loadPublished = async (manifest: Manifest, name: string): Promise<[any, string] | null> => {
+    const entry = manifest.files[name];
+    if (!entry) return null;
+    const cached = readPublishedCache(entry.hash);
+    if (cached) return [cached, 'cache'];
+    if (entry.delta) {
+        const base = readPublishedCache(entry.delta.from);
+        if (base) {
+            const data = applyStockDelta(base, await fetchGzipJson(entry.delta.path));
+            writePublishedCache(entry.hash, data);
+            return [data, `delta ${entry.delta.gz_bytes}B`];
+        }
+    }
+    const data = await fetchGzipJson(entry.path);
+    writePublishedCache(entry.hash, data);
+    return [data, `${entry.gz_bytes}B gz`];
+};
 
 export default function Home() {
     const [opened, { toggle }] = useDisclosure();
@@ -61,6 +136,7 @@ export default function Home() {
     const [researchModalOpened, { open: openResearchModal, close: closeResearchModal }] = useDisclosure(false);
     const [selectedResearchCategory, setSelectedResearchCategory] = useState<string | null>(null);
     const [pdfItem, setPdfItem] = useState<any>(null);
+    const [researchDetails, setResearchDetails] = useState<Record<string, any>>({}); // report id -> detail
     const [reports, setReports] = useState<any[]>([]);
 
     // [User Request V7.3] Time Slot Filtering
@@ -95,14 +171,38 @@ export default function Home() {
                 filename = `stocks_${slot}.json`;
             }
 
-            const stockUrl = `https://raw.githubusercontent.com/${REPO_OWNER}/${REPO_NAME}/main/data/${filename}?t=${timeMap}`;
+            // Manifest (없거나 gzip 해제를 지원하지 않는 브라우저면 기존 JSON 파일 사용)
+            let manifest: Manifest | null = null;
+            if (typeof DecompressionStream !== 'undefined') {
+                try {
+                    const resManifest = await fetch(`${DATA_BASE}/manifest.json?t=${timeMap}`, { cache: 'no-store' });
+                    if (resManifest.ok) manifest = await resManifest.json();
+                } catch (e) { console.error(e); }
+            }
+            const tryPublished = async (name: string) => {
+                if (!manifest) return null;
+                try {
+                    const result = await loadPublished(manifest, name);
+                    if (result) addSystemLog(`📦 ${name}: ${result[1]}`);
+                    return result ? result[0] : null;
+                } catch (e: any) {
+                    addSystemLog(`⚠️ ${name}: ${e.message} (fallback to JSON)`);
+                    return null;
+                }
+            };
+
+            const publishedStocks = await tryPublished(filename.replace('.json', ''));
+            const stockUrl = `${DATA_BASE}/${filename}?t=${timeMap}`;
 
-            addSystemLog(`📡 Fetching Stocks: ${stockUrl}`);
+            if (!publishedStocks) addSystemLog(`📡 Fetching Stocks: ${stockUrl}`);
 
-            const resStocks = await fetch(stockUrl, { cache: 'no-store' });
-            addSystemLog(`📩 Stocks Status: ${resStocks.status} ${resStocks.statusText}`);
+            const resStocks = publishedStocks ? null : await fetch(stockUrl, { cache: 'no-store' });
+            if (resStocks) addSystemLog(`📩 Stocks Status: ${resStocks.status} ${resStocks.statusText}`);
 
-            if (resStocks.ok) {
+            if (publishedStocks) {
+                addSystemLog(`✅ Stocks Loaded: ${publishedStocks.length} items`);
+                setStocks(publishedStocks);
+            } else if (resStocks && resStocks.ok) {
                 const data = await resStocks.json();
                 addSystemLog(`✅ Stocks Loaded: ${data.length} items`);
                 setStocks(data);
@@ -111,14 +211,19 @@ export default function Home() {
                     alert(`해당 시간대(${slot})의 데이터가 아직 없습니다.`);
                     setTimeSlot('latest'); // Revert logic handled by effect? No, manual revert safest.
                 }
-                const text = await resStocks.text();
+                const text = resStocks ? await resStocks.text() : '';
                 addSystemLog(`❌ Stocks Fetch Failed: ${text.slice(0, 100)}`);
             }
 
             // Fetch Research (Always latest for now, or match slot?) 
             // Keep latest for research as it's daily.
-            const resResearch = await fetch(`https://raw.githubusercontent.com/${REPO_OWNER}/${REPO_NAME}/main/data/latest_research.json?t=${timeMap}`, { cache: 'no-store' });
-            if (resResearch.ok) {
+            // 인덱스(제목/링크)만 받고, 본문 요약/PDF 분석은 항목을 열 때 상세 파일로 받음
+            const publishedResearch = await tryPublished('research_index');
+            const resResearch = publishedResearch ? null : await fetch(`${DATA_BASE}/research/index.json?t=${timeMap}`, { cache: 'no-store' });
+            if (publishedResearch) {
+                setResearch(publishedResearch);
+                addSystemLog(`✅ Research Loaded`);
+            } else if (resResearch && resResearch.ok) {
                 const data = await resResearch.json();
                 setResearch(data);
                 addSystemLog(`✅ Research Loaded`);
@@ -126,10 +231,19 @@ export default function Home() {
 
             // Fetch Status (Timestamp)
             try {
-                const resStatus = await fetch(`https://raw.githubusercontent.com/${REPO_OWNER}/${REPO_NAME}/main/data/status.json?t=${timeMap}`, { cache: 'no-store' });
-                if (resStatus.ok) {
-                    const statusData = await resStatus.json();
+                const publishedStatus = await tryPublished('status');
+                const resStatus = publishedStatus ? null : await fetch(`${DATA_BASE}/status.json?t=${timeMap}`, { cache: 'no-store' });
+                if (publishedStatus || (resStatus && resStatus.ok)) {
+                    const statusData = publishedStatus || await resStatus!.json();
                     setLastUpdated(statusData.last_updated);
+                    // Run telemetry (per-stage duration / requests)
+                    if (statusData.run?.stages) {
+                        const stages = Object.entries(statusData.run.stages as Record<string, any>)
+                            .sort((a, b) => b[1].wall_seconds - a[1].wall_seconds)
+                            .map(([name, s]) => `${name} ${s.wall_seconds.toFixed(1)}s/${s.requests}req`)
+                            .join(', ');
+                        addSystemLog(`⏱️ Last Run: ${statusData.run.total_seconds.toFixed(1)}s, ${statusData.run.requests} requests (${stages})`);
+                    }
                 } else {
                     setLastUpdated(new Date().toLocaleTimeString()); // Fallback
                 }
@@ -139,13 +253,16 @@ export default function Home() {
 
             // Fetch Reports Index
             try {
-                const resReports = await fetch(`https://raw.githubusercontent.com/${REPO_OWNER}/${REPO_NAME}/main/data/reports.json?t=${timeMap}`, { cache: 'no-store' });
-                if (resReports.ok) {
-                    const data = await resReports.json();
+                const publishedReports = await tryPublished('reports');
+                const resReports = publishedReports ? null : await fetch(`${DATA_BASE}/reports.json?t=${timeMap}`, { cache: 'no-store' });
+                if (publishedReports || (resReports && resReports.ok)) {
+                    const data = publishedReports || await resReports!.json();
                     setReports(data.slice(0, 5)); // Top 5
                 }
             } catch (e) { console.error(e); }
 
+            if (manifest) prunePublishedCache(manifest);
+
         } catch (e: any) {
             console.error(e);
             addSystemLog(`❌ CRITICAL ERROR: ${e.message}`);
@@ -276,6 +393,29 @@ export default function Home() {
         openResearchModal();
     };
 
+    // Research item detail (data/research/items/<date>/<id>.json, ?v= 는 내용 해시라 바뀔 때만 새로 받음)
+    const loadResearchDetail = async (item: any) => {
+        if (!item.detail) return item; // legacy payload (본문 포함)
+        if (researchDetails[item.id]) return researchDetails[item.id];
+        try {
+            const res = await fetch(`${DATA_BASE}/${item.detail}?v=${item.v}`);
+            if (!res.ok) throw new Error(`${res.status} ${res.statusText}`);
+            const detail = { ...item, ...(await res.json()) };
+            setResearchDetails(prev => ({ ...prev, [item.id]: detail }));
+            return detail;
+        } catch (e: any) {
+            addSystemLog(`❌ Research detail failed (${item.id}): ${e.message}`);
+            return item;
+        }
+    };
+
+    const openPdfAnalysis = async (item: any) => {
+        setPdfItem(await loadResearchDetail(item));
+    };
+
+    // 상세를 받은 항목은 상세(본문 요약/PDF 분석 포함), 아니면 인덱스 항목
+    const researchItem = (item: any) => researchDetails[item.id] || item;
+
     // Helper for Sort Header
     const ThSort = ({ children, sortKey }: { children: React.ReactNode, sortKey: string }) => {
         const active = sortConfig.key === sortKey;
@@ -648,18 +788,22 @@ export default function Home() {
                                             {/* Tags */}
                                             <Group gap={6} mb="sm">
                                                 <Badge color="gray" size="xs">{item.date}</Badge>
-                                                {item.pdf_analysis?.opinion && item.pdf_analysis.opinion !== 'N/A' && (
-                                                    <Badge size="xs" color={item.pdf_analysis.opinion === 'BUY' ? 'red' : 'orange'}>
-                                                        {item.pdf_analysis.opinion}
+                                                {researchItem(item).pdf_analysis?.opinion && researchItem(item).pdf_analysis.opinion !== 'N/A' && (
+                                                    <Badge size="xs" color={researchItem(item).pdf_analysis.opinion === 'BUY' ? 'red' : 'orange'}>
+                                                        {researchItem(item).pdf_analysis.opinion}
                                                     </Badge>
                                                 )}
                                             </Group>
 
                                             {/* Summary */}
                                             <Paper bg="gray.1" p="xs" radius="sm" mb="sm">
-                                                <Text size="xs" c="dimmed" lineClamp={4}>
-                                                    {item.body_summary || "요약 내용이 없습니다."}
-                                                </Text>
+                                                {item.detail && item.has_body && !researchDetails[item.id] ? (
+                                                    <Button variant="subtle" size="compact-xs" onClick={() => loadResearchDetail(item)}>요약 보기</Button>
+                                                ) : (
+                                                    <Text size="xs" c="dimmed" lineClamp={4}>
+                                                        {researchItem(item).body_summary || "요약 내용이 없습니다."}
+                                                    </Text>
+                                                )}
                                             </Paper>
 
                                             {/* Buttons */}
@@ -668,7 +812,7 @@ export default function Home() {
                                                 {item.pdf_link && (
                                                     <>
                                                         <Button variant="default" size="xs" component="a" href={item.pdf_link} target="_blank">PDF</Button>
-                                                        <Button variant="filled" color="violet" size="xs" onClick={() => setPdfItem(item)}>분석</Button>
+                                                        <Button variant="filled" color="violet" size="xs" onClick={() => openPdfAnalysis(item)}>분석</Button>
                                                     </>
                                                 )}
                                             </Group>
@@ -708,14 +852,14 @@ export default function Home() {
                                                     <Text fw={700} size="md" mb={4}>{item.title}</Text>
                                                     <Group gap="xs">
                                                         <Badge color="gray" size="sm">{item.date}</Badge>
-                                                        {item.pdf_analysis?.opinion && item.pdf_analysis.opinion !== 'N/A' && (
-                                                            <Badge color={item.pdf_analysis.opinion === 'BUY' ? 'red' : 'orange'}>
-                                                                {item.pdf_analysis.opinion}
+                                                        {researchItem(item).pdf_analysis?.opinion && researchItem(item).pdf_analysis.opinion !== 'N/A' && (
+                                                            <Badge color={researchItem(item).pdf_analysis.opinion === 'BUY' ? 'red' : 'orange'}>
+                                                                {researchItem(item).pdf_analysis.opinion}
                                                             </Badge>
                                                         )}
-                                                        {item.pdf_analysis?.target_price && item.pdf_analysis.target_price !== 'N/A' && (
+                                                        {researchItem(item).pdf_analysis?.target_price && researchItem(item).pdf_analysis.target_price !== 'N/A' && (
                                                             <Badge variant="outline" color="gray">
-                                                                TP: {item.pdf_analysis.target_price}
+                                                                TP: {researchItem(item).pdf_analysis.target_price}
                                                             </Badge>
                                                         )}
                                                     </Group>
@@ -724,9 +868,13 @@ export default function Home() {
 
                                             {/* 6-line Summary Area */}
                                             <Paper bg="gray.1" p="sm" radius="sm" mb="sm">
-                                                {item.body_summary ? (
+                                                {item.detail && item.has_body && !researchDetails[item.id] ? (
+                                                    <Button variant="subtle" size="xs" onClick={() => loadResearchDetail(item)}>
+                                                        요약 보기
+                                                    </Button>
+                                                ) : researchItem(item).body_summary ? (
                                                     <Text size="sm" c="dimmed" style={{ whiteSpace: 'pre-wrap', lineHeight: 1.5 }} lineClamp={6}>
-                                                        {item.body_summary}
+                                                        {researchItem(item).body_summary}
                                                     </Text>
                                                 ) : (
                                                     <Text size="sm" c="dimmed">요약 내용이 없습니다.</Text>
@@ -747,9 +895,7 @@ export default function Home() {
                                                             color="violet"
                                                             size="xs"
                                                             leftSection={<IconRobot size={14} />}
-                                                            onClick={() => {
-                                                                setPdfItem(item);
-                                                            }}
+                                                            onClick={() => openPdfAnalysis(item)}
                                                         >
                                                             PDF 심층 분석
                                                         </Button>
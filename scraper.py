@@ -1,26 +1,34 @@
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime, timedelta
 import time
 import os
 import sys
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
+from src import http_client, http_cassette, rate_governor, board_cursor, lazy_fields, naver_parsers, clock, telemetry, request_journal, budget, run_checkpoint, post_cache, trading_calendar, code_index, publish
 
 
-def get_top_trending_stocks(market_type='KOSPI'):
+
+# 순위 리스트 소스 (모두 table.type_2 형식, sosok=0 KOSPI / 1 KOSDAQ)
+RANKING_SOURCES = {
+    'quant': '/sise/sise_quant.naver', # 거래상위 (기본)
+    'rise': '/sise/sise_rise.naver', # 상승
+}
+
+def get_top_trending_stocks(market_type='KOSPI', limit=30, source='quant'):
 
     """
     네이버 금융 거래상위(또는 인기 검색) 종목 리스트를 가져옵니다.
     market_type: 'KOSPI' or 'KOSDAQ'
+    limit: 반환할 최대 종목 수 (기본 30)
+    source: RANKING_SOURCES 키 (기본 'quant' = 거래상위)
+    각 종목은 리스트에 있는 거래량/거래대금/시가총액/PER/ROE 값을 그대로 가집니다.
     """
     sosok = '0' if market_type == 'KOSPI' else '1'
-    url = f"https://finance.naver.com/sise/sise_quant.naver?sosok={sosok}" 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Referer': 'https://finance.naver.com/',
-        'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7'
-    }
+    url = f"https://finance.naver.com{RANKING_SOURCES[source]}?sosok={sosok}"
+    headers = {'Referer': 'https://finance.naver.com/'}
 
     
     exclude_keywords = ['KODEX', 'TIGER', 'ETN', 'KBSTAR', 'ACE', 'KOSEF', 'SOL', 'HANARO', 'ARIRANG']
@@ -32,81 +40,18 @@ def get_top_trending_stocks(market_type='KOSPI'):
              print(f"[DEBUG] Fetching KOSDAQ trending stocks...", flush=True)
 
         print(f"[DEBUG] Sending request to {url}...", flush=True)
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get(url, headers=headers)
         print(f"[DEBUG] Response Received. Status: {response.status_code}", flush=True)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.content.decode('euc-kr', 'replace'), 'html.parser')
-        
-        table = soup.select_one('table.type_2')
-        if table:
-            rows = table.select('tr')
-            
-            data = []
-            for row in rows:
-                cols = row.select('td')
-                if len(cols) < 10: 
-                    continue
-                
-                try:
-                    name_tag = cols[1].select_one('a')
-                    if not name_tag:
-                        continue
-                        
-                    name = name_tag.get_text(strip=True)
-                    
-                    # 1. ETF/ETN 제외 필터링
-                    is_excluded = False
-                    for kw in exclude_keywords:
-                        if kw in name.upper():
-                            is_excluded = True
-                            break
-                    if is_excluded:
-                        continue
-
-                    url_suffix = name_tag['href']
-                    code = url_suffix.split('code=')[-1]
-                    
-                    price_str = cols[2].get_text(strip=True).replace(',', '')
-                    current_price = int(price_str) if price_str.isdigit() else 0
-                    
-                    # 등락률
-                    change_rate = cols[4].get_text(strip=True).strip()
-                    
-                    # 전일 종가 파싱 (리스트에 '전일비' 컬럼이 있음[3], 등락폭임. )
-                    # 거래상위 리스트 컬럼: 순위, 종목명, 현재가[2], 전일비[3], 등락률[4], 거래량[5], 거래대금[6], 매수호가[7], 매도호가[8], 시가총액[9], PER[10], ROE[11] ... 
-                    # 외국인비율은 기본 컬럼에 없을 수 있음 -> 상세 페이지 파싱 필요
-                    
-                    # 일단 리스트에서 최대한 확보
-                    change_amount_str = cols[3].get_text(strip=True).replace(',', '')
-                    # 상승/하락 이미지 또는 클래스 확인이 필요하나, 일단 절대값으로 가져오는 경우가 많음.
-                    # 등락률 부호를 보고 전일 종가 역산이 더 정확할 수 있음.
-                    # 전일종가 = 현재가 / (1 + 등락률/100)
-                    
-                    prev_close = 0
-                    try:
-                        rate_float = float(change_rate.replace('%', ''))
-                        prev_close = int(current_price / (1 + rate_float/100))
-                    except:
-                        pass
-                    
-                    # 외국인 비율은 보통 리스트 맨 뒤쪽에 있을 수도 있음 (설정 따라 다름)
-                    # 여기서는 상세 페이지에서 가져오는 것을 원칙으로 함 (사용자 요청사항 준수)
-
-                    stock_info = {
-                        'market': market_type,
-                        'code': code,
-                        'name': name,
-                        'price': current_price,
-                        'prev_close': prev_close, # 계산된 전일 종가 (임시)
-                        'change_rate': change_rate
-                    }
-                    data.append(stock_info)
-                    
-                except Exception as e:
-                    continue
-            
-            return data[:30] # 상위 30개로 축소 (Top 30 Focus - User Request V7.5)
+        rows = naver_parsers.parse_sise_quant(response.content.decode('euc-kr', 'replace'), market_type)
+        if rows is not None:
+            # 1. ETF/ETN 제외 필터링
+            data = [
+                row for row in rows
+                if not any(kw in row['name'].upper() for kw in exclude_keywords)
+            ]
+            return data[:limit] # 상위 30개로 축소 (Top 30 Focus - User Request V7.5)
         else:
             print(f"Stock table NOT found for {market_type}")
             return []
@@ -116,103 +61,66 @@ def get_top_trending_stocks(market_type='KOSPI'):
         return []
 
 
+def merge_ranked_candidates(ranked_lists):
+    """
+    여러 순위 리스트 [(source, rows), ...] 를 한 번에 순회하며 종목코드 기준으로 중복 제거합니다.
+    순위가 같은 행끼리 번갈아 배치(1위들 -> 2위들 ...)하므로 소스가 하나면 원래 순서와 같습니다.
+    먼저 나온 행의 값을 유지하고, 비어 있는 필드만 나중 소스 값으로 채우며
+    'ranks'에 {source: 순위}를 남깁니다.
+    """
+    merged = {}
+    depth = max((len(rows) for _, rows in ranked_lists), default=0)
+    for rank in range(depth):
+        for source, rows in ranked_lists:
+            if rank >= len(rows):
+                continue
+            row = rows[rank]
+            candidate = merged.get(row['code'])
+            if candidate is None:
+                candidate = merged[row['code']] = dict(row, ranks={})
+            else:
+                for key, value in row.items():
+                    if candidate.get(key) is None:
+                        candidate[key] = value
+            candidate['ranks'][source] = rank + 1
+    return list(merged.values())
+
+
+def get_trending_candidates(markets=('KOSPI', 'KOSDAQ'), limit=30, sources=('quant',)):
+    """
+    시장 x 순위 소스 리스트를 동시에 가져와 시장별 중복 없는 후보 목록 {market: [stock, ...]} 을 반환합니다.
+    """
+    def fetch(job):
+        # span은 스레드별 스택이므로 요청이 실행되는 워커 스레드에서 열어야 'trending'으로 집계됨
+        with telemetry.span('trending'):
+            return get_top_trending_stocks(job[0], limit=limit, source=job[1])
+
+    jobs = [(market, source) for market in markets for source in sources]
+    with ThreadPoolExecutor(max_workers=len(jobs) or 1) as executor:
+        results = list(executor.map(fetch, jobs))
+
+    by_market = {market: [] for market in markets}
+    for (market, source), rows in zip(jobs, results):
+        by_market[market].append((source, rows))
+    return {market: merge_ranked_candidates(lists) for market, lists in by_market.items()}
+
+
 def get_stock_details(code):
     """
     특정 종목의 상세 정보(전일종가, 외국인소진율 이력 등)를 가져옵니다.
-    일별 시세 페이지(sise_day.naver)를 활용합니다.
+    투자자별 매매동향 페이지(frgn.naver)를 활용합니다.
+    (일별 시세 sise_day.naver에는 외국인 지분율이 없어 요청하지 않음)
     """
-    url = f"https://finance.naver.com/item/sise_day.naver?code={code}"
-    try:
-        response = requests.get(url)
-        # response.raise_for_status() # 가끔 403 뜰 수 있으니 주의. 헤더 추가 권장.
-        
-        # 헤더가 없으면 차단될 수 있음
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers)
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # 일별 시세 테이블 (type2)
-        table = soup.select_one('table.type2')
-        if not table:
-            return {}
-            
-        # 데이터 행(tr) 추출 (onmouseover 속성 있는 행들이 데이터 행임)
-        rows = table.find_all('tr', {'onmouseover': True})
-        
-        details = {}
-        
-        # 오늘(최신) 데이터: rows[0]
-        if len(rows) > 0:
-            cols_today = rows[0].select('td')
-            # 컬럼 인덱스(추정): 날짜(0), 종가(1), 전일비(2), 시가(3), 고가(4), 저가(5), 거래량(6)
-            # 그런데 외국인 비율은 sise_day에 없음. -> 아뿔싸. 
-            # sise_day에는 가격 정보만 있고 외국인 지분율은 없음.
-            # 외국인 지분율 이력은 'frgn_man.naver' (투자자별 매매동향) 에 있음? 아님 'sise_day' 말고 다른 페이지?
-            # 네이버 금융 -> 시세 -> 일별시세 페이지에는 외국인 소진율이 없음.
-            # "종합정보 > 투자자별 매매동향 > 외국인 보유율" 탭이 따로 있음. 
-            pass
-
-    except Exception as e:
-        pass
-        
-    # 다시 계획 수정: 
-    # 1. 현재 외국인 비율 -> main.naver에서 가져옴 (이미 구현됨)
-    # 2. 어제 외국인 비율 -> frgn_man.naver (투자자별 매매동향) 페이지 파싱 필요.
+    details = {}
     
+    # 1. 현재 외국인 비율 / 2. 어제 외국인 비율 & 어제 종가 -> frgn.naver (투자자별 매매동향)
     # frgn_man.naver URL: https://finance.naver.com/item/frgn.naver?code={code}
     url_frgn = f"https://finance.naver.com/item/frgn.naver?code={code}"
     
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url_frgn, headers=headers)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # '보유율' 텍스트 포함된 테이블 찾기
-        tables = soup.select('table')
-        target_table = None
-        
-        for t in tables:
-            if '외국인' in t.get_text() and '보유율' in t.get_text():
-                target_table = t
-                break
-        
-        if target_table:
-            # 헤더 제외, 데이터 행 찾기
-            # 구조: 
-            # Row 0: Header
-            # Row 1: Sub-Header
-            # Row 2: Spacer (empty)
-            # Row 3: Data (Real Today)
-            # 하지만 장중/장마감에 따라 행 개수 다를 수 있음. 
-            # 간단히 tr을 모두 가져와서 td 개수가 많은 행을 데이터로 간주
-            
-            rows = target_table.select('tr')
-            data_rows = []
-            for row in rows:
-                cols = row.select('td')
-                if len(cols) > 5: # 데이터 행은 최소 6개 이상 컬럼
-                    data_rows.append(row)
-            
-            # 오늘(0), 어제(1)
-            if len(data_rows) >= 2:
-                cols_today = data_rows[0].select('td')
-                cols_yest = data_rows[1].select('td')
-                
-                if len(cols_today) > 0:
-                    details['foreign_rate'] = cols_today[-1].get_text(strip=True)
-                
-                if len(cols_yest) > 0:
-                     details['prev_foreign_rate'] = cols_yest[-1].get_text(strip=True)
-                     
-                     # 어제 종가 (인덱스 1)
-                     prev_close_str = cols_yest[1].get_text(strip=True).replace(',', '')
-                     if prev_close_str.isdigit():
-                        details['prev_close'] = int(prev_close_str)
+        response = http_client.get(url_frgn)
+        # '외국인' + '보유율' 테이블의 오늘(0)/어제(1) 행 파싱
+        details.update(naver_parsers.parse_frgn(response.content))
         
     except Exception as e:
         print(f"Error fetching foreign details for {code}: {e}")
@@ -222,112 +130,190 @@ def get_stock_details(code):
 
 
 
-def get_discussion_stats(code):
+BOARD_MAX_PAGES = 50 # v7.0 Tuning: Limit to ~1000 posts (User Request: 800)
+BOARD_MAX_POSTS = 800 # Max 800 check (User Request)
+BOARD_ROWS_PER_PAGE = 20 # 네이버 토론실 한 페이지당 게시글 수
+COUNT_MODE_ANALYSIS_PAGES = 5 # 카운팅 모드에서 제목/키워드 분석용으로 전체 수집할 앞쪽 페이지 수
+CURSOR_REFRESH_HOT_POSTS = 10 # cursor 재사용 시 조회수/공감수를 다시 읽을 인기 글 수 (Deep Dive 후보와 동일)
+
+def fetch_board_page(code, page):
+    """
+    토론실 목록 한 페이지를 가져와 [(post_date, post_dict), ...] 를 최신순으로 반환합니다.
+    테이블이 없거나 요청이 실패하면 None을 반환합니다.
+    """
+    url = f"https://finance.naver.com/item/board.naver?code={code}&page={page}"
+    headers = {'Referer': f"https://finance.naver.com/item/board.naver?code={code}"}
+
+    try:
+        response = http_client.get(url, headers=headers)
+        return naver_parsers.parse_board_list(response.content)
+
+    except Exception as e:
+        print(f"Error fetching page {page} for {code}: {e}")
+        return None
+
+
+def _count_recent_posts_by_bisection(target_time, fetch_page):
+    """
+    게시판은 시간 역순(페이지당 20개)이므로, '모든 글이 기준 시간 이후'인 페이지는 앞쪽에 연속으로 존재합니다.
+    1, 2, 4, 8 ... 로 갤럽한 뒤 이분 탐색으로 기준 시간(08:00) 경계 페이지를 찾고
+    (경계페이지-1) * 페이지당 글수 + 경계 페이지의 기준 이후 글 수 로 카운트합니다.
+    요청 수: O(pages) -> O(log pages)
+    """
+    def is_fully_recent(page):
+        # 꽉 찬 페이지여야 함 (마지막 페이지가 짧으면 그 뒤 빈 페이지가 경계로 잡혀 과대 집계됨)
+        posts = fetch_page(page)
+        return bool(posts) and len(posts) >= BOARD_ROWS_PER_PAGE and posts[-1][0] >= target_time
+
+    # 1. Gallop: 경계가 포함된 구간 [last_full+1, first_partial] 찾기
+    last_full = 0
+    probe = 1
+    first_partial = None
+    while True:
+        probe = min(probe, BOARD_MAX_PAGES)
+        if is_fully_recent(probe):
+            last_full = probe
+            if probe >= BOARD_MAX_PAGES:
+                break
+            probe *= 2
+        else:
+            first_partial = probe
+            break
+
+    if first_partial is None:
+        # 최대 페이지까지 전부 기준 이후 글 (모두 꽉 찬 페이지)
+        return min(last_full * BOARD_ROWS_PER_PAGE, BOARD_MAX_POSTS)
+
+    # 2. Bisect: last_full은 꽉 찬 페이지, first_partial은 경계(또는 마지막) 페이지
+    lo, hi = last_full, first_partial
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if is_fully_recent(mid):
+            lo = mid
+        else:
+            hi = mid
+
+    boundary_page = hi
+    partial = sum(1 for post_date, _ in (fetch_page(boundary_page) or []) if post_date >= target_time)
+    return min((boundary_page - 1) * BOARD_ROWS_PER_PAGE + partial, BOARD_MAX_POSTS)
+
+
+def _refresh_hot_posts(code, new_count, stored_posts, page_cache):
+    """
+    cursor에서 가져온 글 중 공감수 상위 글의 조회수/공감수를 갱신합니다.
+    새 글이 new_count개 쌓였으므로 저장된 i번째 글은 대략 (new_count + i) // 20 + 1 페이지에 있습니다.
+    해당 페이지만 다시 읽어 nid가 일치하는 글의 수치를 덮어씁니다.
+    """
+    def likes(post):
+        return int(post['likes']) if str(post['likes']).isdigit() else 0
+
+    hot = sorted(range(len(stored_posts)), key=lambda i: likes(stored_posts[i]), reverse=True)[:CURSOR_REFRESH_HOT_POSTS]
+    pages = sorted({(new_count + i) // BOARD_ROWS_PER_PAGE + 1 for i in hot})
+    by_nid = {board_cursor.post_nid(stored_posts[i]): stored_posts[i] for i in hot}
+
+    for page in pages:
+        if page > BOARD_MAX_PAGES:
+            continue
+        if page not in page_cache:
+            page_cache[page] = fetch_board_page(code, page)
+        for _, fresh in page_cache[page] or []:
+            target = by_nid.get(board_cursor.post_nid(fresh))
+            if target is not None:
+                target.update(views=fresh['views'], likes=fresh['likes'], dislikes=fresh['dislikes'])
+
+
+def get_discussion_stats(code, count_mode=False, cursor_store=None, first_page=None):
     """
     특정 종목 토론실의 게시글 정보를 분석합니다.
-    - 당일 00:01 이후 게시글 정밀 카운팅
+    - 당일 08:00 이후 게시글 정밀 카운팅
     - 최대 800개 제한
+    count_mode=True: 경계 페이지를 갤럽+이분 탐색으로 찾아 카운트하고,
+                     제목/키워드 분석용 글은 앞쪽 COUNT_MODE_ANALYSIS_PAGES 페이지만 수집합니다.
+    cursor_store: board_cursor.BoardCursorStore (전체 수집 모드 전용)
+                  당일 cursor가 있으면 cursor 이후의 새 글만 가져와 저장된 글과 합칩니다.
+    first_page: 사전 필터에서 이미 읽은 1페이지 (있으면 재요청하지 않음)
     """
     
     # 기준 시간 설정 (사용자 요청 V7.4: 당일 08:00 이후)
-    now = datetime.now()
-    target_time = now.replace(hour=8, minute=0, second=0, microsecond=0)
-    
-    if now < target_time:
-        pass 
+    target_time = get_board_target_time()
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
     collected_posts = []
-    page = 1
-    max_pages = 50 # v7.0 Tuning: Limit to ~1000 posts (User Request: 800)
-    stop_collecting = False
-    
-    headers['Referer'] = f"https://finance.naver.com/item/board.naver?code={code}"
 
-    while page <= max_pages and not stop_collecting:
-        url = f"https://finance.naver.com/item/board.naver?code={code}&page={page}"
-        
-        try:
-            if page > 1:
-                time.sleep(0.5)
+    if count_mode:
+        page_cache = {1: first_page} if first_page is not None else {}
 
-            response = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            table = soup.select_one('table.type2')
-            if not table:
+        def fetch_page(page):
+            if page not in page_cache:
+                page_cache[page] = fetch_board_page(code, page)
+            return page_cache[page]
+
+        recent_count = _count_recent_posts_by_bisection(target_time, fetch_page)
+
+        for page in range(1, COUNT_MODE_ANALYSIS_PAGES + 1):
+            posts = fetch_page(page)
+            if not posts:
                 break
-                
-            rows = table.select('tr')
-            if not rows: 
+            recent = [post for post_date, post in posts if post_date >= target_time]
+            collected_posts.extend(recent)
+            if len(recent) < len(posts):
+                break # 경계 페이지 도달
+    else:
+        page_cache = {}
+        page = 1
+        stop_collecting = False
+
+        # [Incremental] 이전 실행의 cursor가 있으면 cursor보다 새로운 글만 가져옴
+        trade_date = target_time.strftime('%Y-%m-%d')
+        cursor = cursor_store.get(code, trade_date) if cursor_store else None
+        known_nid = cursor.get('newest_nid') if cursor else None
+        reached_cursor = False
+
+        while page <= BOARD_MAX_PAGES and not stop_collecting:
+            if len(collected_posts) >= BOARD_MAX_POSTS:
                 break
-                
-            # Max 800 check (User Request)
-            if len(collected_posts) >= 800:
-                stop_collecting = True
+
+            if page == 1 and first_page is not None:
+                posts = first_page
+            else:
+                posts = fetch_board_page(code, page)
+            page_cache[page] = posts
+            if posts is None:
                 break
-                
-            found_post_in_page = False
-            
-            for row in rows:
-                cols = row.select('td')
-                if len(cols) < 5:
-                    continue
-                
-                try:
-                    # 날짜 확인 "2024.05.21 14:30"
-                    date_text = cols[0].get_text(strip=True)
-                    
-                    try:
-                        post_date = datetime.strptime(date_text, "%Y.%m.%d %H:%M")
-                    except ValueError:
-                        continue
-                        
-                    found_post_in_page = True
-
-                    # 기준 시간 체크
-                    if post_date < target_time:
-                        stop_collecting = True
-                        break # 과거 글
-                    
-                    # 수집 대상
-                    title = ""
-                    title_tag = row.select_one('a.title')
-                    if not title_tag and len(cols) > 1:
-                        title_tag = cols[1].select_one('a')
-                    
-                    if title_tag:
-                         title = title_tag.get_text(strip=True)
-                    
-                    views = cols[3].get_text(strip=True)
-
-                    collected_posts.append({
-                        'title': title,
-                        'date': date_text,
-                        'views': views,
-                        'likes': cols[4].get_text(strip=True) if len(cols) > 4 else '0',
-                        'dislikes': cols[5].get_text(strip=True) if len(cols) > 5 else '0',
-                        'link': title_tag['href'] if title_tag else ""
-                    })
-                    
-                except Exception:
-                    continue
-            
+
+            for post_date, post in posts:
+                # 기준 시간 체크
+                if post_date < target_time:
+                    stop_collecting = True
+                    break # 과거 글
+                nid = board_cursor.post_nid(post)
+                if known_nid is not None and nid is not None and nid <= known_nid:
+                    reached_cursor = True
+                    stop_collecting = True
+                    break # 이전 실행에서 이미 수집한 글
+                collected_posts.append(post)
+
             page += 1
-            
-        except Exception as e:
-            print(f"Error fetching page {page} for {code}: {e}")
-            break
+
+        if cursor:
+            new_count = len(collected_posts)
+            seen = {board_cursor.post_nid(p) for p in collected_posts}
+            stored = [dict(p) for p in cursor.get('posts', []) if board_cursor.post_nid(p) not in seen]
+            if reached_cursor:
+                _refresh_hot_posts(code, new_count, stored, page_cache)
+            collected_posts = (collected_posts + stored)[:BOARD_MAX_POSTS]
+            print(f"   [Board] {code}: {new_count} new posts + {len(stored)} from cursor ({page - 1} pages fetched)")
+
+        if cursor_store is not None:
+            cursor_store.put(code, trade_date, collected_posts)
+
+        recent_count = len(collected_posts)
             
     # Sort by Likes (Recomm) initially to pick candidates for Deep Dive
     collected_posts.sort(key=lambda x: int(x['likes']) if str(x['likes']).isdigit() else 0, reverse=True)
 
     return {
         'code': code,
-        'recent_posts_count': len(collected_posts),
+        'recent_posts_count': recent_count,
         'latest_posts': collected_posts, # Return ALL collected (will filter top 10 in main)
         'all_posts_titles': [p['title'] for p in collected_posts] 
     }
@@ -336,28 +322,29 @@ def fetch_post_body(link_suffix):
     """
     게시글 본문을 가져옵니다. (Deep Dive Analysis)
     link_suffix: /item/board_read.naver?code=...&nid=...
+    post_cache가 열려 있으면 같은 nid의 본문은 요청 없이 재사용합니다.
     """
+    url = f"https://finance.naver.com{link_suffix}"
+    cache = post_cache.active()
+    nid = board_cursor.post_nid({'link': link_suffix}) if cache is not None else None
+    if nid is not None:
+        body = cache.get(nid)
+        if body is not None:
+            request_journal.log_cache_hit(url)
+            return body
+
     try:
-        url = f"https://finance.naver.com{link_suffix}"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Referer': 'https://finance.naver.com/'
-        }
-        # Random sleep to be polite/safe
-        time.sleep(0.3) 
-        
-        response = requests.get(url, headers=headers, timeout=5)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Naver Finance Board Body Selector
-        # specific ID or class might vary, usually 'div#body' or 'div.view_se'
-        body_tag = soup.select_one('#body') or soup.select_one('.view_se') or soup.select_one('.scr01')
+        headers = {'Referer': 'https://finance.naver.com/'}
+        # 요청 간격은 rate_governor가 관리 (고정 sleep 제거)
         
-        if body_tag:
-            return body_tag.get_text("\n", strip=True)
-        return ""
+        response = http_client.get(url, headers=headers, timeout=5)
+        # Naver Finance Board Body Selector ('#body', '.view_se', '.scr01')
+        body = naver_parsers.parse_board_read(response.content)
     except Exception:
         return ""
+    if nid is not None:
+        cache.put(nid, body)
+    return body
 
 
 
@@ -378,11 +365,16 @@ def load_env_manual(filepath=".env.local"):
 # --- Helper Functions (Added for V6.7 Fix) ---
 def get_current_kst_time():
     """Returns current time in KST (UTC+9)."""
-    # UTC time from GitHub Actions (or local system)
-    now_utc = datetime.utcnow()
+    # UTC time from GitHub Actions (or local system), cassette 재생 시 녹화 시각으로 고정
+    now_utc = clock.utcnow()
     now_kst = now_utc + timedelta(hours=9)
     return now_kst
 
+def get_board_target_time(now=None):
+    """당일 08:00 KST (게시판 작성 시각이 KST이므로 러너 시간대와 무관하게 KST 기준)."""
+    now = now or get_current_kst_time()
+    return now.replace(hour=8, minute=0, second=0, microsecond=0)
+
 def get_threshold_by_time(hour):
     """Returns the comment count threshold based on the hour (KST)."""
     # 10:00 run (covers 09:00 ~ 10:XX) -> Threshold 40 (Stricter)
@@ -396,80 +388,342 @@ def get_threshold_by_time(hour):
         return 100
     return 10 # Default fallback
 
+def get_run_slot(hour):
+    """Returns the run slot name ('1000' / '1300' / '1500') matching the threshold tiers above."""
+    return trading_calendar.session_slot(hour)
+
 def get_yesterday_last_stocks():
     """
-    reports.json을 분석하여 '어제' 날짜 중 가장 마지막 스냅샷(또는 리포트)의 종목 코드를 가져옵니다.
+    직전 거래일(주말/공휴일/KRX 휴장일 제외) 마지막 실행의 종목 코드를 가져옵니다.
+    data/code_index.json(거래일/슬롯별 코드 목록)만 읽고, 인덱스에 없는 날짜면 해당 거래일 이력 파일에서 찾습니다.
     """
     try:
-        reports_file = 'data/reports.json'
-        if not os.path.exists(reports_file):
-            return set()
+        today_str = get_current_kst_time().strftime('%Y-%m-%d')
+        previous_date, codes = code_index.previous_session_codes(today_str)
+        if codes is not None:
+            print(f"[System] Previous trading session: {previous_date} (code index)")
+            return codes
 
-        import json
-        with open(reports_file, 'r', encoding='utf-8') as f:
-            reports = json.load(f)
-        
-        # 오늘 날짜 (KST 기준)
-        now_kst = get_current_kst_time()
-        today_str = now_kst.strftime('%Y-%m-%d')
-        
-        # 어제 날짜
-        yesterday = now_kst - timedelta(days=1)
-        yesterday_str = yesterday.strftime('%Y-%m-%d')
-        
-        # 1. reports.json에서 어제 날짜인 것들 필터링
-        # report['date'] 형식: "2024-05-21 15:00"
-        yesterday_reports = [
-            r for r in reports 
-            if r['date'].startswith(yesterday_str)
-        ]
-        
-        if not yesterday_reports:
-            # 어제 리포트가 없다면, 그 전이라도 가져와야 하나? 
-            # 사용자 요청: "어제 수집한 가장 마지막 데이터"
-            # 어제가 휴일일 수 있음 -> 주말/휴일 제외 로직이 있다면 데이터가 없을 수 있음.
-            # 일단 '어제'가 캘린더상 어제인지, 직전 영업일인지 모호하나 "어제"로 구현.
-            # 직전 영업일로 하려면 복잡해짐. 일단 캘린더 어제로 시도.
-            return set()
-            
-        # 2. 개중 가장 마지막 것 (reports.json은 최신순 정렬되어 있다고 가정, 혹은 timestamp 확인)
-        # reports.json은 insert(0, entry) 하므로 0번 인덱스가 최신.
-        # yesterday_reports도 순서 유지된다면 0번이 가장 늦은 시간.
-        last_report = yesterday_reports[0]
-        filename = last_report['filename'] # trending_integrated_20240520_150000.xlsx
-        
-        # 3. 파일 로드 (Excel)
-        file_path = f"data/{filename}" # analyzer.save_data saves to current dir, usually root or relative?
-        # scraper.py 실행 위치 기준. saved_files['excel']은 보통 상대경로(파일명)만 리턴함 (analyzer.py 확인 필요)
-        # analyzer.save_data: xlsx_filename = f"{base_name}.xlsx" -> 현재 디렉토리.
-        
-        if not os.path.exists(filename):
-            # 혹시 data/ 폴더 안에 있을 수도? (코드는 현재 디렉토리에 저장함)
-            # scraper.py: saved_files = analyzer.save_data(...) -> saved_files['excel'] returns filename.
-            pass
-            
-        import pandas as pd
-        if filename.endswith('.xlsx'):
-            df = pd.read_excel(filename)
-        elif filename.endswith('.csv'):
-            df = pd.read_csv(filename)
-        else:
+        # 인덱스 도입 이전 날짜: 해당 거래일 파티션 하나만 읽음
+        from src import history_store
+        history = history_store.read(previous_date, previous_date, columns=['run_at', 'code'])
+        if history.empty:
+            print(f"[System] No runs recorded on previous trading session {previous_date}")
             return set()
-            
-        # 'code' or '종목코드' 컬럼 추출
-        # analyzer.py result_df_kr 컬럼: '종목코드'
-        if '종목코드' in df.columns:
-            return set(df['종목코드'].astype(str).str.zfill(6).tolist())
-        
-        return set()
-        
+        last_run = history[history['run_at'] == history['run_at'].max()]
+        print(f"[System] Previous trading session: {previous_date} (history)")
+        return set(last_run['code'])
+
     except Exception as e:
         print(f"[Warning] Failed to get yesterday's stocks: {e}")
         return set()
 
+# --- Per-stock Collection Pipeline (Concurrent) ---
+# 종목 단위 작업(상세정보 → 토론방 → 본문 Deep Dive)을 워커 풀에서 병렬 처리합니다.
+# 결과 순서/필터링은 직렬 실행과 동일하게 유지됩니다.
+DEFAULT_WORKERS = int(os.environ.get('SCRAPER_WORKERS', '4'))
+STOCKS_PER_MARKET = int(os.environ.get('SCRAPER_STOCKS_PER_MARKET', '20')) # User Request V7.0: 20 stocks
+
+def deep_dive_posts(candidates, top_k=None, lazy=True):
+    """
+    Deep Dive 후보 글의 본문을 가져옵니다. 가져온 본문 수를 반환합니다.
+    lazy=True (Branch-and-Bound):
+      본문 없이 알 수 있는 점수 상한(analyzer.post_score_upper_bound) 순으로 본문을 가져오다가,
+      지금까지 확정된 top_k번째 점수가 다음 글의 상한보다 크면 중단합니다.
+      남은 글은 본문을 가져와도 상위 top_k(게시물_요약)에 들 수 없으므로 요약 결과는 전체 수집과 동일합니다.
+    """
+    if top_k is None:
+        top_k = analyzer.SUMMARY_TOP_POSTS
+
+    if not lazy:
+        order = range(len(candidates))
+    else:
+        # sorted는 안정 정렬이므로 상한이 같으면 원래(공감수) 순서 유지
+        order = sorted(range(len(candidates)), key=lambda i: analyzer.post_score_upper_bound(candidates[i]), reverse=True)
+
+    realized = []
+    fetched = 0
+    for idx in order:
+        post = candidates[idx]
+        if lazy and len(realized) >= top_k:
+            kth_best = sorted(realized, reverse=True)[top_k - 1]
+            if kth_best > analyzer.post_score_upper_bound(post):
+                break # 이후 글은 모두 상한이 더 낮음
+
+        if post.get('link') and not budget.allow('post_body'):
+            budget.skip('post_body', post.get('title')) # 마감 임박: 본문 없이 기본 점수만 사용
+            post['body'] = ""
+        elif post.get('link'):
+            post['body'] = fetch_post_body(post['link'])
+            fetched += 1
+        else:
+            post['body'] = ""
+        realized.append(analyzer.score_post(post))
+
+    for post in candidates:
+        post.setdefault('body', "") # 건너뛴 글: 본문 없음 (기본 점수만 사용)
+
+    return fetched
+
+# --- Early Pruning (Speculative Pre-filter) ---
+# 1페이지(최신 20개 글)의 작성 시각으로 08:00 이후 게시 속도를 추정해,
+# 기준(threshold)에 도달할 수 없는 종목은 상세정보/전체 크롤링을 건너뜁니다.
+# 기본값 0 = 비활성화: 08:00 직후 글이 몰리고 오후가 조용한 종목은 1페이지가 하루 대부분을 덮어
+# 추정치가 크게 낮아지므로 x3 여유로도 누락(false negative) 0을 보장하지 못합니다.
+# 스케줄 실행은 --prune-margin 3 --prune-audit 으로 판단만 기록하며(제외하지 않음),
+# 실제 실행에서 false_negatives가 계속 0으로 확인된 뒤에만 기본값을 켭니다.
+PRUNE_SAFETY_MARGIN = 0
+PRUNE_STATS = {'checked': 0, 'pruned': 0, 'false_negatives': 0}
+_prune_lock = threading.Lock()
+
+def estimate_recent_posts(first_page, target_time, now):
+    """
+    1페이지 글로 08:00 이후 글 수를 추정합니다. (estimate, exact) 반환.
+    - 1페이지 안에 08:00 이전 글이 있으면 정확한 값 (exact=True)
+    - 모두 08:00 이후면 1페이지가 덮는 시간 동안의 게시 속도로 08:00~현재를 외삽
+    """
+    if not first_page:
+        return 0, True
+
+    recent = sum(1 for post_date, _ in first_page if post_date >= target_time)
+    if recent < len(first_page):
+        return recent, True
+
+    oldest = first_page[-1][0]
+    span = max((now - oldest).total_seconds(), 60.0)
+    elapsed = max((now - target_time).total_seconds(), span)
+    return len(first_page) * elapsed / span, False
+
+def prefilter_stock(code, threshold, margin=PRUNE_SAFETY_MARGIN, cursor_store=None):
+    """
+    Returns (pruned, first_page, estimate). first_page는 이후 전체 크롤링에서 재사용됩니다.
+    """
+    if not margin or margin <= 0:
+        return False, None, None
+
+    first_page = fetch_board_page(code, 1)
+    if first_page is None:
+        return False, None, None # 판단 불가 -> 전체 크롤링
+
+    now = get_current_kst_time().replace(second=0, microsecond=0)
+    target_time = get_board_target_time(now) # get_discussion_stats와 같은 기준
+    estimate, exact = estimate_recent_posts(first_page, target_time, now)
+
+    # 당일 cursor에 이미 저장된 글 수는 확정된 하한
+    if cursor_store is not None:
+        cursor = cursor_store.get(code, target_time.strftime('%Y-%m-%d'))
+        if cursor:
+            estimate = max(estimate, len(cursor.get('posts', [])))
+
+    if exact:
+        pruned = estimate < threshold
+    else:
+        pruned = estimate * margin < threshold
+
+    with _prune_lock:
+        PRUNE_STATS['checked'] += 1
+        if pruned:
+            PRUNE_STATS['pruned'] += 1
+    return pruned, first_page, estimate
+
+def _record_prune_audit(stock, recent_count, estimate, threshold):
+    if recent_count >= threshold:
+        with _prune_lock:
+            PRUNE_STATS['false_negatives'] += 1
+        print(f" [Prune] FALSE NEGATIVE {stock['name']}: estimate {estimate:.0f}, actual {recent_count} (Threshold {threshold})")
+    else:
+        print(f" [Prune] ok {stock['name']}: estimate {estimate:.0f}, actual {recent_count}")
+
+# --- Lazy Enrichment Fields ---
+# 종목별 보강 단계를 의존관계와 함께 필드로 선언. 필터를 통과한 종목만 출력용 필드를 계산합니다.
+STOCK_FIELDS = lazy_fields.FieldRegistry()
+OUTPUT_FIELDS = ['details', 'recent_posts_count', 'latest_posts', 'all_posts_titles', 'is_consecutive']
+
+@STOCK_FIELDS.field('prefilter')
+def _field_prefilter(record):
+    # (pruned, first_page, estimate)
+    ctx = record.context
+    with telemetry.span('board_crawl'):
+        return prefilter_stock(record.data['code'], ctx['threshold'], ctx['prune_margin'], ctx['cursor_store'])
+
+@STOCK_FIELDS.field('board_stats', deps=['prefilter'])
+def _field_board_stats(record):
+    ctx = record.context
+    with telemetry.span('board_crawl'):
+        return get_discussion_stats(record.data['code'], count_mode=ctx['count_mode'],
+                                    cursor_store=ctx['cursor_store'], first_page=record['prefilter'][1])
+
+@STOCK_FIELDS.field('recent_posts_count', deps=['board_stats'])
+def _field_recent_posts_count(record):
+    return record['board_stats'].get('recent_posts_count', 0)
+
+@STOCK_FIELDS.field('details')
+def _field_details(record):
+    # 상세 정보 (전일종가, 외국인) - frgn.naver
+    with telemetry.span('details'):
+        return get_stock_details(record.data['code'])
+
+@STOCK_FIELDS.field('latest_posts', deps=['board_stats'])
+def _field_latest_posts(record):
+    # [Deep Dive V7.5] Analyze Top 10 Liked Posts
+    raw_latest = record['board_stats'].get('latest_posts', [])
+    # Ensure sort by likes descending
+    raw_latest.sort(key=lambda x: int(x['likes']) if str(x['likes']).isdigit() else 0, reverse=True)
+    candidates = raw_latest[:10]
+    if record.context.get('defer_deep_dive'):
+        return candidates # --budget: 모든 종목 수집 후 run_deferred_deep_dives에서 처리
+
+    with telemetry.span('deep_dive'):
+        fetched = deep_dive_posts(candidates, lazy=record.context['lazy_deep_dive'])
+    print(f"   [Deep Dive] {record.data['name']}: Fetched body for {fetched}/{len(candidates)} posts")
+    return candidates
+
+@STOCK_FIELDS.field('all_posts_titles', deps=['board_stats'])
+def _field_all_posts_titles(record):
+    return record['board_stats'].get('all_posts_titles', [])
+
+@STOCK_FIELDS.field('is_consecutive')
+def _field_is_consecutive(record):
+    return record.data['code'] in record.context['yesterday_codes']
+
+
+def process_stock(stock, threshold, yesterday_codes, count_mode=False, cursor_store=None,
+                  prune_margin=PRUNE_SAFETY_MARGIN, prune_audit=False, lazy_deep_dive=True,
+                  defer_deep_dive=False):
+    """
+    한 종목을 수집/분석합니다. 기준(threshold) 미달이면 None을 반환합니다.
+    필드는 STOCK_FIELDS에 선언된 의존관계에 따라 필요할 때만 계산됩니다.
+    defer_deep_dive=True: 본문 Deep Dive 없이 후보 글만 담아 반환 (run_deferred_deep_dives에서 처리)
+    """
+    record = lazy_fields.LazyRecord(
+        STOCK_FIELDS, stock,
+        threshold=threshold, yesterday_codes=yesterday_codes, count_mode=count_mode,
+        cursor_store=cursor_store, prune_margin=prune_margin, lazy_deep_dive=lazy_deep_dive,
+        defer_deep_dive=defer_deep_dive
+    )
+
+    # 0. 사전 필터: 1페이지만 보고 기준 도달이 불가능한 종목은 전체 크롤링 생략
+    pruned, _, estimate = record['prefilter']
+    if pruned and not prune_audit:
+        return None
+
+    # 1. 토론방 정보 (시간 기준 카운팅)
+    recent_count = record['recent_posts_count']
+
+    if pruned:
+        # --prune-audit: 가지치기 판단이 틀렸는지(기준 도달 종목을 버렸는지) 확인
+        _record_prune_audit(stock, recent_count, estimate, threshold)
+        return None
+
+    if recent_count < threshold:
+        # print(f" [SKIP] {stock['name']}: {recent_count} posts")
+        return None
+
+    # 2. 기준 통과 종목만 출력 필드 계산 (상세정보, Deep Dive 본문, 연속 포착)
+    fields = record.materialize(OUTPUT_FIELDS)
+    stock.update(fields.pop('details'))
+    stock.update(fields)
+
+    print(f" [KEEP] {stock['name']}: {recent_count} posts (Threshold {threshold})")
+    return stock
+
+def collect_market_stocks(stocks, threshold, yesterday_codes, workers=DEFAULT_WORKERS, checkpoint=None, **options):
+    """
+    종목 리스트를 워커 풀(workers개)로 병렬 처리하고, 기준을 통과한 종목만 원래 순서대로 반환합니다.
+    workers=1 이면 기존과 동일한 직렬 실행입니다.
+    checkpoint: RunCheckpoint (지정 시 완료된 종목은 재사용하고, 새로 끝난 종목은 바로 기록)
+    options: process_stock에 그대로 전달 (count_mode, cursor_store, prune_margin, prune_audit, lazy_deep_dive,
+             defer_deep_dive)
+    """
+    workers = max(1, int(workers or 1))
+
+    def _run(stock):
+        if checkpoint is not None:
+            done, result = checkpoint.get(stock)
+            if done:
+                return result
+        if not budget.allow('board_crawl'):
+            budget.skip('board_crawl', f"{stock.get('market')}:{stock.get('code')} {stock.get('name')}")
+            return None
+        try:
+            result = process_stock(stock, threshold, yesterday_codes, **options)
+        except Exception as e:
+            print(f"[Error] Failed to process {stock.get('name')} ({stock.get('code')}): {e}")
+            return None # 실패한 종목은 기록하지 않음 (재실행 시 다시 시도)
+        if checkpoint is not None:
+            checkpoint.record(stock, result)
+        return result
+
+    if workers == 1:
+        results = [_run(stock) for stock in stocks]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # executor.map은 입력 순서대로 결과를 돌려주므로 출력 순서가 직렬 실행과 같음
+            results = list(executor.map(_run, stocks))
+
+    return [stock for stock in results if stock is not None]
+
+def interleave_by_rank(lists):
+    """[[KOSPI 1위, 2위...], [KOSDAQ 1위, ...]] -> [KOSPI 1위, KOSDAQ 1위, KOSPI 2위, ...]"""
+    merged = []
+    for rank in range(max((len(items) for items in lists), default=0)):
+        merged.extend(items[rank] for items in lists if rank < len(items))
+    return merged
+
+def run_deferred_deep_dives(stocks, workers=DEFAULT_WORKERS, lazy=True):
+    """
+    --budget 모드의 마지막 단계: 기준을 통과한 종목의 Deep Dive 본문을 순위 순서대로 가져옵니다.
+    남은 시간이 부족하면 deep_dive_posts 안에서 본문 요청을 건너뜁니다 (budget 'post_body').
+    """
+    def _run(stock):
+        candidates = stock.get('latest_posts', [])
+        with telemetry.span('deep_dive'):
+            fetched = deep_dive_posts(candidates, lazy=lazy)
+        print(f"   [Deep Dive] {stock['name']}: Fetched body for {fetched}/{len(candidates)} posts")
+
+    with ThreadPoolExecutor(max_workers=max(1, int(workers or 1))) as executor:
+        list(executor.map(_run, stocks))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="StockBot Naver discussion scraper")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"Number of stocks processed concurrently (default: {DEFAULT_WORKERS}, env SCRAPER_WORKERS)")
+    parser.add_argument('--extra-rankings', default='',
+                        help=f"Comma separated extra ranking lists merged into the candidates "
+                             f"(choices: {', '.join(k for k in RANKING_SOURCES if k != 'quant')})")
+    parser.add_argument('--stocks-per-market', type=int, default=STOCKS_PER_MARKET,
+                        help=f"Top trending stocks analysed per market (default: {STOCKS_PER_MARKET}, "
+                             f"env SCRAPER_STOCKS_PER_MARKET)")
+    parser.add_argument('--board-count-mode', action='store_true',
+                        help="Count board posts by galloping/bisecting over pages (O(log pages) requests); "
+                             "titles for analysis come from the first pages only")
+    parser.add_argument('--no-board-cursor', action='store_true',
+                        help="Disable incremental board crawling (re-crawl every board back to 08:00)")
+    parser.add_argument('--prune-margin', type=float, default=PRUNE_SAFETY_MARGIN,
+                        help=f"Skip a stock when (page-1 extrapolated posts x margin) < threshold "
+                             f"(default: {PRUNE_SAFETY_MARGIN}, 0 disables pruning)")
+    parser.add_argument('--prune-audit', action='store_true',
+                        help="Crawl pruned stocks anyway and report pruning false negatives "
+                             "(use with --prune-margin; nothing is dropped)")
+    parser.add_argument('--no-post-cache', action='store_true',
+                        help="Always download deep-dive post bodies instead of reusing .cache/post_bodies.sqlite")
+    parser.add_argument('--no-checkpoint', action='store_true',
+                        help="Do not resume from / write the per-stock checkpoint journal in .cache/checkpoints")
+    parser.add_argument('--budget', type=float, default=None,
+                        help="Total wall-clock budget in seconds. Stocks are crawled by trading rank across "
+                             "markets, deep dives run last, and optional stages are skipped near the deadline")
+    parser.add_argument('--full-deep-dive', action='store_true',
+                        help="Fetch bodies for all top-10 liked posts instead of the branch-and-bound subset")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
     # 0. Load Environment Variables
     load_env_manual()
+    args = parse_args()
+    # [Request Journal] 이번 실행의 모든 HTTP 요청을 .cache/requests.jsonl 에 기록
+    request_journal.start()
+    # [Budget] 전체 실행 시간 제한 (지정 시)
+    budget.start(args.budget)
     
     # 1. Initialize Time & Threshold (CRITICAL FIX V6.7)
     now_kst = get_current_kst_time()
@@ -481,18 +735,15 @@ if __name__ == "__main__":
     print(f"[System] Time (KST): {now_kst.strftime('%Y-%m-%d %H:%M:%S')}")
     
     # --- Market Holiday Check (V6.8) ---
-    import holidays
-    kr_holidays = holidays.KR()
-    
-    is_weekend = now_kst.weekday() >= 5 # 5=Sat, 6=Sun
-    is_holiday = now_kst.strftime('%Y-%m-%d') in kr_holidays
-    
-    if is_weekend or is_holiday:
-        reason = "Weekend" if is_weekend else f"Holiday ({kr_holidays.get(now_kst.strftime('%Y-%m-%d'))})"
+    with telemetry.span('holiday_check'):
+        reason = trading_calendar.closed_reason(now_kst.date()) # Weekend / Holiday (...) / KRX Closed (...)
+
+    if reason:
         print(f"[System] Market Closed Today ({reason}). Skipping execution.")
         sys.exit(0) # Exit cleanly, no Telegram sent.
         
     print(f"[System] Threshold determined: {threshold} posts (based on hour {current_hour})")
+    print(f"[System] Collection workers: {args.workers}")
 
     # --- 0. Initialize Telegram Manager (V7.0) ---
     try:
@@ -503,34 +754,35 @@ if __name__ == "__main__":
         print(f"[System] Failed to initialize TelegramManager: {e}")
         tg_manager = None
     # 2. Research Briefing (Enabled)
-    print("\n[Research] Updating Market Briefing & PDF Analysis...")
-    try:
-        from src import research_scraper # Ensure import
-        research_scraper.main()
-        print("[Research] Completed.")
-        
-        # Send Research Telegram
+    with telemetry.span('research'):
+        print("\n[Research] Updating Market Briefing & PDF Analysis...")
         try:
-            import json
-            # Correct path matches research_scraper.py output (data/latest_research.json)
-            with open('data/latest_research.json', 'r', encoding='utf-8') as f:
-                r_data = json.load(f)
+            from src import research_scraper # Ensure import
+            research_scraper.main()
+            print("[Research] Completed.")
+        
+            # Send Research Telegram
+            try:
+                import json
+                # Correct path matches research_scraper.py output (data/research/index.json)
+                with open('data/research/index.json', 'r', encoding='utf-8') as f:
+                    r_data = json.load(f)
             
-            invest_summary = r_data.get('invest', {}).get('summary', '요약 없음')
-            items_count = r_data.get('invest', {}).get('today_count', 0)
+                invest_summary = r_data.get('invest', {}).get('summary', '요약 없음')
+                items_count = r_data.get('invest', {}).get('today_count', 0)
             
-            r_msg = f"📑 <b>[리포트 브리핑] 총 {items_count}건</b>\n\n"
-            r_msg += f"💡 시장 요약: {invest_summary[:300]}...\n\n"
-            r_msg += f"👉 자세히 보기: {os.environ.get('DASHBOARD_URL', '')}"
+                r_msg = f"📑 <b>[리포트 브리핑] 총 {items_count}건</b>\n\n"
+                r_msg += f"💡 시장 요약: {invest_summary[:300]}...\n\n"
+                r_msg += f"👉 자세히 보기: {os.environ.get('DASHBOARD_URL', '')}"
             
-            # tg_manager.send_message(r_msg) # User requested to disable Research Briefing (V7.1)
-            print("[Research] Telegram Sent (Disabled by User Request).")
+                # tg_manager.send_message(r_msg) # User requested to disable Research Briefing (V7.1)
+                print("[Research] Telegram Sent (Disabled by User Request).")
             
-        except Exception as tg_e:
-            print(f"[Research] Telegram Error: {tg_e}")
+            except Exception as tg_e:
+                print(f"[Research] Telegram Error: {tg_e}")
             
-    except Exception as e:
-        print(f"[Research] Error: {e}")
+        except Exception as e:
+            print(f"[Research] Error: {e}")
 
     markets = ['KOSPI', 'KOSDAQ']
     # ... (rest of code) ...
@@ -547,73 +799,84 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"[System] Consecutive check setup failed: {e}")
 
-    for market in markets:
-        if market == 'KOSDAQ':
-             print("Wait 5 seconds before KOSDAQ...", flush=True)
-             time.sleep(5)
+    # [Incremental Board Crawl] 당일 이전 실행의 종목별 cursor
+    cursor_store = None if args.no_board_cursor else board_cursor.BoardCursorStore()
 
-        print(f"\n[{market}] Starting collection...")
-        # Get MORE stocks to ensure we find enough active ones (Top 50)
-        trending_stocks = get_top_trending_stocks(market)
-        # Limit to top 50 (Apply function limit)
-        # Assuming get_top_trending_stocks returns whatever it finds on page (usually 100 if not sliced)
-        
-        # In this edited version, we'll slice larger
-        source_count = len(trending_stocks)
-        print(f"Found {source_count} stocks in {market} Top list.")
-        
-        count_collected = 0
+    # [Trending] KOSPI/KOSDAQ (+ 추가 순위 리스트) 동시 요청 후 시장별로 병합
+    sources = ['quant']
+    for name in (s.strip() for s in args.extra_rankings.split(',')):
+        if name in RANKING_SOURCES and name not in sources:
+            sources.append(name)
+        elif name and name not in sources:
+            print(f"[Trending] Unknown ranking source '{name}' ignored")
+    candidates_by_market = get_trending_candidates(markets, limit=max(30, args.stocks_per_market), sources=sources)
+
+    # [Post Cache] Deep Dive 본문 재사용 (cassette 녹화/재생 중에는 요청 순서가 바뀌지 않도록 사용 안 함)
+    if not args.no_post_cache and http_cassette.mode() == 'live':
+        post_cache.open_cache()
+
+    # [Checkpoint] 같은 거래일/슬롯의 중단된 실행이 있으면 완료된 종목은 재사용
+    checkpoint = None
+    run_at = now_kst
+    if not args.no_checkpoint:
+        checkpoint = run_checkpoint.RunCheckpoint(now_kst.strftime('%Y-%m-%d'), get_run_slot(current_hour), threshold,
+                                                  run_at=now_kst)
+        # 재개한 실행은 중단된 실행의 run_at을 이어받음 -> 이력/집계에 같은 실행이 두 번 저장되지 않음
+        run_at = checkpoint.run_at
+
+    collect_options = dict(workers=args.workers, checkpoint=checkpoint, count_mode=args.board_count_mode,
+                           cursor_store=cursor_store, prune_margin=args.prune_margin,
+                           prune_audit=args.prune_audit, lazy_deep_dive=not args.full_deep_dive)
+
+    if budget.enabled():
+        # [Budget] 시장 구분 없이 거래 순위 순서(KOSPI 1위, KOSDAQ 1위, ...)로 수집하고 Deep Dive는 마지막에 실행
+        print(f"\n[Budget] {args.budget:.0f}s budget: collecting by trading rank across markets, deep dive last")
+        ranked = interleave_by_rank([candidates_by_market[m][:args.stocks_per_market] for m in markets])
+        kept_stocks = collect_market_stocks(ranked, threshold, yesterday_codes, defer_deep_dive=True, **collect_options)
+        run_deferred_deep_dives(kept_stocks, workers=args.workers, lazy=not args.full_deep_dive)
+        for market in markets:
+            market_stocks = [s for s in kept_stocks if s.get('market') == market]
+            all_data.extend(market_stocks)
+            print(f"Collected {len(market_stocks)} items from {market} meeting criteria.")
+    else:
+        for market in markets:
+            print(f"\n[{market}] Starting collection...")
+            trending_stocks = candidates_by_market[market]
+            source_count = len(trending_stocks)
+            print(f"Found {source_count} stocks in {market} Top list.")
         
-        for i, stock in enumerate(trending_stocks):
-            # Performance safety / Limit (User Request V7.0: 20 stocks)
-            if i >= 20: break 
-            
-            # 1. 상세 정보 (전일종가, 외국인)
-            details = get_stock_details(stock['code'])
-            stock.update(details)
-            
-            # 2. 토론방 정보 (시간 기준 카운팅)
-            stats = get_discussion_stats(stock['code'])
-            recent_count = stats.get('recent_posts_count', 0)
-            
-            # FILTER HERE
-            # FILTER HERE
-            if recent_count >= threshold:
-                stock['recent_posts_count'] = recent_count
-                
-                # [Deep Dive V7.5] Analyze Top 10 Liked Posts
-                raw_latest = stats.get('latest_posts', [])
-                # Take Top 10 (Already sorted by likes in get_discussion_stats? No, we need to ensure int sort there or here)
-                # Ensure sort by likes descending
-                raw_latest.sort(key=lambda x: int(x['likes']) if str(x['likes']).isdigit() else 0, reverse=True)
-                candidates = raw_latest[:10]
-                
-                print(f"   [Deep Dive] Fetching body for {len(candidates)} posts...")
-                for post in candidates:
-                    if post.get('link'):
-                        post['body'] = fetch_post_body(post['link'])
-                    else:
-                        post['body'] = ""
-                
-                stock['latest_posts'] = candidates # Assign enriched posts
-                stock['all_posts_titles'] = stats.get('all_posts_titles', []) 
-                
-                # Consecutive Flag
-                if stock['code'] in yesterday_codes:
-                    stock['is_consecutive'] = True
-                    # Legacy 'summary' field update for frontend display if needed
-                    # stock['posts_summary'] = "[연속] " + stock.get('posts_summary', '') 
-                else:
-                    stock['is_consecutive'] = False
+            # Performance safety / Limit (User Request V7.0: 20 stocks, --stocks-per-market)
+            kept_stocks = collect_market_stocks(trending_stocks[:args.stocks_per_market], threshold, yesterday_codes,
+                                                **collect_options)
+            all_data.extend(kept_stocks)
+            count_collected = len(kept_stocks)
 
-                all_data.append(stock)
-                count_collected += 1
-                print(f" [KEEP] {stock['name']}: {recent_count} posts (Threshold {threshold})")
-            else:
-                # print(f" [SKIP] {stock['name']}: {recent_count} posts")
-                pass
+            print(f"Collected {count_collected} items from {market} meeting criteria.")
 
-        print(f"Collected {count_collected} items from {market} meeting criteria.")
+    if args.prune_audit:
+        print(f"[Prune] Audit: {PRUNE_STATS['pruned']}/{PRUNE_STATS['checked']} stocks would be pruned, "
+              f"false negatives: {PRUNE_STATS['false_negatives']} (nothing dropped)")
+    elif PRUNE_STATS['checked']:
+        print(f"[Prune] {PRUNE_STATS['pruned']}/{PRUNE_STATS['checked']} stocks pruned before the deep crawl (unaudited)")
+
+    if cursor_store is not None:
+        try:
+            cursor_store.save()
+        except Exception as e:
+            print(f"[BoardCursor] Failed to save cursors: {e}")
+
+    for host, state in rate_governor.snapshot().items():
+        print(f"[RateGovernor] {host}: {state['rate']} req/s, queue {state['queue_depth']}, "
+              f"{state['requests']} requests, {state['throttled']} throttled")
+
+    if http_cassette.active() is not None:
+        print(f"[Cassette] {http_cassette.mode()}: {http_cassette.active().stats()}")
+
+    post_cache_stats = post_cache.close()
+    if post_cache_stats:
+        print(f"[PostCache] {post_cache_stats['hits']}/{post_cache_stats['hits'] + post_cache_stats['misses']} "
+              f"hits ({post_cache_stats['hit_rate']:.0%}), {post_cache_stats['entries']} bodies "
+              f"({post_cache_stats['bytes'] / 1e6:.1f} MB), {post_cache_stats['evicted']} evicted")
 
     # --- 5. Telegram Notification (Refactored V7.0 - Zero Base) ---
     try:
@@ -633,93 +896,112 @@ if __name__ == "__main__":
         
         if all_data:
             print(f"\nAnalyzing total {len(all_data)} items...")
-            result_df_kr, result_df_en = analyzer.analyze_discussion_trend(all_data)
+            with telemetry.span('analysis'):
+                result_df_kr, result_df_en = analyzer.analyze_discussion_trend(all_data)
             json_records = result_df_en.to_dict('records')
             
-            # Save CSV & Excel (History)
-            filename_prefix = f"trending_integrated"
-            saved_files = analyzer.save_data(result_df_kr, filename_prefix=filename_prefix)
-            
-            # --- Update Reports Index (reports.json) ---
-            if 'excel' in saved_files:
-                report_entry = {
-                    "date": now_kst.strftime('%Y-%m-%d %H:%M'),
-                    "filename": os.path.basename(saved_files['excel']),
-                    "count": len(all_data),
-                    "timestamp": datetime.now().timestamp()
-                }
-                
-                reports_file = 'data/reports.json'
-                current_reports = []
-                if os.path.exists(reports_file):
-                    try:
-                        with open(reports_file, 'r', encoding='utf-8') as f:
-                            current_reports = json.load(f)
-                    except:
-                        pass
-                
-                # Prepend new report (Latest first)
-                current_reports.insert(0, report_entry)
-                # Keep last 50
-                current_reports = current_reports[:50]
-                
-                with open(reports_file, 'w', encoding='utf-8') as f:
-                    json.dump(current_reports, f, ensure_ascii=False, indent=2)
-                print(f"[System] Updated reports index: {reports_file}")
-                
+            with telemetry.span('export'):
+                # Save History (data/history) & Excel
+                filename_prefix = f"trending_integrated"
+                saved_files = analyzer.save_data(result_df_kr, filename_prefix=filename_prefix, run_at=run_at)
+
+                # --- Update Reports Index (reports.json) ---
+                if 'excel' in saved_files:
+                    report_entry = {
+                        "date": now_kst.strftime('%Y-%m-%d %H:%M'),
+                        "filename": os.path.basename(saved_files['excel']),
+                        "count": len(all_data),
+                        "timestamp": clock.now().timestamp(),
+                        "run_at": run_at.strftime('%Y-%m-%d %H:%M:%S'), # excel_export가 이력에서 엑셀 생성
+                    }
+
+                    reports_file = 'data/reports.json'
+                    current_reports = []
+                    if os.path.exists(reports_file):
+                        try:
+                            with open(reports_file, 'r', encoding='utf-8') as f:
+                                current_reports = json.load(f)
+                        except:
+                            pass
+
+                    # Prepend new report (Latest first), 재개한 실행이면 같은 run_at의 이전 항목을 대체
+                    current_reports = [r for r in current_reports if r.get('run_at') != report_entry['run_at']]
+                    current_reports.insert(0, report_entry)
+                    # Keep last 50
+                    current_reports = current_reports[:50]
+
+                    with open(reports_file, 'w', encoding='utf-8') as f:
+                        json.dump(current_reports, f, ensure_ascii=False, indent=2)
+                    print(f"[System] Updated reports index: {reports_file}")
+
         else:
             print(f"\n[System] No data collected (all below threshold {threshold}). Saving empty records.")
             json_records = []
             result_df_kr = None
+            # 통과 종목이 없어도 실행일은 주간/월간 집계에 기록 (연속 등장 일수 계산용)
+            analyzer.save_data(pd.DataFrame(), run_at=run_at)
 
-        # Save JSON for Frontend (latest_stocks.json) - ALWAYS
-        with open('data/latest_stocks.json', 'w', encoding='utf-8') as f:
-            json.dump(json_records, f, ensure_ascii=False, indent=2)
-        print(f"Data saved to data/latest_stocks.json (Count: {len(json_records)})")
-
-        # [User Request V7.3] Save Time-Specific Snapshot - ALWAYS
-        snapshot_name = None
-        if 9 <= current_hour <= 10: snapshot_name = "stocks_1000.json"
-        elif 12 <= current_hour <= 13: snapshot_name = "stocks_1300.json"
-        elif 14 <= current_hour <= 23: snapshot_name = "stocks_1500.json" # Covers 14:00 ~ Midnight (Closing Data)
-        
-        if snapshot_name:
-            with open(f'data/{snapshot_name}', 'w', encoding='utf-8') as f:
+        with telemetry.span('export'):
+            # Save JSON for Frontend (latest_stocks.json) - ALWAYS
+            with open('data/latest_stocks.json', 'w', encoding='utf-8') as f:
                 json.dump(json_records, f, ensure_ascii=False, indent=2)
-            print(f"Snapshot saved: data/{snapshot_name} (Count: {len(json_records)})")
+            print(f"Data saved to data/latest_stocks.json (Count: {len(json_records)})")
 
-        # Telegram Notifications
-        if all_data:
-            if tg_manager:
-                try:
-                    # Filter Lists
-                    records = result_df_kr.to_dict('records')
-                    kospi_items = [r for r in records if r.get('시장구분') == 'KOSPI']
-                    kosdaq_items = [r for r in records if r.get('시장구분') == 'KOSDAQ']
-                    
-                    if kospi_items:
-                        tg_manager.send_market_report('KOSPI', kospi_items)
-                        time.sleep(1)
-                        
-                    if kosdaq_items:
-                        tg_manager.send_market_report('KOSDAQ', kosdaq_items)
-                        time.sleep(1)
-
-                    # 2. Dashboard Link
-                    print(f"[System] Sending Dashboard Link last... (v7.0)")
-                    tg_manager.send_dashboard_link()
-                except Exception as send_err:
-                    print(f"[ERROR] details sending Telegram: {send_err}")
+            # [User Request V7.3] Save Time-Specific Snapshot - ALWAYS
+            snapshot_name = None
+            if 9 <= current_hour <= 10: snapshot_name = "stocks_1000.json"
+            elif 12 <= current_hour <= 13: snapshot_name = "stocks_1300.json"
+            elif 14 <= current_hour <= 23: snapshot_name = "stocks_1500.json" # Covers 14:00 ~ Midnight (Closing Data)
+
+            if snapshot_name:
+                with open(f'data/{snapshot_name}', 'w', encoding='utf-8') as f:
+                    json.dump(json_records, f, ensure_ascii=False, indent=2)
+                print(f"Snapshot saved: data/{snapshot_name} (Count: {len(json_records)})")
+
+            # [Consecutive Check] 다음 거래일 비교용 코드 목록 (거래일/슬롯별)
+            try:
+                code_index.record(now_kst.strftime('%Y-%m-%d'), get_run_slot(current_hour),
+                                  [str(item['code']).zfill(6) for item in all_data])
+            except Exception as e:
+                print(f"[CodeIndex] Failed to record run codes: {e}")
+
+        with telemetry.span('telegram'):
+            # Telegram Notifications
+            if all_data:
+                if tg_manager:
+                    try:
+                        # Filter Lists
+                        records = result_df_kr.to_dict('records')
+                        kospi_items = [r for r in records if r.get('시장구분') == 'KOSPI']
+                        kosdaq_items = [r for r in records if r.get('시장구분') == 'KOSDAQ']
+
+                        if kospi_items:
+                            tg_manager.send_market_report('KOSPI', kospi_items)
+
+                        if kosdaq_items:
+                            tg_manager.send_market_report('KOSDAQ', kosdaq_items)
+
+                        # 2. Dashboard Link
+                        print(f"[System] Sending Dashboard Link last... (v7.0)")
+                        tg_manager.send_dashboard_link()
+                    except Exception as send_err:
+                        print(f"[ERROR] details sending Telegram: {send_err}")
+                else:
+                     print("[System] TelegramManager not available. Skipping notifications.")
             else:
-                 print("[System] TelegramManager not available. Skipping notifications.")
-        else:
-            print("No data collected meeting the threshold.")
-            if tg_manager:
-                print(f"[System] Sending No Data Alert (Threshold: {threshold})")
-                try:
-                    tg_manager.send_no_data_alert(threshold)
-                except Exception as e:
-                    print(f"[ERROR] Failed to send No Data Alert: {e}")
+                print("No data collected meeting the threshold.")
+                if tg_manager:
+                    print(f"[System] Sending No Data Alert (Threshold: {threshold})")
+                    try:
+                        tg_manager.send_no_data_alert(threshold)
+                    except Exception as e:
+                        print(f"[ERROR] Failed to send No Data Alert: {e}")
+
+        # [Checkpoint] 저장/알림까지 끝났으므로 다음 실행은 처음부터
+        if checkpoint is not None:
+            if checkpoint.resumed:
+                print(f"[Checkpoint] Reused {checkpoint.resumed} stocks from the interrupted run")
+            checkpoint.clear()
 
     except Exception as e:
         print(f"Failed in notification/saving section: {e}")
@@ -728,10 +1010,27 @@ if __name__ == "__main__":
         # Save Status JSON for Frontend (ALWAYS RUN)
         try:
             import json
+            request_journal.flush()
+            # [Telemetry] 단계별 소요시간/요청 수 + 최근 실행 이력
+            telemetry.print_summary()
+            run_summary = telemetry.summary()
+            run_summary['started_at'] = now_kst.strftime('%Y-%m-%d %H:%M:%S')
+            previous_status = None
+            if os.path.exists('data/status.json'):
+                try:
+                    with open('data/status.json', 'r', encoding='utf-8') as f:
+                        previous_status = json.load(f)
+                except Exception:
+                    pass
+
             status_data = {
                 "last_updated": now_kst.strftime('%Y-%m-%d %H:%M:%S'),
                 "message": "Data updated successfully" if all_data else "No data collected",
-                "count": len(all_data) if 'all_data' in locals() else 0
+                "count": len(all_data) if 'all_data' in locals() else 0,
+                "run": run_summary,
+                "budget": budget.summary(),
+                "post_cache": post_cache_stats if 'post_cache_stats' in locals() else None,
+                "history": telemetry.with_history(run_summary, previous_status)
             }
             with open('data/status.json', 'w', encoding='utf-8') as f:
                 json.dump(status_data, f, ensure_ascii=False, indent=2)
@@ -739,6 +1038,13 @@ if __name__ == "__main__":
         except Exception as status_e:
             print(f"[ERROR] Failed to save status.json: {status_e}")
 
+        # [Publish] 대시보드용 minified/gzip + 내용 해시 파일, 직전 스냅샷 대비 delta, data/manifest.json
+        try:
+            manifest = publish.publish()
+            print(f"[Publish] manifest.json updated ({len(manifest['files'])} files)")
+        except Exception as publish_e:
+            print(f"[ERROR] Failed to publish dashboard payloads: {publish_e}")
+
 
 
 
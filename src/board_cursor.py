@@ -0,0 +1,80 @@
+"""
+Persistent per-stock board cursors for incremental discussion crawling.
+
+10:00 / 13:00 / 15:00 실행이 매번 08:00까지 전체 게시판을 다시 긁지 않도록,
+종목별로 '가장 최신 글 nid'와 지금까지 수집한 당일 글 목록을 저장합니다.
+다음 실행은 cursor보다 새로운 글만 가져와 저장된 글과 합칩니다.
+(GitHub Actions에서는 .cache/ 를 actions/cache 로 실행 간 보존)
+"""
+
+import json
+import os
+import re
+import threading
+
+DEFAULT_PATH = os.path.join(os.environ.get('STOCKBOT_CACHE_DIR', '.cache'), 'board_cursors.json')
+
+_NID_PATTERN = re.compile(r'nid=(\d+)')
+
+
+def post_nid(post):
+    """Extracts the numeric board nid from a post link (None if absent)."""
+    match = _NID_PATTERN.search(post.get('link') or '')
+    return int(match.group(1)) if match else None
+
+
+class BoardCursorStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cursors = {}
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._cursors = json.load(f)
+        except Exception as e:
+            print(f"[BoardCursor] Failed to load {self.path}: {e}")
+            self._cursors = {}
+
+    def get(self, code, trade_date):
+        """Returns the cursor for `code` if it belongs to `trade_date` ('YYYY-MM-DD'), else None."""
+        with self._lock:
+            cursor = self._cursors.get(code)
+        if cursor and cursor.get('date') == trade_date:
+            return cursor
+        return None
+
+    def put(self, code, trade_date, posts):
+        """Stores today's posts (newest first) and the newest nid/date seen for `code`."""
+        nids = [n for n in (post_nid(p) for p in posts) if n is not None]
+        cursor = {
+            'date': trade_date,
+            'newest_nid': max(nids) if nids else None,
+            'newest_date': posts[0]['date'] if posts else None,
+            'posts': [dict(p) for p in posts], # 이후 Deep Dive의 body 등이 섞이지 않도록 복사
+        }
+        with self._lock:
+            self._cursors[code] = cursor
+            self._dirty = True
+
+    def save(self):
+        """Writes the store atomically, dropping cursors from other trading dates."""
+        with self._lock:
+            if not self._dirty:
+                return
+            dates = [c.get('date') for c in self._cursors.values() if c.get('date')]
+            latest = max(dates) if dates else None
+            cursors = {code: c for code, c in self._cursors.items() if c.get('date') == latest}
+            self._dirty = False
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cursors, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        print(f"[BoardCursor] Saved {len(cursors)} cursors to {self.path}")
@@ -0,0 +1,101 @@
+"""
+Wall-clock run budget with stage-level graceful degradation.
+
+scraper.py --budget 600 처럼 전체 실행 시간을 지정하면,
+남은 시간이 단계별 예약 비율(STAGE_RESERVES)보다 적어질 때 선택 단계를 건너뜁니다.
+(예약분은 분석/저장/텔레그램 등 마무리 단계가 항상 끝날 수 있도록 남겨두는 시간)
+
+- research_body : 리서치 리포트 본문 요약 (PDF 분석은 현재 비활성화 상태)
+- board_crawl   : 아직 시작하지 않은 종목의 토론방 수집 (거래 순위가 높은 종목부터 처리)
+- post_body     : Deep Dive 본문 요청 (가장 마지막, 남은 시간만 사용)
+- history_compare : 과거 이력 비교
+
+건너뛴 작업은 단계별로 집계되어 status.json 'budget' 항목에 기록됩니다.
+budget이 없으면(None) 모든 단계를 항상 허용합니다.
+"""
+
+import threading
+import time
+
+# 단계 시작에 필요한 최소 남은 시간 (전체 budget 대비 비율)
+STAGE_RESERVES = {
+    'research_body': 0.6,
+    'board_crawl': 0.2,
+    'post_body': 0.1,
+    'history_compare': 0.05,
+}
+DEFAULT_RESERVE = 0.0
+SKIP_SAMPLES = 10 # 단계별로 남길 건너뛴 항목 예시 수
+
+
+class Budget:
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._skipped = {}
+
+    @property
+    def enabled(self):
+        return self.seconds is not None
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def remaining(self):
+        if self.seconds is None:
+            return float('inf')
+        return self.seconds - self.elapsed()
+
+    def allow(self, stage):
+        """True if `stage` may start now (always True without a budget)."""
+        if self.seconds is None:
+            return True
+        return self.remaining() > self.seconds * STAGE_RESERVES.get(stage, DEFAULT_RESERVE)
+
+    def skip(self, stage, item=None, count=1):
+        with self._lock:
+            entry = self._skipped.setdefault(stage, {'count': 0, 'items': []})
+            entry['count'] += count
+            if item is not None and len(entry['items']) < SKIP_SAMPLES:
+                entry['items'].append(item)
+
+    def skipped(self):
+        with self._lock:
+            return {stage: {'count': e['count'], 'items': list(e['items'])} for stage, e in self._skipped.items()}
+
+    def summary(self):
+        skipped = self.skipped()
+        return {
+            'seconds': self.seconds,
+            'elapsed': round(self.elapsed(), 1),
+            'degraded': bool(skipped),
+            'skipped': skipped,
+        }
+
+
+# Process-wide budget (scraper.py --budget 으로 시작)
+BUDGET = Budget(None)
+
+
+def start(seconds):
+    """Starts the process-wide budget now. seconds=None disables it."""
+    global BUDGET
+    BUDGET = Budget(seconds)
+    return BUDGET
+
+
+def allow(stage):
+    return BUDGET.allow(stage)
+
+
+def skip(stage, item=None, count=1):
+    BUDGET.skip(stage, item, count)
+
+
+def enabled():
+    return BUDGET.enabled
+
+
+def summary():
+    return BUDGET.summary()
@@ -0,0 +1,63 @@
+"""
+Process-wide clock that can be pinned for offline replay runs.
+
+평소에는 실제 시간을 그대로 반환하고, pin()으로 고정하면 모든 호출이 같은 시각을 반환합니다.
+(녹화된 HTTP cassette 재생 시 녹화 당시 시각으로 고정 -> 08:00 기준 카운팅, 임계값, 스냅샷 슬롯이 재현됨)
+
+- STOCKBOT_CLOCK="2025-12-26T01:05:00" (UTC, ISO) 환경변수로 직접 고정할 수도 있습니다.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+KST_OFFSET = timedelta(hours=9)
+
+_pinned_utc = None
+_local_offset = None # 고정 시 사용할 '로컬 시간 - UTC' (녹화한 머신 기준)
+
+
+def _system_local_offset():
+    now = datetime.now()
+    return timedelta(seconds=round((now - datetime.utcnow()).total_seconds() / 60) * 60)
+
+
+def pin(utc, local_offset=None):
+    """Freezes the clock at naive UTC datetime `utc` (local_offset defaults to this machine's)."""
+    global _pinned_utc, _local_offset
+    _pinned_utc = utc
+    _local_offset = local_offset if local_offset is not None else _system_local_offset()
+
+
+def unpin():
+    global _pinned_utc, _local_offset
+    _pinned_utc = None
+    _local_offset = None
+
+
+def is_pinned():
+    return _pinned_utc is not None
+
+
+def utcnow():
+    if _pinned_utc is not None:
+        return _pinned_utc
+    return datetime.utcnow()
+
+
+def now():
+    """Local wall-clock time (drop-in for datetime.now())."""
+    if _pinned_utc is not None:
+        return _pinned_utc + _local_offset
+    return datetime.now()
+
+
+def kst_now():
+    return utcnow() + KST_OFFSET
+
+
+def local_offset():
+    return _local_offset if _local_offset is not None else _system_local_offset()
+
+
+if os.environ.get('STOCKBOT_CLOCK'):
+    pin(datetime.fromisoformat(os.environ['STOCKBOT_CLOCK']))
@@ -0,0 +1,94 @@
+"""
+Per-run code-set index for the consecutive-capture check.
+
+실행마다 통과 종목 코드만 거래일/슬롯별로 data/code_index.json 에 기록합니다.
+다음 거래일의 연속 포착 판단은 엑셀/CSV를 열지 않고 이 작은 파일만 읽습니다.
+
+    {"2025-12-24": {"1000": ["008350", ...], "1500": [...]}, "2025-12-26": {...}}
+
+최근 KEEP_DAYS 거래일만 유지합니다.
+기존 이력으로 다시 만들기:  python src/code_index.py rebuild
+"""
+
+import argparse
+import json
+import os
+import sys
+
+try:
+    from src import history_store, trading_calendar
+except ImportError: # executed directly from src/
+    import history_store
+    import trading_calendar
+
+DEFAULT_PATH = os.path.join('data', 'code_index.json')
+KEEP_DAYS = 30
+
+
+def load(path=DEFAULT_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"[CodeIndex] Failed to load {path}: {e}")
+        return {}
+
+
+def _save(index, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def record(trade_date, slot, codes, path=DEFAULT_PATH, keep_days=KEEP_DAYS):
+    """Stores the codes kept by the run at (trade_date, slot), replacing an earlier run in the same slot."""
+    index = load(path)
+    index.setdefault(trade_date, {})[slot] = sorted({str(c).zfill(6) for c in codes})
+    for old in sorted(index)[:-keep_days]:
+        del index[old]
+    _save(index, path)
+
+
+def session_codes(trade_date, index=None, path=DEFAULT_PATH):
+    """Codes of the last run (latest slot) on `trade_date`, or None if that date was never indexed."""
+    slots = (index if index is not None else load(path)).get(trade_date)
+    if not slots:
+        return None
+    return set(slots[max(slots)])
+
+
+def previous_session_codes(today, path=DEFAULT_PATH):
+    """Codes of the last run on the trading day before `today` ('YYYY-MM-DD'). Returns (date, codes or None)."""
+    previous = trading_calendar.previous_trading_day(today)
+    return previous, session_codes(previous, path=path)
+
+
+def rebuild(path=DEFAULT_PATH, history_dir=history_store.DEFAULT_DIR, keep_days=KEEP_DAYS):
+    """Recreates the index from the history store (last run per trading date and slot)."""
+    history = history_store.read(columns=['run_at', 'code'], directory=history_dir)
+    index = {}
+    for run_at, rows in history.sort_values('run_at', kind='mergesort').groupby('run_at', sort=True):
+        slot = trading_calendar.session_slot(run_at.hour)
+        index.setdefault(run_at.strftime('%Y-%m-%d'), {})[slot] = sorted(set(rows['code']))
+    for old in sorted(index)[:-keep_days]:
+        del index[old]
+    _save(index, path)
+    print(f"[CodeIndex] Rebuilt {sum(len(s) for s in index.values())} runs over {len(index)} trading dates into {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-run code-set index")
+    parser.add_argument('command', choices=['rebuild'])
+    parser.add_argument('--path', default=DEFAULT_PATH)
+    parser.add_argument('--history-dir', default=history_store.DEFAULT_DIR)
+    args = parser.parse_args(argv)
+    rebuild(args.path, args.history_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Deferred, streaming Excel export.
+
+scraper 실행 중에는 엑셀을 쓰지 않고 이력(data/history)과 JSON만 저장합니다.
+엑셀은 필요할 때(워크플로의 별도 단계, 주간/월간 리포트, 수동 실행) 이력에서 만들어집니다.
+openpyxl write_only 모드로 행 단위 스트리밍 저장하므로 한 달치 리포트도 메모리 사용량이 일정합니다.
+
+    python src/excel_export.py reports                # reports.json 항목 중 아직 없는 엑셀 생성
+    python src/excel_export.py run "2025-12-26 14:59:32" trending_integrated_20251226_055932.xlsx
+    python src/excel_export.py range 2025-12-01 2025-12-31 December.xlsx
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+from openpyxl import Workbook
+
+try:
+    from src import history_store
+except ImportError: # executed directly from src/
+    import history_store
+
+REPORTS_FILE = os.path.join('data', 'reports.json')
+
+
+def _cell(value):
+    """pandas/numpy scalar -> plain Python value openpyxl can write (NA -> empty cell)."""
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, float) and value != value:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value.item() if hasattr(value, 'item') else value
+
+
+def write_frames(frames, path, sheet_name='Sheet1'):
+    """
+    Streams DataFrames (an iterable, e.g. one per history partition) into one sheet.
+    The header comes from the first frame; only one frame is held in memory at a time.
+    Returns the number of data rows written.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    columns = None
+    rows = 0
+    for frame in frames:
+        if columns is None:
+            columns = list(frame.columns)
+            ws.append(columns)
+        for row in frame[columns].itertuples(index=False, name=None):
+            ws.append([_cell(v) for v in row])
+            rows += 1
+    if columns is None:
+        ws.append([])
+    tmp_path = path + '.tmp'
+    wb.save(tmp_path)
+    os.replace(tmp_path, path)
+    return rows
+
+
+def write_frame(df, path, sheet_name='Sheet1'):
+    return write_frames([df], path, sheet_name)
+
+
+def export_run(run_at, path, directory=history_store.DEFAULT_DIR):
+    """Writes one scraper run (KST run_at) from the history store in the run's report layout."""
+    run_at = pd.Timestamp(run_at).floor('s')
+    trade_date = run_at.strftime('%Y-%m-%d')
+    rows = history_store.read(trade_date, trade_date, directory=directory)
+    rows = rows[rows['run_at'] == run_at]
+    if rows.empty:
+        print(f"[Excel] No history rows for run {run_at}")
+        return 0
+    written = write_frame(history_store.to_report_frame(rows).drop(columns=['수집시각']), path)
+    print(f"[Excel] {path} ({written} rows)")
+    return written
+
+
+def export_range(start, end, path, directory=history_store.DEFAULT_DIR):
+    """Writes every run between start and end (trading dates, inclusive), one partition at a time."""
+    frames = (history_store.to_report_frame(history_store.read(d, d, directory=directory))
+              for d in history_store.partition_dates(directory) if start <= d <= end)
+    written = write_frames(frames, path)
+    print(f"[Excel] {path} ({written} rows, {start} ~ {end})")
+    return written
+
+
+def export_pending_reports(reports_file=REPORTS_FILE, directory=history_store.DEFAULT_DIR, output_dir='.'):
+    """Creates the Excel files listed in reports.json that do not exist yet (entries carrying run_at)."""
+    if not os.path.exists(reports_file):
+        return 0
+    with open(reports_file, 'r', encoding='utf-8') as f:
+        reports = json.load(f)
+    created = 0
+    for entry in reports:
+        path = os.path.join(output_dir, entry.get('filename', ''))
+        if not entry.get('run_at') or os.path.exists(path):
+            continue
+        try:
+            if export_run(entry['run_at'], path, directory):
+                created += 1
+        except Exception as e:
+            print(f"[Excel] Failed to export {path}: {e}")
+    print(f"[Excel] Created {created} pending report files")
+    return created
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Excel export from the run history")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('reports', help="create missing Excel files listed in data/reports.json")
+    p.add_argument('--reports-file', default=REPORTS_FILE)
+    r = sub.add_parser('run', help="export one run")
+    r.add_argument('run_at', help="KST 'YYYY-MM-DD HH:MM:SS'")
+    r.add_argument('output')
+    g = sub.add_parser('range', help="export all runs between two trading dates")
+    g.add_argument('start')
+    g.add_argument('end')
+    g.add_argument('output')
+    for sp in (p, r, g):
+        sp.add_argument('--dir', default=history_store.DEFAULT_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == 'reports':
+        export_pending_reports(args.reports_file, args.dir)
+    elif args.command == 'run':
+        export_run(args.run_at, args.output, args.dir)
+    else:
+        export_range(args.start, args.end, args.output, args.dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
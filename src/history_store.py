@@ -0,0 +1,255 @@
+"""
+Append-only run history partitioned by trading date.
+
+실행마다 루트에 trending_integrated_YYYYMMDD_HHMMSS.csv 를 새로 만드는 대신,
+분석 결과를 거래일별 파일 하나(data/history/YYYY-MM-DD.csv.gz)에 이어 붙입니다.
+(gzip member 단위 append라 기존 내용은 다시 쓰지 않으며, git diff도 해당 거래일 파일만 바뀜)
+
+- 컬럼 타입은 SCHEMA로 고정 (code는 항상 6자리 문자열, 가격/게시글 수는 정수, 등락률/비중은 % 없는 실수)
+- 조회(read, previous_run)는 파일명으로 필요한 거래일 파일만 골라 읽습니다.
+- 기존 CSV 이전:  python src/history_store.py migrate [--delete]
+- 조회:          python src/history_store.py query --start 2025-12-22 --end 2025-12-26 --code 008350
+"""
+
+import argparse
+import glob
+import gzip
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+DEFAULT_DIR = os.path.join('data', 'history')
+PARTITION_SUFFIX = '.csv.gz'
+
+# column -> dtype (run_at은 KST 'YYYY-MM-DD HH:MM:SS')
+SCHEMA = {
+    'run_at': 'datetime',
+    'trade_date': 'str',
+    'market': 'str',
+    'code': 'str',
+    'name': 'str',
+    'price': 'Int64',
+    'prev_close': 'Int64',
+    'change_rate': 'float',
+    'foreign_rate': 'float',
+    'prev_foreign_rate': 'float',
+    'recent_posts_count': 'Int64',
+    'sentiment': 'str',
+    'sentiment_score': 'float', # Positive (70%) -> 0.7, Negative (60%) -> -0.6, Mixed/Neutral -> 0
+    'top_keywords': 'str',
+    'posts_summary': 'str',
+    'is_last_captured': 'boolean',
+}
+
+# 리포트(엑셀)용 한글 컬럼명 (analyzer.analyze_discussion_trend의 col_map과 동일)
+KOREAN_LABELS = {
+    'market': '시장구분',
+    'name': '종목명',
+    'price': '현재가',
+    'foreign_rate': '현재_외국인비중',
+    'prev_close': '어제_종가',
+    'prev_foreign_rate': '어제_외국인비중',
+    'change_rate': '등락률',
+    'recent_posts_count': '당일_게시글수',
+    'posts_summary': '게시물_요약',
+    'sentiment': '감정분석',
+    'top_keywords': 'Top_Keyword',
+    'is_last_captured': '연속_등록',
+}
+
+_SENTIMENT_PATTERN = re.compile(r'^(Positive|Negative) \((\d+)%\)')
+_LEGACY_FILE_PATTERN = re.compile(r'_(\d{8})_(\d{6})\.csv$')
+
+
+def partition_path(trade_date, directory=DEFAULT_DIR):
+    return os.path.join(directory, f"{trade_date}{PARTITION_SUFFIX}")
+
+
+def partition_dates(directory=DEFAULT_DIR):
+    """Trading dates ('YYYY-MM-DD') that have a partition, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len(PARTITION_SUFFIX)] for name in os.listdir(directory) if name.endswith(PARTITION_SUFFIX))
+
+
+def sentiment_score(label):
+    if not isinstance(label, str):
+        return float('nan')
+    match = _SENTIMENT_PATTERN.match(label)
+    if not match:
+        return 0.0 if label in ('Mixed', 'Neutral') else float('nan')
+    value = int(match.group(2)) / 100
+    return value if match.group(1) == 'Positive' else -value
+
+
+def _number(series):
+    """'1,310' / '+29.96%' / 1310 -> float (NaN if not numeric)."""
+    text = series.astype(str).str.replace(',', '', regex=False).str.replace('%', '', regex=False).str.strip()
+    return pd.to_numeric(text, errors='coerce')
+
+
+def normalize(df, run_at):
+    """Converts an analysis result (English or Korean column names) into SCHEMA-typed rows."""
+    df = df.rename(columns={label: col for col, label in KOREAN_LABELS.items()})
+    out = pd.DataFrame(index=df.index)
+    out['run_at'] = pd.Timestamp(run_at).floor('s')
+    out['trade_date'] = out['run_at'].dt.strftime('%Y-%m-%d')
+    for col in ('market', 'name', 'sentiment', 'top_keywords', 'posts_summary'):
+        out[col] = df[col].astype('string') if col in df.columns else pd.NA
+    out['code'] = df['code'].astype(str).str.zfill(6) if 'code' in df.columns else pd.NA
+    for col, dtype in SCHEMA.items():
+        if dtype in ('Int64', 'float') and col != 'sentiment_score':
+            values = _number(df[col]) if col in df.columns else pd.Series(float('nan'), index=df.index)
+            out[col] = values.round().astype('Int64') if dtype == 'Int64' else values.astype(float)
+    out['sentiment_score'] = out['sentiment'].map(sentiment_score).astype(float)
+    if 'is_last_captured' in df.columns:
+        out['is_last_captured'] = df['is_last_captured'].map(
+            lambda v: str(v).strip().lower() == 'true' if pd.notna(v) else pd.NA).astype('boolean')
+    else:
+        out['is_last_captured'] = pd.array([pd.NA] * len(df), dtype='boolean')
+    return out[list(SCHEMA)].reset_index(drop=True)
+
+
+def _pandas_dtype(dtype):
+    return {'str': 'string', 'datetime': 'datetime64[ns]'}.get(dtype, dtype)
+
+
+def _empty_frame(columns=None):
+    return pd.DataFrame({c: pd.Series(dtype=_pandas_dtype(t)) for c, t in SCHEMA.items()
+                         if columns is None or c in columns})
+
+
+def _read_partition(path, columns=None):
+    usecols = None if columns is None else [c for c in SCHEMA if c in set(columns) | {'run_at'}]
+    dtypes = {c: _pandas_dtype(t) for c, t in SCHEMA.items()
+              if t != 'datetime' and (usecols is None or c in usecols)}
+    return pd.read_csv(path, compression='gzip', dtype=dtypes, usecols=usecols, parse_dates=['run_at'],
+                       keep_default_na=False, na_values=[''])
+
+
+def append_run(df, run_at, directory=DEFAULT_DIR):
+    """
+    Appends one run's results to its trading-date partition. Returns the rows written (0 if the
+    same run_at is already stored, so re-running a migration or a resumed run does not duplicate).
+    """
+    rows = normalize(df, run_at)
+    if rows.empty:
+        return 0
+    path = partition_path(rows['trade_date'].iloc[0], directory)
+    exists = os.path.exists(path)
+    if exists and (_read_partition(path, ['run_at'])['run_at'] == rows['run_at'].iloc[0]).any():
+        return 0
+    os.makedirs(directory, exist_ok=True)
+    text = rows.to_csv(index=False, header=not exists, date_format='%Y-%m-%d %H:%M:%S')
+    with open(path, 'ab') as f:
+        # 새 gzip member를 덧붙임 (gzip/pandas는 여러 member를 이어서 읽음)
+        with gzip.GzipFile(fileobj=f, mode='wb', mtime=0) as gz:
+            gz.write(text.encode('utf-8'))
+    return len(rows)
+
+
+def read(start=None, end=None, codes=None, markets=None, columns=None, directory=DEFAULT_DIR):
+    """
+    Rows with start <= trade_date <= end ('YYYY-MM-DD', inclusive; None = open ended),
+    optionally limited to `codes` / `markets`. Only the matching partitions are opened.
+    """
+    frames = []
+    needed = None if columns is None else set(columns) | ({'code'} if codes else set()) | ({'market'} if markets else set())
+    for trade_date in partition_dates(directory):
+        if (start and trade_date < start) or (end and trade_date > end):
+            continue
+        frame = _read_partition(partition_path(trade_date, directory), needed)
+        if codes:
+            frame = frame[frame['code'].isin({str(c).zfill(6) for c in codes})]
+        if markets:
+            frame = frame[frame['market'].isin(set(markets))]
+        frames.append(frame)
+    if not frames:
+        return _empty_frame(columns)
+    result = pd.concat(frames, ignore_index=True)
+    return result if columns is None else result[[c for c in columns if c in result.columns]]
+
+
+def previous_run(trade_date, directory=DEFAULT_DIR, columns=None):
+    """
+    Rows of the run to compare a new run on `trade_date` against: the last run of the most
+    recent earlier trading date, or else the latest earlier run on the same date. Empty if none.
+    The result always includes run_at.
+    """
+    dates = partition_dates(directory)
+    earlier = [d for d in dates if d < trade_date]
+    target = earlier[-1] if earlier else (trade_date if trade_date in dates else None)
+    if target is None:
+        return _empty_frame(None if columns is None else set(columns) | {'run_at'})
+    frame = _read_partition(partition_path(target, directory), columns)
+    return frame[frame['run_at'] == frame['run_at'].max()].reset_index(drop=True) # columns + run_at
+
+
+def to_report_frame(df):
+    """Korean-labelled columns for Excel reports (run_at -> '수집시각')."""
+    cols = ['run_at', 'market', 'code'] + [c for c in KOREAN_LABELS if c not in ('market',) and c in df.columns]
+    return df[[c for c in cols if c in df.columns]].rename(columns=dict(KOREAN_LABELS, run_at='수집시각'))
+
+
+# --- Migration from timestamped CSV files ---
+def migrate(pattern='trending_*.csv', shift_hours=9, delete=False, directory=DEFAULT_DIR):
+    """
+    Imports legacy trending_*_YYYYMMDD_HHMMSS.csv files. Their timestamps are the runner's local
+    time (UTC on GitHub Actions), so shift_hours=9 converts them to KST run_at.
+    """
+    files = sorted(glob.glob(pattern))
+    imported = 0
+    for path in files:
+        match = _LEGACY_FILE_PATTERN.search(os.path.basename(path))
+        if not match:
+            print(f"[History] Skipping {path}: no timestamp in file name")
+            continue
+        run_at = datetime.strptime(match.group(1) + match.group(2), '%Y%m%d%H%M%S') + timedelta(hours=shift_hours)
+        try:
+            df = pd.read_csv(path, dtype={'code': str})
+        except Exception as e:
+            print(f"[History] Skipping {path}: {e}")
+            continue
+        written = append_run(df, run_at, directory)
+        imported += written
+        print(f"[History] {path} -> {partition_path(run_at.strftime('%Y-%m-%d'), directory)} ({written} rows)")
+        if delete:
+            os.remove(path)
+    print(f"[History] Migrated {len(files)} files, {imported} rows into {directory}")
+    return imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trading-date partitioned run history")
+    sub = parser.add_subparsers(dest='command', required=True)
+    m = sub.add_parser('migrate', help="import legacy trending_*.csv files")
+    m.add_argument('--pattern', default='trending_*.csv')
+    m.add_argument('--shift-hours', type=int, default=9, help="hours added to file-name timestamps (UTC runner -> KST)")
+    m.add_argument('--delete', action='store_true', help="remove each CSV after importing it")
+    q = sub.add_parser('query', help="print rows by date range / code")
+    q.add_argument('--start')
+    q.add_argument('--end')
+    q.add_argument('--code', action='append')
+    d = sub.add_parser('dates', help="list stored trading dates")
+    for p in (m, q, d):
+        p.add_argument('--dir', default=DEFAULT_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == 'migrate':
+        migrate(args.pattern, args.shift_hours, args.delete, args.dir)
+    elif args.command == 'query':
+        df = read(args.start, args.end, codes=args.code, directory=args.dir)
+        with pd.option_context('display.max_rows', 200, 'display.width', 200):
+            print(df[['run_at', 'market', 'code', 'name', 'price', 'change_rate', 'recent_posts_count',
+                      'sentiment_score']])
+    else:
+        for trade_date in partition_dates(args.dir):
+            print(trade_date)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
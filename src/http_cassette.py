@@ -0,0 +1,211 @@
+"""
+Record/replay cassette for the shared HTTP client.
+
+STOCKBOT_HTTP_MODE 환경변수로 동작을 선택합니다.
+- live   : 기본값, 실제 요청만 보냄
+- record : 실제 요청을 보내고 요청/응답(URL, 헤더, 상태코드, 본문 bytes)을 cassette에 저장
+- replay : 네트워크 없이 cassette에서 응답을 돌려줌 (없는 요청은 CassetteMiss 예외)
+           녹화 시작 시각으로 src.clock을 고정하므로 전체 파이프라인이 오프라인에서 결정적으로 재실행됩니다.
+
+Cassette는 sqlite 파일 하나(STOCKBOT_CASSETTE, 기본 .cache/http_cassette.sqlite)이며,
+본문은 sha1 기준으로 한 번만 zlib 압축 저장합니다. 같은 요청이 여러 번 녹화되면 순서대로 재생하고,
+녹화 횟수보다 많이 요청되면 마지막 응답을 반복합니다.
+
+    STOCKBOT_HTTP_MODE=record python scraper.py   # 1회 녹화
+    STOCKBOT_HTTP_MODE=replay python scraper.py   # 오프라인 재생 (벤치마크/회귀 기준)
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timedelta
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    from src import clock
+except ImportError: # executed directly from src/
+    import clock
+
+MODES = ('live', 'record', 'replay')
+DEFAULT_PATH = os.environ.get('STOCKBOT_CASSETTE') or os.path.join(
+    os.environ.get('STOCKBOT_CACHE_DIR', '.cache'), 'http_cassette.sqlite')
+
+# 텔레그램 봇 토큰 등 비밀값은 cassette에 남기지 않음 (재생 시에도 같은 규칙으로 키 생성)
+_REDACTIONS = [
+    (re.compile(r'/bot[^/]+/'), '/bot<token>/'),
+]
+_SKIP_REQUEST_HEADERS = {'authorization', 'cookie'}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS bodies (sha1 TEXT PRIMARY KEY, data BLOB);
+CREATE TABLE IF NOT EXISTS interactions (
+    key TEXT, seq INTEGER, method TEXT, url TEXT, request_headers TEXT,
+    status INTEGER, reason TEXT, response_headers TEXT, body_sha1 TEXT,
+    PRIMARY KEY (key, seq)
+);
+"""
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def _redact(url):
+    for pattern, replacement in _REDACTIONS:
+        url = pattern.sub(replacement, url)
+    return url
+
+
+def request_key(method, url, data=None, json_body=None):
+    """Stable key for (method, url, body). Query strings are part of the URL."""
+    digest = hashlib.sha1()
+    digest.update(method.upper().encode())
+    digest.update(_redact(url).encode('utf-8'))
+    if json_body is not None:
+        digest.update(json.dumps(json_body, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    elif data is not None:
+        if isinstance(data, dict):
+            data = json.dumps(data, sort_keys=True, ensure_ascii=False)
+        digest.update(data if isinstance(data, bytes) else str(data).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class Cassette:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._replay_seq = {}
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    def meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+            self._conn.commit()
+
+    def start_recording(self):
+        """Clears previous interactions and stores the clock the replay will be pinned to."""
+        with self._lock:
+            self._conn.execute("DELETE FROM interactions")
+            self._conn.execute("DELETE FROM bodies")
+            self._conn.execute("DELETE FROM meta")
+            self._conn.commit()
+        self.set_meta('recorded_at_utc', clock.utcnow().isoformat())
+        self.set_meta('local_offset_seconds', str(int(clock.local_offset().total_seconds())))
+
+    def pin_clock(self):
+        recorded_at = self.meta('recorded_at_utc')
+        if not recorded_at:
+            return None
+        offset = timedelta(seconds=int(self.meta('local_offset_seconds', '0')))
+        clock.pin(datetime.fromisoformat(recorded_at), local_offset=offset)
+        return recorded_at
+
+    def record(self, key, method, url, request_headers, response):
+        body = response.content or b''
+        sha1 = hashlib.sha1(body).hexdigest()
+        headers = {k: v for k, v in (request_headers or {}).items() if k.lower() not in _SKIP_REQUEST_HEADERS}
+        with self._lock:
+            seq = self._conn.execute("SELECT COUNT(*) FROM interactions WHERE key = ?", (key,)).fetchone()[0]
+            self._conn.execute("INSERT OR IGNORE INTO bodies (sha1, data) VALUES (?, ?)",
+                               (sha1, zlib.compress(body, 6)))
+            self._conn.execute(
+                "INSERT INTO interactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, seq, method.upper(), _redact(url), json.dumps(headers, ensure_ascii=False),
+                 response.status_code, response.reason or '', json.dumps(dict(response.headers)), sha1))
+            self._conn.commit()
+            self.recorded += 1
+
+    def replay(self, key, method, url):
+        with self._lock:
+            seq = self._replay_seq.get(key, 0)
+            row = self._conn.execute(
+                "SELECT i.status, i.reason, i.response_headers, b.data FROM interactions i "
+                "JOIN bodies b ON b.sha1 = i.body_sha1 WHERE i.key = ? AND i.seq <= ? "
+                "ORDER BY i.seq DESC LIMIT 1", (key, seq)).fetchone()
+            if row is None:
+                self.misses += 1
+                raise CassetteMiss(f"Not in cassette: {method.upper()} {_redact(url)}")
+            self._replay_seq[key] = seq + 1
+            self.hits += 1
+
+        status, reason, headers_json, data = row
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(json.loads(headers_json))
+        # 저장된 본문은 이미 디코딩(gzip 등)된 bytes이므로 인코딩 관련 헤더 제거
+        response.headers.pop('Content-Encoding', None)
+        response._content = zlib.decompress(data)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = url
+        return response
+
+    def stats(self):
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM interactions").fetchone()[0]
+            stored = self._conn.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM bodies").fetchone()[0]
+        return {'interactions': count, 'stored_bytes': stored,
+                'hits': self.hits, 'misses': self.misses, 'recorded': self.recorded}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_mode = 'live'
+_cassette = None
+
+
+def use(mode, path=DEFAULT_PATH):
+    """Switches the process to live/record/replay. Returns the active Cassette (None for live)."""
+    global _mode, _cassette
+    if mode not in MODES:
+        raise ValueError(f"Unknown HTTP mode: {mode} (choose from {MODES})")
+    if _cassette is not None:
+        _cassette.close()
+        _cassette = None
+
+    _mode = mode
+    if mode == 'live':
+        clock.unpin()
+        return None
+
+    _cassette = Cassette(path)
+    if mode == 'record':
+        _cassette.start_recording()
+        print(f"[Cassette] Recording HTTP traffic to {path}")
+    else:
+        recorded_at = _cassette.pin_clock()
+        print(f"[Cassette] Replaying {_cassette.stats()['interactions']} interactions from {path} "
+              f"(clock pinned to {recorded_at} UTC)")
+    return _cassette
+
+
+def mode():
+    return _mode
+
+
+def active():
+    return _cassette
+
+
+if os.environ.get('STOCKBOT_HTTP_MODE', 'live') != 'live':
+    use(os.environ['STOCKBOT_HTTP_MODE'])
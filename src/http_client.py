@@ -0,0 +1,217 @@
+"""
+Shared HTTP client for every StockBot fetcher (scraper, research, PDF, Telegram).
+
+- 프로세스 전체에서 하나의 requests.Session을 공유 (Keep-Alive 커넥션 풀링)
+- 호스트별 풀 크기 설정 (finance.naver.com은 워커 수만큼 동시 연결)
+- 기본 타임아웃 (타임아웃 없는 요청으로 실행이 멈추는 것을 방지)
+- 재시도 + 지수 백오프 (GET 등 멱등 요청만 기본 재시도)
+- 모든 시도는 rate_governor(호스트별 적응형 토큰 버킷)를 거침
+- STOCKBOT_HTTP_MODE=record/replay 시 http_cassette로 녹화/재생 (재생은 네트워크·governor 미사용)
+- STOCKBOT_NAVER_BASE 지정 시 finance.naver.com 요청을 해당 주소(로컬 stand-in 서버 등)로 보냄
+- add_hook()으로 모든 시도의 (URL, 상태, 지연시간 등)를 관찰 (벤치마크/계측용)
+"""
+
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from src import rate_governor, http_cassette
+except ImportError: # executed directly from src/
+    import rate_governor
+    import http_cassette
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+DEFAULT_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7'
+}
+
+DEFAULT_TIMEOUT = (5, 10) # (connect, read) seconds
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.5 # 0.5s, 1s, 2s ...
+RETRY_STATUS = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+# 호스트별 커넥션 풀 크기
+HOST_POOL_SIZES = {
+    'finance.naver.com': 16,
+    'stock.pstatic.net': 4,
+    'ssl.pstatic.net': 4,
+    'api.telegram.org': 2,
+}
+DEFAULT_POOL_SIZE = 4
+
+# origin -> 실제로 요청을 보낼 base URL (governor/cassette는 원래 URL 기준으로 동작)
+BASE_OVERRIDES = {}
+if os.environ.get('STOCKBOT_NAVER_BASE'):
+    BASE_OVERRIDES['https://finance.naver.com'] = os.environ['STOCKBOT_NAVER_BASE'].rstrip('/')
+
+_session = None
+_session_lock = threading.Lock()
+_hooks = []
+
+
+def _build_session():
+    session = requests.Session()
+
+    default_adapter = HTTPAdapter(pool_connections=DEFAULT_POOL_SIZE, pool_maxsize=DEFAULT_POOL_SIZE)
+    session.mount('https://', default_adapter)
+    session.mount('http://', default_adapter)
+
+    # requests는 가장 긴 prefix가 일치하는 adapter를 사용함
+    for host, size in HOST_POOL_SIZES.items():
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+        session.mount(f"https://{host}", adapter)
+        session.mount(f"http://{host}", adapter)
+
+    for origin, base in BASE_OVERRIDES.items():
+        _mount_override(session, origin, base)
+
+    return session
+
+
+def _mount_override(session, origin, base):
+    # 치환된 주소도 원래 호스트와 같은 풀 크기를 사용
+    size = HOST_POOL_SIZES.get(origin.split('://', 1)[-1], DEFAULT_POOL_SIZE)
+    session.mount(base, HTTPAdapter(pool_connections=1, pool_maxsize=size))
+
+
+def get_session():
+    """Returns the process-wide pooled session (created lazily)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def set_base_override(origin, base):
+    """Routes requests for `origin` (e.g. 'https://finance.naver.com') to `base`. base=None removes it."""
+    if base:
+        BASE_OVERRIDES[origin] = base.rstrip('/')
+        if _session is not None:
+            _mount_override(_session, origin, BASE_OVERRIDES[origin])
+    else:
+        BASE_OVERRIDES.pop(origin, None)
+
+
+def _effective_url(url):
+    for origin, base in BASE_OVERRIDES.items():
+        if url.startswith(origin):
+            return base + url[len(origin):]
+    return url
+
+
+def add_hook(fn):
+    """
+    Registers fn(event) called after every attempt.
+    event: method, url, status, error, elapsed, ttfb, wait, bytes, attempt,
+           final (이 시도의 결과가 호출자에게 반환/전파됨), cache ('replay' 또는 None)
+    """
+    _hooks.append(fn)
+
+
+def remove_hook(fn):
+    if fn in _hooks:
+        _hooks.remove(fn)
+
+
+def _notify(**event):
+    for hook in list(_hooks):
+        try:
+            hook(event)
+        except Exception as e:
+            print(f"[HTTP] hook failed: {e}")
+
+
+def _backoff_delay(attempt, response=None):
+    # 429/503의 Retry-After 헤더가 있으면 우선 사용
+    if response is not None:
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return min(float(retry_after), 30.0)
+    return BACKOFF_FACTOR * (2 ** attempt)
+
+
+def request(method, url, headers=None, timeout=None, retries=None, **kwargs):
+    """
+    공용 세션으로 요청을 보냅니다.
+    headers: 기본 헤더(DEFAULT_HEADERS)에 덮어쓸 헤더 (예: Referer)
+    timeout: 미지정 시 DEFAULT_TIMEOUT
+    retries: 미지정 시 멱등 요청(GET 등)은 MAX_RETRIES, 그 외(POST)는 0
+    """
+    method = method.upper()
+    merged_headers = dict(DEFAULT_HEADERS)
+    if headers:
+        merged_headers.update(headers)
+    if timeout is None:
+        timeout = DEFAULT_TIMEOUT
+    if retries is None:
+        retries = MAX_RETRIES if method in IDEMPOTENT_METHODS else 0
+
+    cassette = http_cassette.active()
+    if cassette is not None:
+        key = http_cassette.request_key(method, url, kwargs.get('data'), kwargs.get('json'))
+        if http_cassette.mode() == 'replay':
+            started = time.perf_counter()
+            try:
+                response = cassette.replay(key, method, url)
+            except http_cassette.CassetteMiss as e:
+                if _hooks:
+                    _notify(method=method, url=url, status=None, error=type(e).__name__, elapsed=0.0, ttfb=None,
+                            wait=0.0, bytes=0, attempt=0, final=True, cache='miss')
+                raise
+            if _hooks:
+                elapsed = time.perf_counter() - started
+                _notify(method=method, url=url, status=response.status_code, error=None, elapsed=elapsed,
+                        ttfb=elapsed, wait=0.0, bytes=len(response.content), attempt=0, final=True, cache='replay')
+            return response
+
+    session = get_session()
+    target_url = _effective_url(url)
+    attempt = 0
+    while True:
+        wait = rate_governor.GOVERNOR.acquire(url)
+        started = time.perf_counter()
+        try:
+            response = session.request(method, target_url, headers=merged_headers, timeout=timeout, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            rate_governor.GOVERNOR.record(url, error=e)
+            if _hooks:
+                _notify(method=method, url=url, status=None, error=type(e).__name__,
+                        elapsed=time.perf_counter() - started, ttfb=None, wait=wait, bytes=0,
+                        attempt=attempt, final=attempt >= retries, cache=None)
+            if attempt >= retries:
+                raise
+            time.sleep(_backoff_delay(attempt))
+            attempt += 1
+            continue
+
+        rate_governor.GOVERNOR.record(url, status_code=response.status_code)
+        will_retry = response.status_code in RETRY_STATUS and attempt < retries
+        if _hooks:
+            _notify(method=method, url=url, status=response.status_code, error=None,
+                    elapsed=time.perf_counter() - started, ttfb=response.elapsed.total_seconds(), wait=wait,
+                    bytes=len(response.content), attempt=attempt, final=not will_retry, cache=None)
+        if will_retry:
+            time.sleep(_backoff_delay(attempt, response))
+            attempt += 1
+            continue
+
+        if cassette is not None:
+            cassette.record(key, method, url, merged_headers, response)
+        return response
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
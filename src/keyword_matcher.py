@@ -0,0 +1,122 @@
+"""
+Aho–Corasick multi-keyword matcher for analyzer scoring.
+
+키워드 목록(lexicon)을 한 번 오토마톤으로 컴파일해 두고, 텍스트를 한 글자씩 한 번만 훑어
+모든 키워드 출현(겹치는 것 포함: '폭망' 안의 '망')을 찾습니다.
+키워드 수가 늘어나도 텍스트당 비용은 텍스트 길이에만 비례합니다 (`kw in text` 반복은 키워드 수에 비례).
+단, 키워드가 적을 때는 C로 구현된 `kw in text` 검사가 파이썬 오토마톤보다 빠르므로
+AUTOMATON_MIN_KEYWORDS 미만이면 같은 결과를 substring 검사로 계산합니다.
+(제목 32,000개 기준: 20개 키워드 0.04s vs 0.08s, 110개 0.17s vs 0.08s, 410개 0.45s vs 0.09s)
+
+    matcher = KeywordMatcher({'positive': ['상승', '급등'], 'negative': ['하락', '망']})
+    counts, hits = matcher.score(titles)   # counts: {'positive': 3, 'negative': 1}, hits: Counter({'상승': 2, ...})
+
+점수 규칙은 기존 analyzer와 같습니다: 한 텍스트에 같은 키워드가 여러 번 나와도 1회로 셉니다.
+"""
+
+from collections import Counter, deque
+
+AUTOMATON_MIN_KEYWORDS = 40 # 측정상 교차점 (이보다 적으면 substring 검사가 더 빠름)
+
+
+class KeywordMatcher:
+    def __init__(self, lexicons):
+        """lexicons: {label: [keyword, ...]} (a plain list is treated as one unnamed label)."""
+        if not isinstance(lexicons, dict):
+            lexicons = {None: list(lexicons)}
+        self.labels = list(lexicons)
+        self.keywords = [] # keyword id -> keyword
+        self.keyword_labels = [] # keyword id -> label
+        ids = {}
+        for label, words in lexicons.items():
+            for word in words:
+                if word and (word, label) not in ids:
+                    ids[(word, label)] = len(self.keywords)
+                    self.keywords.append(word)
+                    self.keyword_labels.append(label)
+        self._build()
+
+    def _build(self):
+        # 1. trie
+        goto = [{}]
+        outputs = [set()]
+        for kid, word in enumerate(self.keywords):
+            state = 0
+            for ch in word:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append(set())
+                state = nxt
+            outputs[state].add(kid)
+
+        # 2. failure links (BFS) folded into a full transition table, so matching never backtracks
+        fail = [0] * len(goto)
+        delta = [dict(edges) for edges in goto]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] |= outputs[fail[state]]
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0) if state else 0
+                queue.append(nxt)
+            for ch, nxt in delta[fail[state]].items():
+                delta[state].setdefault(ch, nxt)
+
+        self._delta = delta
+        self._outputs = [tuple(sorted(out)) for out in outputs]
+
+        self.use_automaton = len(self.keywords) >= AUTOMATON_MIN_KEYWORDS
+
+    def find(self, text):
+        """Returns the set of keyword ids present in `text`."""
+        text = text or ''
+        if not self.use_automaton:
+            return {kid for kid, word in enumerate(self.keywords) if word in text}
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        found = set()
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+    def contains_any(self, text):
+        text = text or ''
+        if not self.use_automaton:
+            return any(word in text for word in self.keywords)
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                return True
+        return False
+
+    def score(self, texts):
+        """
+        Scores a group of texts (e.g. one stock's titles).
+        Returns ({label: count}, Counter({keyword: texts containing it})).
+        """
+        hits = Counter()
+        if not self.use_automaton:
+            for kid, word in enumerate(self.keywords):
+                hits[kid] = len([1 for text in texts if word in (text or '')])
+        else:
+            for text in texts:
+                hits.update(self.find(text))
+        counts = {label: 0 for label in self.labels}
+        keyword_hits = Counter()
+        for kid, n in hits.items():
+            counts[self.keyword_labels[kid]] += n
+            keyword_hits[self.keywords[kid]] += n
+        return counts, keyword_hits
+
+    def score_batch(self, groups):
+        """score() for each group of a run (e.g. all stocks' titles), one group at a time. Non-list groups score as empty."""
+        return [self.score(texts if isinstance(texts, (list, tuple)) else []) for texts in groups]
@@ -0,0 +1,64 @@
+"""
+Lazily evaluated record fields with declared dependencies.
+
+종목 보강(상세정보, 토론방, 본문, 연속 포착 등)을 '필드'로 선언해 두고,
+실제로 필요한 필드에 처음 접근할 때만 (의존 필드를 먼저) 계산합니다.
+필터에서 탈락한 종목은 출력용 필드를 계산하지 않으므로 불필요한 요청이 생기지 않습니다.
+
+    FIELDS = FieldRegistry()
+
+    @FIELDS.field('board_stats', deps=['prefilter'])
+    def _board_stats(record):
+        return get_discussion_stats(record.data['code'], first_page=record['prefilter'][1])
+
+    record = LazyRecord(FIELDS, stock, threshold=40)
+    record['board_stats'] # prefilter -> board_stats 순으로 계산
+"""
+
+
+class FieldRegistry:
+    def __init__(self):
+        self.specs = {}
+
+    def field(self, name, deps=()):
+        """Decorator registering `fn(record)` as the resolver of field `name`."""
+        def register(fn):
+            self.specs[name] = (tuple(deps), fn)
+            return fn
+        return register
+
+
+class LazyRecord:
+    def __init__(self, registry, data, **context):
+        self.registry = registry
+        self.data = data # 원본 dict (리스트 단계에서 이미 확보한 값)
+        self.context = context
+        self._values = {}
+        self._resolving = set()
+
+    def __getitem__(self, name):
+        if name in self._values:
+            return self._values[name]
+        if name not in self.registry.specs:
+            return self.data[name]
+        if name in self._resolving:
+            raise RuntimeError(f"Circular field dependency at '{name}'")
+
+        deps, fn = self.registry.specs[name]
+        self._resolving.add(name)
+        try:
+            for dep in deps:
+                self[dep]
+            value = fn(self)
+        finally:
+            self._resolving.discard(name)
+
+        self._values[name] = value
+        return value
+
+    def is_computed(self, name):
+        return name in self._values
+
+    def materialize(self, names):
+        """Computes `names` (and their dependencies) and returns {name: value}."""
+        return {name: self[name] for name in names}
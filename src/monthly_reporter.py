@@ -1,5 +1,4 @@
 import os
-import glob
 import pandas as pd
 from datetime import datetime, timedelta
 import smtplib
@@ -8,6 +7,12 @@ from email.mime.base import MIMEBase
 from email.mime.text import MIMEText
 from email import encoders
 
+try:
+    from src import rollups, excel_export
+except ImportError: # executed directly (python src/monthly_reporter.py)
+    import rollups
+    import excel_export
+
 def send_monthly_report():
     # 1. Determine "Last Month"
     today = datetime.now()
@@ -17,41 +22,22 @@ def send_monthly_report():
     
     print(f"📊 Generating Monthly Report for: {last_month.strftime('%B %Y')}")
     
-    # 2. Find CSVs matching this YM
-    # Filename format: trending_integrated_YYYYMMDD_HHMMSS.csv
-    csv_pattern = f"data/trending_integrated_{target_ym}*.csv"
-    files = glob.glob(csv_pattern)
+    # 2. Load last month's rollup (scraper 실행마다 갱신되는 월간 집계)
+    rollup = rollups.load('monthly', last_month.strftime('%Y-%m'))
     
-    if not files:
-        print(f"❌ No data files found for {target_ym}")
+    if not rollup['stocks']:
+        print(f"❌ No history found for {target_ym}")
         return
 
-    print(f"Found {len(files)} data files.")
-
-    # 3. Combine Data
-    combined_df = pd.DataFrame()
-    for f in files:
-        try:
-            df = pd.read_csv(f)
-            # Extract timestamp from filename for 'Collected At' column
-            # filename example: data/trending_integrated_20251210_195101.csv
-            basename = os.path.basename(f)
-            time_part = basename.split('_')[2] + "_" + basename.split('_')[3].replace('.csv','')
-            # Format: YYYYMMDD_HHMMSS
-            dt = datetime.strptime(time_part, "%Y%m%d_%H%M%S")
-            df['Collected_At'] = dt
-            
-            combined_df = pd.concat([combined_df, df])
-        except Exception as e:
-            print(f"Skipping {f}: {e}")
+    run_count = rollup['runs']
+    print(f"Found {run_count} runs, {len(rollup['stocks'])} stocks.")
 
-    if combined_df.empty:
-        print("❌ Combined DataFrame is empty.")
-        return
+    # 3. Per-stock summary (등장 횟수, 평균 게시글 수, 처음/마지막 포착, 연속 등장 일수)
+    combined_df = rollups.to_frame(rollup)
 
     # 4. Save to Excel
     output_filename = f"StockBot_Report_{target_ym}.xlsx"
-    combined_df.to_excel(output_filename, index=False)
+    excel_export.write_frame(combined_df, output_filename) # streaming (write-only) workbook
     print(f"✅ Excel saved: {output_filename}")
 
     # 5. Email Config
@@ -74,8 +60,8 @@ def send_monthly_report():
         StockBot Monthly Data Report
         
         Period: {last_month.strftime('%Y-%m')}
-        Total Records: {len(combined_df)}
-        Files Processed: {len(files)}
+        Stocks: {len(combined_df)}
+        Runs Processed: {run_count}
         
         Attached is the consolidated Excel file.
         """
@@ -0,0 +1,395 @@
+"""
+Pluggable HTML parsing layer for Naver Finance pages.
+
+페이지 종류별 파서 (반환 dict/list 형식은 기존 scraper 코드와 동일):
+- parse_sise_quant : 거래상위/상승 등 순위 리스트 (sise_quant.naver, sise_rise.naver, table.type_2)
+- parse_frgn       : 투자자별 매매동향 (frgn.naver, '외국인'+'보유율' 테이블)
+- parse_board_list : 종목토론실 목록 (board.naver, table.type2)
+- parse_board_read : 토론실 본문 (board_read.naver, #body)
+- parse_research_read : 리서치 본문 (research/*_read.naver, th.view_sbj 테이블)
+
+Backends (STOCKBOT_PARSER 환경변수로 선택):
+- 'bs4'      : BeautifulSoup(html.parser)로 전체 문서 트리 생성 (기존 방식)
+- 'lxml'     : BeautifulSoup(lxml) 전체 트리 (lxml 설치 시, 없으면 targeted로 대체)
+- 'targeted' : 필요한 요소(table/div)만 문자열에서 잘라내어 그 조각만 파싱 (기본값)
+               요소를 찾지 못하면 bs4 전체 파싱으로 폴백하므로 결과는 항상 동일
+"""
+
+import os
+import re
+from datetime import datetime
+
+from bs4 import BeautifulSoup, UnicodeDammit
+
+try:
+    import lxml # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+BACKENDS = ('bs4', 'lxml', 'targeted')
+DEFAULT_BACKEND = os.environ.get('STOCKBOT_PARSER', 'targeted')
+
+
+def _resolve_backend(backend):
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend} (choose from {BACKENDS})")
+    if backend == 'lxml' and not HAS_LXML:
+        return 'targeted'
+    return backend
+
+
+def _to_text(markup):
+    """bytes는 BeautifulSoup과 같은 방식(UnicodeDammit)으로 한 번만 디코딩."""
+    if isinstance(markup, bytes):
+        return UnicodeDammit(markup, is_html=True).unicode_markup
+    return markup
+
+
+def _full_soup(markup, backend):
+    if backend == 'lxml':
+        return BeautifulSoup(_to_text(markup), 'lxml')
+    return BeautifulSoup(markup, 'html.parser')
+
+
+# --- Targeted extraction helpers ---
+_TAG_PATTERNS = {}
+
+
+def _tag_pattern(tag):
+    pattern = _TAG_PATTERNS.get(tag)
+    if pattern is None:
+        pattern = re.compile(r'<(/?)%s\b' % tag, re.IGNORECASE)
+        _TAG_PATTERNS[tag] = pattern
+    return pattern
+
+
+def _element_end(html, start, tag):
+    """html[start]에서 시작하는 <tag ...>의 짝이 맞는 닫는 태그 끝 위치 (-1: 못 찾음)."""
+    depth = 0
+    for m in _tag_pattern(tag).finditer(html, start):
+        if m.group(1):
+            depth -= 1
+            if depth == 0:
+                close = html.find('>', m.end())
+                return -1 if close < 0 else close + 1
+        else:
+            depth += 1
+    return -1
+
+
+def _slice_first(html, open_pattern, tag):
+    m = open_pattern.search(html)
+    if not m:
+        return None
+    end = _element_end(html, m.start(), tag)
+    if end < 0:
+        return None
+    return html[m.start():end]
+
+
+def _slice_enclosing(html, pos, tag):
+    """pos를 감싸는 가장 가까운 <tag> 요소 조각 (find_parent와 동일)."""
+    starts = [m.start() for m in _tag_pattern(tag).finditer(html, 0, pos) if not m.group(1)]
+    for start in reversed(starts):
+        end = _element_end(html, start, tag)
+        if end > pos:
+            return html[start:end]
+    return None
+
+
+def _fragment(fragment, selector):
+    return BeautifulSoup(fragment, 'html.parser').select_one(selector)
+
+
+def _class_open(tag, cls):
+    return re.compile(r'<%s\b[^>]*\bclass=["\']?[^"\'>]*\b%s\b' % (tag, re.escape(cls)), re.IGNORECASE)
+
+
+_SISE_TABLE_OPEN = _class_open('table', 'type_2')
+_BOARD_TABLE_OPEN = _class_open('table', 'type2')
+_BODY_OPEN = re.compile(r'<(\w+)\b[^>]*\bid=["\']?body["\'\s>]', re.IGNORECASE)
+_VIEW_SBJ = re.compile(r'<th\b[^>]*\bclass=["\']?[^"\'>]*\bview_sbj\b', re.IGNORECASE)
+_TABLE_OPEN = re.compile(r'<table\b', re.IGNORECASE)
+
+
+# --- sise_quant.naver (및 같은 형식의 sise_rise.naver 등 순위 리스트) ---
+# 헤더 이름 -> 필드. 순위 페이지마다 컬럼 구성이 달라 헤더로 위치를 찾음
+_RANKING_NUMERIC_COLUMNS = {
+    '거래량': 'volume',
+    '거래대금': 'trading_value', # 백만원
+    '시가총액': 'market_cap', # 억원
+    'PER': 'per',
+    'ROE': 'roe',
+}
+
+
+def _to_number(text):
+    text = text.replace(',', '').strip()
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            return None # 'N/A' 등
+
+
+def _sise_quant_rows(table, market_type):
+    headers = [th.get_text(strip=True) for th in table.select('th')]
+    extra_columns = [(headers.index(name), field) for name, field in _RANKING_NUMERIC_COLUMNS.items() if name in headers]
+
+    data = []
+    for row in table.select('tr'):
+        cols = row.select('td')
+        if len(cols) < 10:
+            continue
+
+        try:
+            name_tag = cols[1].select_one('a')
+            if not name_tag:
+                continue
+
+            name = name_tag.get_text(strip=True)
+            url_suffix = name_tag['href']
+            code = url_suffix.split('code=')[-1]
+
+            price_str = cols[2].get_text(strip=True).replace(',', '')
+            current_price = int(price_str) if price_str.isdigit() else 0
+
+            # 등락률
+            change_rate = cols[4].get_text(strip=True).strip()
+
+            # 거래상위 리스트 컬럼: 순위, 종목명, 현재가[2], 전일비[3], 등락률[4], 거래량[5], 거래대금[6], 매수호가[7], 매도호가[8], 시가총액[9], PER[10], ROE[11] ...
+            # 전일종가 = 현재가 / (1 + 등락률/100)
+            prev_close = 0
+            try:
+                rate_float = float(change_rate.replace('%', ''))
+                prev_close = int(current_price / (1 + rate_float/100))
+            except:
+                pass
+
+            item = {
+                'market': market_type,
+                'code': code,
+                'name': name,
+                'price': current_price,
+                'prev_close': prev_close, # 계산된 전일 종가 (임시)
+                'change_rate': change_rate
+            }
+            # 리스트 단계에서 이미 있는 값(거래량, 거래대금, 시가총액, PER, ROE)도 보존 -> 추가 요청 없이 우선순위 결정에 사용
+            for index, field in extra_columns:
+                if index < len(cols):
+                    item[field] = _to_number(cols[index].get_text(strip=True))
+            data.append(item)
+
+        except Exception:
+            continue
+    return data
+
+
+def parse_sise_quant(markup, market_type, backend=None):
+    """거래상위 리스트 행 목록. 테이블이 없으면 None."""
+    backend = _resolve_backend(backend)
+    table = None
+    if backend == 'targeted':
+        html = _to_text(markup)
+        fragment = _slice_first(html, _SISE_TABLE_OPEN, 'table')
+        if fragment:
+            table = _fragment(fragment, 'table.type_2')
+        else:
+            backend = 'bs4'
+    if table is None and backend != 'targeted':
+        table = _full_soup(markup, backend).select_one('table.type_2')
+    if not table:
+        return None
+    return _sise_quant_rows(table, market_type)
+
+
+# --- frgn.naver ---
+def _frgn_details(target_table):
+    details = {}
+    # 간단히 tr을 모두 가져와서 td 개수가 많은 행을 데이터로 간주
+    data_rows = [row for row in target_table.select('tr') if len(row.select('td')) > 5]
+
+    # 오늘(0), 어제(1)
+    if len(data_rows) >= 2:
+        cols_today = data_rows[0].select('td')
+        cols_yest = data_rows[1].select('td')
+
+        if len(cols_today) > 0:
+            details['foreign_rate'] = cols_today[-1].get_text(strip=True)
+
+        if len(cols_yest) > 0:
+            details['prev_foreign_rate'] = cols_yest[-1].get_text(strip=True)
+
+            # 어제 종가 (인덱스 1)
+            prev_close_str = cols_yest[1].get_text(strip=True).replace(',', '')
+            if prev_close_str.isdigit():
+                details['prev_close'] = int(prev_close_str)
+    return details
+
+
+def _is_foreign_table(table):
+    text = table.get_text()
+    return '외국인' in text and '보유율' in text
+
+
+def parse_frgn(markup, backend=None):
+    """외국인 보유율(오늘/어제)과 어제 종가. 대상 테이블이 없으면 {}."""
+    backend = _resolve_backend(backend)
+    if backend == 'targeted':
+        html = _to_text(markup)
+        for m in _TABLE_OPEN.finditer(html):
+            end = _element_end(html, m.start(), 'table')
+            if end < 0:
+                break
+            fragment = html[m.start():end]
+            # 속성(summary 등)에만 단어가 있을 수 있으므로 후보만 조각 파싱 후 텍스트로 확인
+            if '보유율' not in fragment or '외국인' not in fragment:
+                continue
+            table = _fragment(fragment, 'table')
+            if table is not None and _is_foreign_table(table):
+                return _frgn_details(table)
+        return {}
+
+    # '보유율' 텍스트 포함된 테이블 찾기
+    for t in _full_soup(markup, backend).select('table'):
+        if _is_foreign_table(t):
+            return _frgn_details(t)
+    return {}
+
+
+# --- board.naver ---
+def _board_rows(table):
+    rows = table.select('tr')
+    if not rows:
+        return None
+
+    posts = []
+    for row in rows:
+        cols = row.select('td')
+        if len(cols) < 5:
+            continue
+
+        try:
+            # 날짜 확인 "2024.05.21 14:30"
+            date_text = cols[0].get_text(strip=True)
+
+            try:
+                post_date = datetime.strptime(date_text, "%Y.%m.%d %H:%M")
+            except ValueError:
+                continue
+
+            title = ""
+            title_tag = row.select_one('a.title')
+            if not title_tag and len(cols) > 1:
+                title_tag = cols[1].select_one('a')
+
+            if title_tag:
+                title = title_tag.get_text(strip=True)
+
+            views = cols[3].get_text(strip=True)
+
+            posts.append((post_date, {
+                'title': title,
+                'date': date_text,
+                'views': views,
+                'likes': cols[4].get_text(strip=True) if len(cols) > 4 else '0',
+                'dislikes': cols[5].get_text(strip=True) if len(cols) > 5 else '0',
+                'link': title_tag['href'] if title_tag else ""
+            }))
+
+        except Exception:
+            continue
+
+    return posts
+
+
+def parse_board_list(markup, backend=None):
+    """[(post_date, post_dict), ...] 최신순. 목록 테이블이 없으면 None."""
+    backend = _resolve_backend(backend)
+    table = None
+    if backend == 'targeted':
+        fragment = _slice_first(_to_text(markup), _BOARD_TABLE_OPEN, 'table')
+        if fragment:
+            table = _fragment(fragment, 'table.type2')
+        else:
+            backend = 'bs4'
+    if table is None and backend != 'targeted':
+        table = _full_soup(markup, backend).select_one('table.type2')
+    if not table:
+        return None
+    return _board_rows(table)
+
+
+# --- board_read.naver ---
+def parse_board_read(markup, backend=None):
+    """게시글 본문 텍스트 (없으면 "")."""
+    backend = _resolve_backend(backend)
+    if backend == 'targeted':
+        html = _to_text(markup)
+        m = _BODY_OPEN.search(html)
+        if m:
+            end = _element_end(html, m.start(), m.group(1))
+            if end > 0:
+                body_tag = _fragment(html[m.start():end], '#body')
+                if body_tag:
+                    return body_tag.get_text("\n", strip=True)
+        backend = 'bs4'
+        markup = html
+
+    soup = _full_soup(markup, backend)
+    # Naver Finance Board Body Selector ('div#body' or 'div.view_se')
+    body_tag = soup.select_one('#body') or soup.select_one('.view_se') or soup.select_one('.scr01')
+    if body_tag:
+        return body_tag.get_text("\n", strip=True)
+    return ""
+
+
+# --- research/*_read.naver ---
+def _largest_td_text(table):
+    tds = table.find_all('td')
+    # Sort by text length
+    tds_sorted = sorted(tds, key=lambda x: len(x.get_text(strip=True)), reverse=True)
+    if tds_sorted:
+        return tds_sorted[0].get_text(separator=" ", strip=True)
+    return None
+
+
+def parse_research_read(markup, backend=None):
+    """리서치 리포트 본문 원문 텍스트 (정제 전, 없으면 "")."""
+    backend = _resolve_backend(backend)
+    if backend == 'targeted':
+        html = _to_text(markup)
+        m = _VIEW_SBJ.search(html)
+        if m:
+            fragment = _slice_enclosing(html, m.start(), 'table')
+            if fragment:
+                table = _fragment(fragment, 'table')
+                text = _largest_td_text(table) if table is not None else None
+                if text is not None:
+                    return text
+        backend = 'bs4'
+        markup = html
+
+    soup = _full_soup(markup, backend)
+
+    # Strategy 1: Find 'view_sbj' TH -> Table -> Largest TD
+    subject_th = soup.find('th', class_='view_sbj')
+    if subject_th:
+        table = subject_th.find_parent('table')
+        if table:
+            text = _largest_td_text(table)
+            if text is not None:
+                return text
+
+    # Strategy 2: Common classes
+    candidates = ['view_con', 'view_content', 'scr01']
+    for cls in candidates:
+        div = soup.find('div', class_=cls)
+        if div:
+            return div.get_text(separator=" ", strip=True)
+
+    return ""
@@ -0,0 +1,273 @@
+"""
+Synthetic Naver Finance stand-in server for load/scale testing.
+
+scraper.py가 읽는 네 종류의 페이지를 실제와 같은 구조(EUC-KR, table.type_2 / table.type2 / #body)로 생성합니다.
+- /sise/sise_quant.naver?sosok=0|1       : 거래상위 (시장당 --stocks 개)
+- /sise/sise_rise.naver?sosok=0|1        : 상승 (같은 종목을 등락률 순으로)
+- /item/frgn.naver?code=                 : 외국인/기관 매매동향
+- /item/board.naver?code=&page=          : 종목토론실 목록 (종목별 게시 속도는 code로 결정되는 로그정규 분포)
+- /item/board_read.naver?code=&nid=      : 게시글 본문
+- /__stats                               : 경로별 요청 수 (JSON)
+
+지연시간(--latency-ms, --slow-rate)과 오류율(--error-rate, 503)을 조절할 수 있습니다.
+모든 값은 (code, 기준시각)으로 결정되므로 같은 설정이면 항상 같은 페이지가 나옵니다.
+
+    python src/naver_standin.py --port 8765 --stocks 200 --latency-ms 80
+    STOCKBOT_NAVER_BASE=http://127.0.0.1:8765 python scraper.py
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+ROWS_PER_PAGE = 20
+
+TITLES = ["오늘 상한가 가즈아", "목표가 상향 호재 떴다", "설거지 조심하세요", "손절할까요", "내일 전망 어떻게 보시나요",
+          "폭락 후 반등 기대", "매수 타이밍 분석", "개미털기 중", "실적 발표 예상", "대박 축하합니다",
+          "세력 매집 끝났나요", "악재 나왔네요", "거래량 터졌다", "물타기 vs 손절", "장 마감 후 공시 확인"]
+BODY_LINES = ["관련 이슈가 오늘 본격적으로 반영되는 것 같습니다.", "목표가는 현재가 대비 30% 정도로 예상하고 있습니다.",
+              "이유는 계열사 정리와 공급사 선정 때문입니다.", "거래량이 평소의 5배 이상 터졌습니다.",
+              "단기 과열이라 조정 올 수도 있습니다.", "다들 성투하세요."]
+
+
+class StandinConfig:
+    def __init__(self, stocks=20, posts_per_hour=10.0, posts_skew=1.0, latency_ms=0.0,
+                 slow_rate=0.0, error_rate=0.0, now=None, seed=0):
+        self.stocks = stocks
+        self.posts_per_hour = posts_per_hour # 종목별 게시 속도의 중앙값
+        self.posts_skew = posts_skew # 로그정규 sigma (클수록 소수 종목에 글이 몰림)
+        self.latency_ms = latency_ms # 평균 응답 지연 (x0.5 ~ x1.5)
+        self.slow_rate = slow_rate # 지연이 10배가 되는 요청 비율
+        self.error_rate = error_rate # 503을 반환하는 요청 비율
+        self.now = now # 게시글 시각 기준 (None이면 요청 시점의 현재 시각)
+        self.seed = seed
+
+
+def _unit(*parts):
+    """Deterministic float in [0, 1) from the given parts."""
+    digest = hashlib.md5(':'.join(str(p) for p in parts).encode()).digest()
+    return int.from_bytes(digest[:8], 'big') / 2 ** 64
+
+
+def _chrome(title, body):
+    nav = "".join(f'<li class="menu{i}"><a href="/sise/menu{i}.naver" class="tab">메뉴 {i}</a></li>' for i in range(60))
+    scripts = "".join(f'<script type="text/javascript">var _cfg{i} = {{"id": {i}, "ad": "banner_{i}"}};</script>\n'
+                      for i in range(40))
+    footer = "".join(f'<p class="copy">네이버 금융 정보는 참고용이며 투자 판단의 책임은 본인에게 있습니다 {i}</p>'
+                     for i in range(25))
+    return (f'<!DOCTYPE html><html lang="ko"><head>'
+            f'<meta http-equiv="Content-Type" content="text/html; charset=euc-kr">'
+            f'<title>{title} : 네이버 금융</title>{scripts}</head><body><div id="wrap">'
+            f'<div id="header"><ul class="gnb">{nav}</ul></div>'
+            f'<table class="layout"><tr><td class="lnb"><ul>{nav}</ul></td><td class="content">'
+            f'<div id="contentarea">{body}</div></td></tr></table>'
+            f'<div id="footer">{footer}</div></div></body></html>')
+
+
+class NaverStandin:
+    """Page generators (pure functions of config + query)."""
+
+    def __init__(self, config):
+        self.config = config
+
+    def now(self):
+        return self.config.now or datetime.now().replace(second=0, microsecond=0)
+
+    @staticmethod
+    def stock_code(sosok, rank):
+        return f"{sosok + 1}{rank:05d}"
+
+    def posts_per_hour(self, code):
+        cfg = self.config
+        # 로그정규: median * exp(sigma * z)
+        z = random.Random(f"{cfg.seed}:{code}").gauss(0, 1)
+        return max(0.5, cfg.posts_per_hour * (2.718281828 ** (cfg.posts_skew * z)))
+
+    def post_time(self, code, index, now, rate):
+        # index가 커질수록 엄격히 과거 (간격 1 +- 0.9)
+        offset_hours = (index + 0.9 * _unit(self.config.seed, code, index)) / rate
+        return now - timedelta(hours=offset_hours)
+
+    def sise_quant(self, sosok, order_by=None):
+        codes = [self.stock_code(sosok, rank) for rank in range(self.config.stocks)]
+        if order_by == 'rate':
+            codes.sort(key=lambda code: _unit(code, 'rate'), reverse=True)
+        rows = []
+        for rank, code in enumerate(codes):
+            price = 1000 + int(_unit(code, 'price') * 200000)
+            rate = (_unit(code, 'rate') - 0.3) * 40
+            rows.append(
+                f'<tr onMouseOver="mouseOver(this)" onMouseOut="mouseOut(this)"><td class="no">{rank + 1}</td>'
+                f'<td><a href="/item/main.naver?code={code}" class="tltle">종목{code}</a></td>'
+                f'<td class="number">{price:,}</td>'
+                f'<td class="number"><img src="ico_up.gif" alt="상승"><span class="tah p11 red02">{abs(int(price * rate / 100)):,}</span></td>'
+                f'<td class="number"><span class="tah p11 red01">{rate:+.2f}%</span></td>'
+                f'<td class="number">{int(_unit(code, "vol") * 10 ** 8):,}</td>'
+                f'<td class="number">{int(_unit(code, "amt") * 10 ** 6):,}</td>'
+                f'<td class="number">{price - 10:,}</td><td class="number">{price + 10:,}</td>'
+                f'<td class="number">{int(_unit(code, "cap") * 400000):,}</td>'
+                f'<td class="number">{_unit(code, "per") * 80:.2f}</td><td class="number">{_unit(code, "roe") * 30:.2f}</td></tr>')
+            if rank % 5 == 4:
+                rows.append('<tr><td colspan="12" class="division_line"></td></tr>')
+        body = ('<div class="box_type_l"><table class="type_2" summary="거래상위"><caption>거래상위</caption>'
+                '<tr><th>N</th><th>종목명</th><th>현재가</th><th>전일비</th><th>등락률</th><th>거래량</th><th>거래대금</th>'
+                '<th>매수호가</th><th>매도호가</th><th>시가총액</th><th>PER</th><th>ROE</th></tr>'
+                + "".join(rows) + '</table></div>')
+        return _chrome("거래상위", body)
+
+    def frgn(self, code):
+        rows = []
+        today = self.now()
+        for d in range(20):
+            day = today - timedelta(days=d)
+            close = 1000 + int(_unit(code, 'close', d) * 200000)
+            rows.append(
+                f'<tr><td class="tc"><span class="tah p10 gray03">{day:%Y.%m.%d}</span></td>'
+                f'<td class="num"><span class="tah p11">{close:,}</span></td>'
+                f'<td class="num"><span class="tah p11 nv01">{int(_unit(code, "chg", d) * 300):,}</span></td>'
+                f'<td class="num"><span class="tah p11 nv01">{(_unit(code, "pct", d) - 0.5) * 10:+.2f}%</span></td>'
+                f'<td class="num"><span class="tah p11">{int(_unit(code, "v", d) * 10 ** 7):,}</span></td>'
+                f'<td class="num"><span class="tah p11 red01">{int((_unit(code, "i", d) - 0.5) * 10 ** 5):+,}</span></td>'
+                f'<td class="num"><span class="tah p11 nv01">{int((_unit(code, "f", d) - 0.5) * 10 ** 5):+,}</span></td>'
+                f'<td class="num"><span class="tah p11">{int(_unit(code, "h", d) * 10 ** 7):,}</span></td>'
+                f'<td class="num"><span class="tah p11">{_unit(code, "fr", d) * 60:.2f}%</span></td></tr>')
+        body = ('<table class="type2" summary="외국인 기관 순매매"><caption>외국인 기관 순매매 거래량</caption>'
+                '<tr><th>날짜</th><th>종가</th><th>전일비</th><th>등락률</th><th>거래량</th><th>기관</th>'
+                '<th colspan="3">외국인</th></tr><tr><th>순매매량</th><th>순매매량</th><th>보유주수</th><th>보유율</th></tr>'
+                + "".join(rows) + '</table>')
+        return _chrome("외국인·기관", body)
+
+    def board(self, code, page):
+        now = self.now()
+        rate = self.posts_per_hour(code)
+        base_nid = 300000000 + int(_unit(code, 'nid') * 10 ** 7)
+        rows = []
+        for index in range((page - 1) * ROWS_PER_PAGE, page * ROWS_PER_PAGE):
+            posted = self.post_time(code, index, now, rate)
+            nid = base_nid - index
+            title = TITLES[int(_unit(code, 't', index) * len(TITLES))]
+            likes = int(_unit(code, 'like', index) ** 3 * 80)
+            rows.append(
+                f'<tr onMouseOver="mouseOver(this)" onMouseOut="mouseOut(this)">'
+                f'<td><span class="tah p10 gray03">{posted:%Y.%m.%d %H:%M}</span></td>'
+                f'<td class="title"><a href="/item/board_read.naver?code={code}&amp;nid={nid}&amp;st=&amp;sw=&amp;page={page}" '
+                f'title="{title}">{title}</a></td>'
+                f'<td class="p11"><span class="gray03">user****</span></td>'
+                f'<td><span class="tah p10 gray03">{int(_unit(code, "view", index) * 5000)}</span></td>'
+                f'<td><strong class="tah p10 red01">{likes}</strong></td>'
+                f'<td><strong class="tah p10 blue01">{int(_unit(code, "dis", index) * 10)}</strong></td></tr>'
+                '<tr><td colspan="6" class="blank_05"></td></tr>')
+        body = ('<table class="type2" summary="종목토론실 게시판 목록입니다."><caption>종목토론실</caption>'
+                '<tr><th>날짜</th><th>제목</th><th>글쓴이</th><th>조회</th><th>공감</th><th>비공감</th></tr>'
+                + "".join(rows) + '</table>')
+        return _chrome("종목토론실", body)
+
+    def board_read(self, code, nid):
+        count = 1 + int(_unit(code, nid, 'len') * 12)
+        lines = [BODY_LINES[int(_unit(code, nid, i) * len(BODY_LINES))] for i in range(count)]
+        body = (f'<table class="view"><tr><th class="title">종목{code} 토론</th></tr>'
+                f'<tr><td><div id="body" class="view_se">{"<br>".join(lines)}</div></td></tr></table>')
+        return _chrome("종목토론실 본문", body)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # keep-alive (실제 서버처럼 커넥션 재사용)
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        cfg = server.standin.config
+        rng = random.Random()
+
+        with server.stats_lock:
+            server.stats[parts.path] = server.stats.get(parts.path, 0) + 1
+
+        if parts.path == '/__stats':
+            return self._send(200, json.dumps(server.stats).encode(), 'application/json')
+
+        delay = cfg.latency_ms / 1000 * rng.uniform(0.5, 1.5)
+        if cfg.slow_rate and rng.random() < cfg.slow_rate:
+            delay *= 10
+        if delay:
+            time.sleep(delay)
+        if cfg.error_rate and rng.random() < cfg.error_rate:
+            return self._send(503, b'Service Unavailable', 'text/plain')
+
+        standin = server.standin
+        try:
+            if parts.path == '/sise/sise_quant.naver':
+                html = standin.sise_quant(int(query.get('sosok', '0')))
+            elif parts.path == '/sise/sise_rise.naver':
+                html = standin.sise_quant(int(query.get('sosok', '0')), order_by='rate')
+            elif parts.path == '/item/frgn.naver':
+                html = standin.frgn(query['code'])
+            elif parts.path == '/item/board.naver':
+                html = standin.board(query['code'], int(query.get('page', '1')))
+            elif parts.path == '/item/board_read.naver':
+                html = standin.board_read(query['code'], int(query['nid']))
+            else:
+                return self._send(404, b'Not Found', 'text/plain')
+        except (KeyError, ValueError):
+            return self._send(400, b'Bad Request', 'text/plain')
+
+        self._send(200, html.encode('cp949', 'replace'), 'text/html; charset=euc-kr')
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(config, host='127.0.0.1', port=0):
+    """Starts the stand-in in a background thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.standin = NaverStandin(config)
+    server.stats = {}
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic Naver Finance stand-in server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help="0 picks a free port")
+    parser.add_argument('--stocks', type=int, default=20, help="rows in each market's sise_quant list")
+    parser.add_argument('--posts-per-hour', type=float, default=10.0, help="median board posts per hour per stock")
+    parser.add_argument('--posts-skew', type=float, default=1.0, help="lognormal sigma of per-stock post rates")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="mean response latency")
+    parser.add_argument('--slow-rate', type=float, default=0.0, help="fraction of responses 10x slower")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of responses returning 503")
+    parser.add_argument('--now', help="fixed local time for post timestamps (ISO, e.g. 2025-12-26T14:30)")
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def config_from_args(args):
+    return StandinConfig(stocks=args.stocks, posts_per_hour=args.posts_per_hour, posts_skew=args.posts_skew,
+                         latency_ms=args.latency_ms, slow_rate=args.slow_rate, error_rate=args.error_rate,
+                         now=datetime.fromisoformat(args.now) if args.now else None, seed=args.seed)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server, base_url = start_server(config_from_args(args), args.host, args.port)
+    print(f"[Standin] Serving synthetic Naver Finance at {base_url}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
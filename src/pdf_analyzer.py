@@ -1,9 +1,13 @@
-import requests
 from io import BytesIO
 import re
 from pypdf import PdfReader
 import pdfplumber
 
+try:
+    from src import http_client
+except ImportError: # executed directly from src/
+    import http_client
+
 # User-Agent for download
 HEADER = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
 
@@ -56,7 +60,7 @@ def clean_pdf_text(text):
 
 def download_pdf(url):
     try:
-        res = requests.get(url, headers=HEADER, timeout=10)
+        res = http_client.get(url, headers=HEADER, timeout=10)
         if res.status_code == 200:
             return BytesIO(res.content)
     except Exception as e:
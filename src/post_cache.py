@@ -0,0 +1,143 @@
+"""
+Persistent cache of deep-dive post bodies keyed by board nid.
+
+인기 글은 10:00 / 13:00 / 15:00 실행에서 반복해서 Deep Dive 대상이 되므로,
+board_read.naver에서 추출한 본문 텍스트를 sqlite 파일(기본 .cache/post_bodies.sqlite)에 저장하고
+다음 실행에서는 요청 없이 재사용합니다.
+
+- 만료: 처음 가져온 지 MAX_AGE_DAYS 지난 본문은 삭제
+- 용량: 본문 합계가 MAX_BYTES를 넘으면 가장 오래 사용하지 않은 것부터 삭제
+- 빈 본문(요청 실패)은 저장하지 않음
+- cassette record/replay 중에는 사용하지 않음 (녹화된 요청 순서가 캐시 상태에 따라 달라지지 않도록)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.environ.get('STOCKBOT_POST_CACHE') or os.path.join(
+    os.environ.get('STOCKBOT_CACHE_DIR', '.cache'), 'post_bodies.sqlite')
+MAX_AGE_DAYS = 7
+MAX_BYTES = 50 * 1024 * 1024
+COMMIT_EVERY = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    nid INTEGER PRIMARY KEY, body TEXT, size INTEGER, fetched_at REAL, last_used REAL
+);
+CREATE INDEX IF NOT EXISTS posts_last_used ON posts (last_used);
+"""
+
+
+class PostBodyCache:
+    def __init__(self, path=DEFAULT_PATH, max_age_days=MAX_AGE_DAYS, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._pending = 0
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = self.evict()
+
+    def get(self, nid):
+        """Returns the cached body for `nid`, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM posts WHERE nid = ?", (nid,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE posts SET last_used = ? WHERE nid = ?", (time.time(), nid))
+            self._mark_dirty()
+            return row[0]
+
+    def put(self, nid, body):
+        if not body:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO posts (nid, body, size, fetched_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (nid, body, len(body.encode('utf-8')), now, now))
+            self.stored += 1
+            self._mark_dirty()
+
+    def _mark_dirty(self):
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self._conn.commit()
+            self._pending = 0
+
+    def evict(self):
+        """Drops expired bodies, then least recently used ones until under max_bytes. Returns rows removed."""
+        with self._lock:
+            cutoff = time.time() - self.max_age_days * 86400
+            removed = self._conn.execute("DELETE FROM posts WHERE fetched_at < ?", (cutoff,)).rowcount
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM posts").fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                doomed = []
+                for nid, size in self._conn.execute("SELECT nid, size FROM posts ORDER BY last_used"):
+                    if excess <= 0:
+                        break
+                    doomed.append((nid,))
+                    excess -= size
+                self._conn.executemany("DELETE FROM posts WHERE nid = ?", doomed)
+                removed += len(doomed)
+            self._conn.commit()
+            self._pending = 0
+        return removed
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM posts").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'stored': self.stored,
+            'evicted': self.evicted,
+            'entries': entries,
+            'bytes': size,
+        }
+
+    def close(self):
+        """Applies eviction, commits and returns the final stats."""
+        self.evicted += self.evict()
+        stats = self.stats()
+        with self._lock:
+            self._conn.close()
+        return stats
+
+
+_cache = None
+
+
+def open_cache(path=DEFAULT_PATH):
+    """Opens the process-wide cache used by scraper.fetch_post_body. path '0' disables it."""
+    global _cache
+    if path == '0':
+        return None
+    if _cache is None:
+        _cache = PostBodyCache(path)
+    return _cache
+
+
+def active():
+    return _cache
+
+
+def close():
+    """Closes the process-wide cache and returns its final stats (None if it was never opened)."""
+    global _cache
+    if _cache is None:
+        return None
+    cache, _cache = _cache, None
+    return cache.close()
@@ -0,0 +1,195 @@
+"""
+Compact dashboard payloads + content-hashed manifest.
+
+대시보드(frontend/app/page.tsx)용 JSON을 기존 파일(indent=2)과 별도로 다음 형태로도 내보냅니다.
+
+    data/manifest.json                         # 매번 새로 받는 작은 목록 (?t= 캐시 무효화)
+    data/pub/stocks.3f9a1c2b7d4e.json.gz        # minified + gzip, 파일명에 내용 해시 -> 영구 캐시 가능
+    data/pub/delta.<from>.<to>.json.gz          # 직전 스냅샷 대비 변경분
+
+    {"version": 1, "generated_at": "...",
+     "files": {"latest_stocks": {"hash": "3f9a1c2b7d4e", "path": "pub/stocks.3f9a1c2b7d4e.json.gz",
+                                 "bytes": 13906, "gz_bytes": 4102,
+                                 "delta": {"from": "a81e...", "path": "pub/delta.a81e....3f9a....json.gz", "gz_bytes": 2500}},
+               "stocks_1500": {...}, "research_index": {...}, "status": {...}, "reports": {...}}}
+
+종목 delta: 직전 실행의 latest_stocks(= 이전 슬롯 스냅샷)를 기준으로
+    {"order": [이번 순서의 code...], "patch": {code: {바뀐 필드만}}, "add": {code: 새 종목 전체 레코드}}
+클라이언트는 기준 해시를 캐시에 갖고 있으면 delta만 받아 order 순서로 (add 또는 기준+patch) 조립합니다.
+manifest가 참조하지 않는 pub 파일은 삭제합니다 (이전 manifest로 요청한 클라이언트는 기존 JSON 파일로 대체).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+try:
+    from src import clock
+except ImportError: # executed directly from src/
+    import clock
+
+DATA_DIR = 'data'
+PUB_DIR = 'pub'
+MANIFEST = 'manifest.json'
+HASH_LENGTH = 12
+
+# manifest 이름 -> data/ 아래 원본 파일
+SOURCES = {
+    'latest_stocks': 'latest_stocks.json',
+    'stocks_1000': 'stocks_1000.json',
+    'stocks_1300': 'stocks_1300.json',
+    'stocks_1500': 'stocks_1500.json',
+    'research_index': os.path.join('research', 'index.json'), # 상세 파일은 id/버전 경로로 직접 요청
+    'status': 'status.json',
+    'reports': 'reports.json',
+}
+STOCK_FILES = ('latest_stocks', 'stocks_1000', 'stocks_1300', 'stocks_1500')
+
+
+def minify(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def content_hash(raw):
+    return hashlib.sha256(raw).hexdigest()[:HASH_LENGTH]
+
+
+def compress(raw):
+    """gzip without name/mtime in the header, so identical content always gives identical bytes."""
+    return gzip.compress(raw, compresslevel=9, mtime=0)
+
+
+def _write(path, data):
+    if not os.path.exists(path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return len(data)
+
+
+def _read_gz_json(path):
+    with gzip.open(path, 'rb') as f:
+        return json.loads(f.read().decode('utf-8'))
+
+
+def load_manifest(data_dir=DATA_DIR):
+    path = os.path.join(data_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {'version': 1, 'files': {}}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"[Publish] Failed to load {path}: {e}")
+        return {'version': 1, 'files': {}}
+
+
+def stock_delta(base, target):
+    """
+    Record-level delta from `base` to `target` (lists of stock dicts keyed by 'code').
+    None if either side is not keyed by unique codes.
+    """
+    base_codes = [r.get('code') for r in base]
+    target_codes = [r.get('code') for r in target]
+    if None in base_codes or None in target_codes or len(set(base_codes)) != len(base_codes) \
+            or len(set(target_codes)) != len(target_codes):
+        return None
+    by_code = dict(zip(base_codes, base))
+    patch, add = {}, {}
+    for code, record in zip(target_codes, target):
+        old = by_code.get(code)
+        if old is None or set(old) != set(record):
+            add[code] = record
+            continue
+        changed = {k: v for k, v in record.items() if old[k] != v}
+        if changed:
+            patch[code] = changed
+    return {'order': target_codes, 'patch': patch, 'add': add}
+
+
+def apply_stock_delta(base, delta):
+    """Inverse of stock_delta (the same assembly the dashboard does)."""
+    by_code = {r['code']: r for r in base}
+    return [delta['add'][code] if code in delta['add'] else dict(by_code[code], **delta['patch'].get(code, {}))
+            for code in delta['order']]
+
+
+def publish(data_dir=DATA_DIR):
+    """Writes data/pub/* and data/manifest.json from the current dashboard files. Returns the manifest."""
+    pub_dir = os.path.join(data_dir, PUB_DIR)
+    os.makedirs(pub_dir, exist_ok=True)
+    previous = load_manifest(data_dir)
+    previous_files = previous.get('files', {})
+    files = {}
+
+    for name, source in SOURCES.items():
+        source_path = os.path.join(data_dir, source)
+        if not os.path.exists(source_path):
+            continue
+        with open(source_path, 'r', encoding='utf-8') as f:
+            raw = minify(json.load(f))
+        digest = content_hash(raw)
+        if previous_files.get(name, {}).get('hash') == digest \
+                and os.path.exists(os.path.join(data_dir, previous_files[name]['path'])):
+            files[name] = previous_files[name] # 변경 없음 (기존 delta 포함 유지)
+            continue
+        # 종목 파일은 내용이 같으면 하나의 파일을 공유 (latest_stocks == 현재 슬롯 스냅샷)
+        path = f"{PUB_DIR}/{'stocks' if name in STOCK_FILES else name}.{digest}.json.gz"
+        files[name] = {'hash': digest, 'path': path, 'bytes': len(raw),
+                       'gz_bytes': _write(os.path.join(data_dir, path), compress(raw))}
+
+    # [Delta] 이번 실행 결과 vs 직전 스냅샷(이전 manifest의 latest_stocks)
+    base_entry = previous_files.get('latest_stocks')
+    base_path = os.path.join(data_dir, base_entry['path']) if base_entry else None
+    if base_entry and os.path.exists(base_path):
+        base = None
+        for name in STOCK_FILES:
+            entry = files.get(name)
+            if not entry or entry is previous_files.get(name) or entry['hash'] == base_entry['hash']:
+                continue
+            try:
+                base = base if base is not None else _read_gz_json(base_path)
+                delta = stock_delta(base, _read_gz_json(os.path.join(data_dir, entry['path'])))
+            except Exception as e:
+                print(f"[Publish] Delta for {name} skipped: {e}")
+                continue
+            if delta is None:
+                continue
+            data = compress(minify(delta))
+            if len(data) >= entry['gz_bytes']:
+                continue # 전체 파일보다 크면 delta 생략
+            path = f"{PUB_DIR}/delta.{base_entry['hash']}.{entry['hash']}.json.gz"
+            entry['delta'] = {'from': base_entry['hash'], 'path': path,
+                              'gz_bytes': _write(os.path.join(data_dir, path), data)}
+
+    manifest = {'version': 1, 'generated_at': clock.kst_now().strftime('%Y-%m-%d %H:%M:%S'), 'files': files}
+    tmp_path = os.path.join(data_dir, MANIFEST + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, os.path.join(data_dir, MANIFEST))
+
+    # 현재 manifest가 참조하는 파일만 유지 (SOURCES에서 빠진 항목의 파일도 여기서 정리됨)
+    keep = set()
+    for entry in files.values():
+        keep.add(entry['path'])
+        if 'delta' in entry:
+            keep.add(entry['delta']['path'])
+    for filename in os.listdir(pub_dir):
+        if f"{PUB_DIR}/{filename}" not in keep:
+            os.remove(os.path.join(pub_dir, filename))
+    return manifest
+
+
+def main():
+    manifest = publish()
+    for name, entry in manifest['files'].items():
+        delta = f", delta {entry['delta']['gz_bytes']}B" if 'delta' in entry else ''
+        print(f"[Publish] {name}: {entry['bytes']}B -> {entry['gz_bytes']}B gz{delta}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
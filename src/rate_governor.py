@@ -0,0 +1,150 @@
+"""
+Per-host adaptive rate governor (token bucket + AIMD).
+
+http_client의 모든 요청(재시도 포함)이 acquire()를 거칩니다.
+- 정상 응답이 이어지면 호스트별 허용 속도(req/s)를 조금씩 올림 (additive increase)
+- 403/429/5xx/타임아웃이 오면 속도를 절반으로 낮춤 (multiplicative decrease)
+고정 time.sleep() 대신, 서버가 허용하는 만큼만 빠르게 요청합니다.
+"""
+
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+# host -> (initial_rate, min_rate, max_rate, burst)
+HOST_LIMITS = {
+    'finance.naver.com': (3.0, 0.5, 10.0, 2),
+    'stock.pstatic.net': (2.0, 0.5, 5.0, 1),
+    'api.telegram.org': (1.0, 0.2, 1.0, 1), # 텔레그램: 채팅방당 초당 1건 권장
+}
+DEFAULT_LIMIT = (5.0, 0.5, 20.0, 2)
+
+INCREASE_STEP = 0.1 # 정상 응답마다 +0.1 req/s
+DECREASE_FACTOR = 0.5 # 차단 신호마다 x0.5
+THROTTLE_STATUS = {403, 429, 500, 502, 503, 504}
+
+
+class HostBucket:
+    """Token bucket for a single host whose refill rate adapts to server health."""
+
+    def __init__(self, host, rate, min_rate, max_rate, burst):
+        self.host = host
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self.waiting = 0
+        self.requests = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.last_refill = now
+
+    def acquire(self):
+        """Blocks until a token is available. Returns seconds spent waiting."""
+        start = time.monotonic()
+        with self.lock:
+            self.waiting += 1
+        try:
+            while True:
+                with self.lock:
+                    self._refill(time.monotonic())
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        self.requests += 1
+                        return time.monotonic() - start
+                    delay = (1 - self.tokens) / self.rate
+                time.sleep(delay)
+        finally:
+            with self.lock:
+                self.waiting -= 1
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + INCREASE_STEP)
+
+    def on_throttle(self, reason):
+        with self.lock:
+            old_rate = self.rate
+            self.rate = max(self.min_rate, self.rate * DECREASE_FACTOR)
+            self.tokens = min(self.tokens, 0.0) # 쌓인 버스트도 버림
+            self.throttled += 1
+        print(f"[RateGovernor] {self.host} throttled ({reason}): {old_rate:.2f} -> {self.rate:.2f} req/s", flush=True)
+
+
+class RateGovernor:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url_or_host):
+        host = urlsplit(url_or_host).hostname if '://' in url_or_host else url_or_host
+        host = host or ''
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    rate, min_rate, max_rate, burst = HOST_LIMITS.get(host, DEFAULT_LIMIT)
+                    bucket = HostBucket(host, rate, min_rate, max_rate, burst)
+                    self._buckets[host] = bucket
+        return bucket
+
+    def acquire(self, url):
+        if not self.enabled:
+            return 0.0
+        return self.bucket(url).acquire()
+
+    def record(self, url, status_code=None, error=None):
+        """Feeds a response status (or a network error) back into the host's rate."""
+        if not self.enabled:
+            return
+        bucket = self.bucket(url)
+        if error is not None:
+            bucket.on_throttle(type(error).__name__)
+        elif status_code in THROTTLE_STATUS:
+            bucket.on_throttle(status_code)
+        else:
+            bucket.on_success()
+
+    def current_rate(self, host):
+        return self.bucket(host).rate
+
+    def queue_depth(self, host):
+        return self.bucket(host).waiting
+
+    def snapshot(self):
+        """Returns {host: {rate, queue_depth, requests, throttled}} for reporting."""
+        return {
+            host: {
+                'rate': round(b.rate, 2),
+                'queue_depth': b.waiting,
+                'requests': b.requests,
+                'throttled': b.throttled,
+            }
+            for host, b in list(self._buckets.items())
+        }
+
+
+# Process-wide governor (STOCKBOT_RATE_LIMIT=0 으로 비활성화)
+GOVERNOR = RateGovernor(enabled=os.environ.get('STOCKBOT_RATE_LIMIT', '1') != '0')
+
+
+def current_rate(host):
+    return GOVERNOR.current_rate(host)
+
+
+def queue_depth(host):
+    return GOVERNOR.queue_depth(host)
+
+
+def snapshot():
+    return GOVERNOR.snapshot()
@@ -0,0 +1,280 @@
+"""
+HTTP request journal (one JSON line per outbound request).
+
+http_client hook으로 모든 fetcher(scraper, research, PDF, Telegram)의 요청을 기록합니다.
+재시도는 한 줄로 합쳐 retries에 횟수를 남기고, 줄은 메모리에 모았다가 FLUSH_EVERY 줄마다/종료 시 한 번에 씁니다.
+
+    {"ts": "...", "method": "GET", "host": "finance.naver.com",
+     "url_template": "/item/board.naver?code={code}&page={page}", "path": "/item/board.naver?code=008350&page=3", "code": "008350", "stage": "board_crawl",
+     "status": 200, "bytes": 31485, "ttfb_ms": 41.2, "latency_ms": 55.0, "retries": 0, "cache": "miss", "error": null}
+
+기본 경로는 .cache/requests.jsonl (실행마다 새로 씀, 저장소에 커밋하지 않고 Actions artifact로 보관,
+STOCKBOT_REQUEST_JOURNAL=0 으로 비활성화).
+
+조회:
+    python src/request_journal.py slowest   # 엔드포인트별 지연시간 (p50/p95/max)
+    python src/request_journal.py hosts     # 호스트별 지연시간 히스토그램
+    python src/request_journal.py wasted    # 결과(latest_stocks.json)에 쓰이지 않은 요청
+"""
+
+import argparse
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+from urllib.parse import urlsplit, parse_qsl
+
+try:
+    from src import http_client, http_cassette, telemetry, clock
+except ImportError: # executed directly from src/
+    import http_client
+    import http_cassette
+    import telemetry
+    import clock
+
+DEFAULT_PATH = os.environ.get('STOCKBOT_REQUEST_JOURNAL') or os.path.join(
+    os.environ.get('STOCKBOT_CACHE_DIR', '.cache'), 'requests.jsonl')
+FLUSH_EVERY = 200
+
+# 숫자 id 값은 템플릿 변수로 치환 (엔드포인트 단위로 묶기 위함)
+_ID_VALUE = re.compile(r'^\d+$')
+_PATH_ID = re.compile(r'/\d{4,}(?=/|$)')
+HISTOGRAM_BUCKETS_MS = [25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+def url_template(url):
+    """Returns (host, template) with numeric query values as {name} and secrets redacted."""
+    parts = urlsplit(http_cassette._redact(url))
+    path = _PATH_ID.sub('/{id}', parts.path)
+    query = [f"{k}={{{k}}}" if _ID_VALUE.match(v) else f"{k}={v}" for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+    return parts.hostname or '', path + ('?' + '&'.join(query) if query else '')
+
+
+def _stock_code(url):
+    for key, value in parse_qsl(urlsplit(url).query):
+        if key in ('code', 'itemCode') and value:
+            return value
+    return None
+
+
+class RequestJournal:
+    def __init__(self, path=DEFAULT_PATH, flush_every=FLUSH_EVERY):
+        self.path = path
+        self.flush_every = flush_every
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self.count = 0
+
+    def on_http_attempt(self, event):
+        """http_client hook: writes one line per request (the final attempt carries the retry count)."""
+        if not event.get('final'):
+            return
+        host, template = url_template(event['url'])
+        parts = urlsplit(http_cassette._redact(event['url']))
+        ttfb = event.get('ttfb')
+        entry = {
+            'ts': clock.now().isoformat(timespec='seconds'),
+            'method': event['method'],
+            'host': host,
+            'url_template': template,
+            'path': parts.path + ('?' + parts.query if parts.query else ''),
+            'code': _stock_code(event['url']),
+            'stage': telemetry.TELEMETRY.current_stage(),
+            'status': event.get('status'),
+            'bytes': event.get('bytes') or 0,
+            'ttfb_ms': round(ttfb * 1000, 1) if ttfb is not None else None,
+            'latency_ms': round((event.get('elapsed') or 0) * 1000, 1),
+            'retries': event.get('attempt') or 0,
+            'cache': 'hit' if event.get('cache') in ('replay', 'hit') else 'miss',
+            'error': event.get('error'),
+        }
+        self.log(entry)
+
+    def log(self, entry):
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            self._buffer.append(line)
+            self.count += 1
+            if len(self._buffer) < self.flush_every:
+                return
+            lines, self._buffer = self._buffer, []
+        self._write(lines)
+
+    def _write(self, lines):
+        if not lines:
+            return
+        with self._file_lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+
+    def flush(self):
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        self._write(lines)
+
+
+_journal = None
+
+
+def start(path=DEFAULT_PATH):
+    """Truncates the journal and starts recording every http_client request. Returns the journal."""
+    global _journal
+    if path == '0':
+        return None
+    if _journal is not None:
+        return _journal
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    open(path, 'w', encoding='utf-8').close()
+    _journal = RequestJournal(path)
+    http_client.add_hook(_journal.on_http_attempt)
+    atexit.register(_journal.flush)
+    return _journal
+
+
+def log(entry):
+    """Writes a non-HTTP entry (e.g. a local cache hit) when the journal is running."""
+    if _journal is not None:
+        entry.setdefault('ts', clock.now().isoformat(timespec='seconds'))
+        _journal.log(entry)
+
+
+def log_cache_hit(url, method='GET'):
+    """Journals a request answered from a local cache (no network, zero latency)."""
+    if _journal is None:
+        return
+    host, template = url_template(url)
+    parts = urlsplit(http_cassette._redact(url))
+    log({
+        'method': method, 'host': host, 'url_template': template,
+        'path': parts.path + ('?' + parts.query if parts.query else ''),
+        'code': _stock_code(url), 'stage': telemetry.TELEMETRY.current_stage(),
+        'status': None, 'bytes': 0, 'ttfb_ms': None, 'latency_ms': 0.0, 'retries': 0,
+        'cache': 'hit', 'error': None,
+    })
+
+
+def flush():
+    if _journal is not None:
+        _journal.flush()
+
+
+# --- Query tool ---
+def load(path=DEFAULT_PATH):
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    return entries
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def report_slowest(entries, top=15):
+    groups = {}
+    for e in entries:
+        if e.get('cache') == 'hit':
+            continue
+        groups.setdefault((e['host'], e['url_template'].split('?')[0]), []).append(e['latency_ms'])
+    rows = sorted(groups.items(), key=lambda kv: sum(kv[1]), reverse=True)[:top]
+    print(f"{'endpoint':<55}{'count':>7}{'total s':>9}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    for (host, path), latencies in rows:
+        print(f"{(host + path)[:54]:<55}{len(latencies):>7}{sum(latencies) / 1000:>9.1f}"
+              f"{_percentile(latencies, 50):>9.0f}{_percentile(latencies, 95):>9.0f}{max(latencies):>9.0f}")
+
+
+def report_hosts(entries):
+    by_host = {}
+    for e in entries:
+        if e.get('cache') != 'hit':
+            by_host.setdefault(e['host'], []).append(e['latency_ms'])
+    for host, latencies in sorted(by_host.items()):
+        print(f"\n{host}: {len(latencies)} requests, p50 {_percentile(latencies, 50):.0f} ms, "
+              f"p99 {_percentile(latencies, 99):.0f} ms")
+        lower = 0
+        for upper in HISTOGRAM_BUCKETS_MS + [None]:
+            n = sum(1 for v in latencies if v >= lower and (upper is None or v < upper))
+            label = f"{lower}-{upper} ms" if upper is not None else f">= {lower} ms"
+            bar = '#' * (round(40 * n / len(latencies)) if latencies else 0)
+            print(f"  {label:>14} {n:>6} {bar}")
+            lower = upper
+
+
+def find_wasted(entries, output_codes):
+    """
+    Returns {reason: [entries]} for requests whose result never reached the output:
+    - failed: 오류/4xx/5xx 응답 (재시도 포함)
+    - dropped_stock: 결과 종목(output_codes)에 없는 종목 페이지
+    - duplicate: 같은 URL을 다시 가져온 요청
+    """
+    wasted = {'failed': [], 'dropped_stock': [], 'duplicate': []}
+    seen = set()
+    for e in entries:
+        if e.get('cache') == 'hit':
+            continue
+        if e.get('error') or (e.get('status') or 0) >= 400:
+            wasted['failed'].append(e)
+            continue
+        if e.get('code') and e['code'] not in output_codes:
+            wasted['dropped_stock'].append(e)
+        key = (e['method'], e['host'], e.get('path'))
+        if e.get('path') and key in seen:
+            wasted['duplicate'].append(e)
+        seen.add(key)
+    return wasted
+
+
+def report_wasted(entries, stocks_path):
+    output_codes = set()
+    if os.path.exists(stocks_path):
+        with open(stocks_path, 'r', encoding='utf-8') as f:
+            output_codes = {str(r.get('code', '')).zfill(6) for r in json.load(f)}
+    wasted = find_wasted(entries, output_codes)
+    total = sum(1 for e in entries if e.get('cache') != 'hit')
+    print(f"{total} network requests, output has {len(output_codes)} stocks ({stocks_path})")
+    print(f"retried attempts (not journaled separately): {sum(e.get('retries') or 0 for e in entries)}")
+    for reason, items in wasted.items():
+        size = sum(e.get('bytes') or 0 for e in items)
+        seconds = sum(e.get('latency_ms') or 0 for e in items) / 1000
+        share = len(items) / total if total else 0
+        print(f"\n{reason}: {len(items)} requests ({share:.0%}), {size / 1e6:.1f} MB, {seconds:.1f} s")
+        by_template = {}
+        for e in items:
+            key = (e['host'], e['url_template'])
+            by_template[key] = by_template.get(key, 0) + 1
+        for (host, template), n in sorted(by_template.items(), key=lambda kv: kv[1], reverse=True)[:8]:
+            print(f"  {n:>6}  {host}{template}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the HTTP request journal")
+    parser.add_argument('report', choices=['slowest', 'hosts', 'wasted'])
+    parser.add_argument('--journal', default=DEFAULT_PATH)
+    parser.add_argument('--stocks', default=os.path.join('data', 'latest_stocks.json'),
+                        help="output file used to decide which requests were wasted")
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.journal):
+        print(f"Journal not found: {args.journal}")
+        return 1
+    entries = load(args.journal)
+    print(f"[Journal] {len(entries)} entries from {args.journal}\n")
+    if args.report == 'slowest':
+        report_slowest(entries, args.top)
+    elif args.report == 'hosts':
+        report_hosts(entries)
+    else:
+        report_wasted(entries, args.stocks)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
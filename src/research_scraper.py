@@ -1,4 +1,3 @@
-import requests
 from bs4 import BeautifulSoup
 import datetime
 import json
@@ -10,6 +9,15 @@ from collections import Counter
 import time
 import random
 
+try:
+    from src import http_client, naver_parsers, clock, budget, research_store
+except ImportError: # executed directly (python src/research_scraper.py)
+    import http_client
+    import naver_parsers
+    import clock
+    import budget
+    import research_store
+
 # --- CONSTANTS ---
 NAVER_FINANCE_URL = "https://finance.naver.com"
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
@@ -23,7 +31,7 @@ SECTIONS = {
 DEBUG_LOG = []
 
 def log(msg):
-    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+    timestamp = clock.now().strftime("%H:%M:%S")
     entry = f"[{timestamp}] {msg}"
     print(entry, flush=True)
     DEBUG_LOG.append(entry)
@@ -61,31 +69,11 @@ def clean_text(text):
 def robust_fetch_body(link):
     try:
         log(f"   > Fetching Detail: {link}")
-        res = requests.get(link, headers=get_headers())
+        res = http_client.get(link, headers=get_headers())
         res.encoding = 'EUC-KR'
-        soup = BeautifulSoup(res.text, 'html.parser')
-
-        # Strategy 1: Find 'view_sbj' TH -> Table -> Largest TD
-        subject_th = soup.find('th', class_='view_sbj')
-        if subject_th:
-            table = subject_th.find_parent('table')
-            if table:
-                tds = table.find_all('td')
-                # Sort by text length
-                tds_sorted = sorted(tds, key=lambda x: len(x.get_text(strip=True)), reverse=True)
-                if tds_sorted:
-                    text = tds_sorted[0].get_text(separator=" ", strip=True)
-                    return clean_text(text) # Apply cleaning
-        
-        # Strategy 2: Common classes
-        candidates = ['view_con', 'view_content', 'scr01']
-        for cls in candidates:
-            div = soup.find('div', class_=cls)
-            if div:
-                text = div.get_text(separator=" ", strip=True)
-                return clean_text(text)
-                
-        return ""
+        # Strategy 1: 'view_sbj' TH -> Table -> Largest TD / Strategy 2: Common classes
+        text = naver_parsers.parse_research_read(res.text)
+        return clean_text(text) # Apply cleaning
     except Exception as e:
         log(f"   > ERROR fetching detail: {e}")
         return ""
@@ -157,7 +145,7 @@ def fetch_section_reports(section_key):
     log(f"--- Section: {section_key} ---")
     reports = []
     try:
-        res = requests.get(url, headers=get_headers())
+        res = http_client.get(url, headers=get_headers())
         res.encoding = 'EUC-KR'
         soup = BeautifulSoup(res.text, 'html.parser')
         
@@ -165,7 +153,7 @@ def fetch_section_reports(section_key):
         if not table: return []
             
         rows = table.find_all('tr')
-        today_str = datetime.datetime.now().strftime("%y.%m.%d")
+        today_str = clock.now().strftime("%y.%m.%d")
         
         for row in rows:
             cols = row.find_all('td')
@@ -240,7 +228,7 @@ def main():
     log("=== StockBot Research Scraper Started (V2.0) ===")
     
     all_data = {}
-    today_str = datetime.datetime.now().strftime("%y.%m.%d")
+    today_str = clock.now().strftime("%y.%m.%d")
     
     for key in SECTIONS:
         items = fetch_section_reports(key)
@@ -252,9 +240,19 @@ def main():
         for i, item in enumerate(today_items[:10]):
             log(f"   Processing: {item['title']}")
             
-            # Body & Clean Summary
-            body = robust_fetch_body(item['link'])
-            item['body_summary'] = summarize_text(body)
+            # Body & Clean Summary (--budget 부족 시 본문 요약 생략, 제목/링크만 유지)
+            stored = research_store.load_detail(item)
+            if stored and stored.get('body_summary'):
+                # 같은 날 이전 실행에서 이미 받은 리포트 -> 본문 재요청 없이 재사용
+                item['body_summary'] = stored['body_summary']
+                if stored.get('pdf_analysis'):
+                    item['pdf_analysis'] = stored['pdf_analysis']
+            elif budget.allow('research_body'):
+                body = robust_fetch_body(item['link'])
+                item['body_summary'] = summarize_text(body)
+            else:
+                budget.skip('research_body', item['title'])
+                item['body_summary'] = ""
             
             # PDF Analysis (DISABLED per user request V6.0)
             # if item.get('pdf_link'):
@@ -266,7 +264,6 @@ def main():
             #         log(f"     PDF Error: {e}")
             
             processed_items.append(item)
-            time.sleep(0.3)
             
         # Narrative Insight Summary
         section_summary = generate_insight_summary(processed_items)
@@ -277,9 +274,9 @@ def main():
             'items': processed_items
         }
 
+    # 인덱스(data/research/index.json) + 리포트별 상세 파일 (대시보드는 항목을 열 때 상세 파일을 받음)
     os.makedirs('data', exist_ok=True)
-    with open('data/latest_research.json', 'w', encoding='utf-8') as f:
-        json.dump(all_data, f, ensure_ascii=False, indent=2)
+    research_store.write(all_data)
         
     log("=== Completed ===")
     with open('data/scraper_debug.log', 'w', encoding='utf-8') as f:
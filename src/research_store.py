@@ -0,0 +1,147 @@
+"""
+Sharded research output: small index + per-report detail files.
+
+research_scraper 결과를 파일 하나(latest_research.json)에 본문 요약까지 모두 담는 대신,
+대시보드 첫 화면용 인덱스와 리포트별 상세 파일로 나눠 저장합니다.
+
+    data/research/index.json
+        {"invest": {"today_count": 12, "summary": "...",
+                    "items": [{"id": "invest-37348", "title": "...", "date": "25.12.26", "section": "invest",
+                               "link": "...", "pdf_link": "...", "has_body": true, "has_pdf_analysis": false,
+                               "detail": "research/items/2025-12-26/invest-37348.json", "v": "a81e0c2f"}]}, ...}
+    data/research/items/2025-12-26/invest-37348.json   # {"id", "title", ..., "body_summary", "pdf_analysis"?}
+
+- id: 섹션 + 네이버 nid (같은 리포트는 실행이 달라도 같은 id -> 이미 받은 본문 요약 재사용)
+- v: 상세 파일 내용 해시 (대시보드는 ?v= 로 요청하므로 내용이 같으면 브라우저 캐시 사용)
+- 상세 파일은 발행일 폴더로 나뉘며 KEEP_DAYS 보다 오래된 폴더는 삭제합니다.
+
+기존 latest_research.json 변환:  python src/research_store.py split data/latest_research.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from datetime import datetime, timedelta
+
+try:
+    from src import clock
+except ImportError: # executed directly from src/
+    import clock
+
+DEFAULT_DIR = os.path.join('data', 'research')
+INDEX_FILE = 'index.json'
+ITEMS_DIR = 'items'
+KEEP_DAYS = 7
+
+# 상세 파일로만 가는 필드 (인덱스에는 has_* 플래그만 남김)
+DETAIL_FIELDS = ('body_summary', 'pdf_analysis')
+
+_NID_PATTERN = re.compile(r'[?&]nid=(\d+)')
+
+
+def report_id(item):
+    """'invest-37348' (section + Naver nid), or a link hash when the link has no nid."""
+    match = _NID_PATTERN.search(item.get('link', ''))
+    key = match.group(1) if match else hashlib.sha1(item.get('link', '').encode('utf-8')).hexdigest()[:10]
+    return f"{item.get('section', 'research')}-{key}"
+
+
+def _publish_date(item):
+    """'25.12.26' -> '2025-12-26' (unknown format -> 'undated')."""
+    try:
+        return datetime.strptime(item.get('date', ''), '%y.%m.%d').strftime('%Y-%m-%d')
+    except ValueError:
+        return 'undated'
+
+
+def detail_path(item, directory=DEFAULT_DIR):
+    return os.path.join(directory, ITEMS_DIR, _publish_date(item), f"{report_id(item)}.json")
+
+
+def load_detail(item, directory=DEFAULT_DIR):
+    """Stored detail of a report (same id) or None."""
+    path = detail_path(item, directory)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _write_detail(path, detail):
+    """Writes the detail file if its content changed. Returns the content version hash."""
+    raw = json.dumps(detail, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    version = hashlib.sha256(raw).hexdigest()[:8]
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == raw:
+                return version
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(raw)
+    os.replace(tmp_path, path)
+    return version
+
+
+def write(all_data, directory=DEFAULT_DIR, data_root='data', keep_days=KEEP_DAYS):
+    """
+    Splits {section: {'today_count', 'summary', 'items'}} into the index and detail files.
+    Detail paths in the index are relative to `data_root` (the dashboard's data/ base URL).
+    Returns the index.
+    """
+    index = {}
+    for section, data in all_data.items():
+        entries = []
+        for item in data.get('items', []):
+            item = dict(item, section=item.get('section', section))
+            detail = dict(item, id=report_id(item))
+            path = detail_path(item, directory)
+            entry = {k: v for k, v in detail.items() if k not in DETAIL_FIELDS}
+            entry['has_body'] = bool(item.get('body_summary'))
+            entry['has_pdf_analysis'] = bool(item.get('pdf_analysis'))
+            entry['detail'] = os.path.relpath(path, data_root).replace(os.sep, '/')
+            entry['v'] = _write_detail(path, detail)
+            entries.append(entry)
+        index[section] = dict({k: v for k, v in data.items() if k != 'items'}, items=entries)
+
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, INDEX_FILE + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, os.path.join(directory, INDEX_FILE))
+
+    # 오래된 발행일 폴더 삭제 (현재 인덱스가 참조하는 폴더는 유지)
+    referenced = {os.path.basename(os.path.dirname(detail_path(i, directory)))
+                  for data in all_data.values() for i in data.get('items', [])}
+    cutoff = (clock.kst_now() - timedelta(days=keep_days)).strftime('%Y-%m-%d')
+    items_root = os.path.join(directory, ITEMS_DIR)
+    for name in os.listdir(items_root) if os.path.isdir(items_root) else []:
+        if name not in referenced and (name < cutoff or name == 'undated'):
+            shutil.rmtree(os.path.join(items_root, name), ignore_errors=True)
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sharded research output")
+    sub = parser.add_subparsers(dest='command', required=True)
+    s = sub.add_parser('split', help="convert a bundled latest_research.json into index + detail files")
+    s.add_argument('source')
+    s.add_argument('--dir', default=DEFAULT_DIR)
+    args = parser.parse_args(argv)
+
+    with open(args.source, 'r', encoding='utf-8') as f:
+        all_data = json.load(f)
+    index = write(all_data, args.dir)
+    print(f"[Research] {sum(len(d['items']) for d in index.values())} reports -> {args.dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Incrementally maintained weekly / monthly stock rollups.
+
+scraper 실행이 끝날 때마다(analyzer.save_data) 이번 실행 결과로 주간/월간 집계 파일을 갱신합니다.
+리포트는 이력 전체를 다시 읽지 않고 해당 기간의 집계 파일 하나만 읽습니다.
+
+    data/rollups/weekly/2025-W52.json
+    data/rollups/monthly/2025-12.json
+    {"period": "2025-12", "runs": 61, "run_ats": ["2025-12-11 10:08:21", ...], "run_days": ["2025-12-11", ...],
+     "stocks": {"008350": {"name": "남선알미늄", "market": "KOSPI", "appearances": 3, "days": 2,
+                           "posts_total": 610, "avg_posts": 203.3, "first_seen": "...", "last_seen": "...",
+                           "last_day": "2025-12-26", "last_streak": 2, "streak": 2, "max_streak": 2}}}
+
+연속 등장 일수는 해당 기간에 실행이 있었던 날 기준 (같은 날 여러 번 등장해도 1일)
+- last_streak: last_day 기준 연속 등장 일수
+- streak: 현재 연속 등장 일수 (가장 최근 실행일에 등장하지 않았으면 0)
+통과 종목이 없는 실행도 run_days에 기록되므로 그날 등장하지 않은 종목의 연속 기록은 끊깁니다.
+같은 run_at은 한 번만 반영합니다 (checkpoint로 재개한 실행은 중단된 실행의 run_at을 사용).
+기존 이력으로 다시 만들기:  python src/rollups.py rebuild
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+
+try:
+    from src import history_store
+except ImportError: # executed directly from src/
+    import history_store
+
+DEFAULT_DIR = os.path.join('data', 'rollups')
+
+
+def week_key(trade_date):
+    year, week, _ = pd.Timestamp(trade_date).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def month_key(trade_date):
+    return trade_date[:7]
+
+
+def rollup_path(kind, key, directory=DEFAULT_DIR):
+    return os.path.join(directory, kind, f"{key}.json")
+
+
+def load(kind, key, directory=DEFAULT_DIR):
+    path = rollup_path(kind, key, directory)
+    if not os.path.exists(path):
+        return _empty_rollup(key)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save(kind, key, rollup, directory):
+    path = rollup_path(kind, key, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(rollup, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _empty_rollup(key):
+    return {'period': key, 'runs': 0, 'run_ats': [], 'run_days': [], 'stocks': {}}
+
+
+def apply_run(rollup, rows, run_at):
+    """
+    Folds one run (history_store-normalized rows, possibly empty) into `rollup` in place.
+    A run_at that is already folded in is ignored.
+    """
+    run_at = pd.Timestamp(run_at)
+    trade_date = run_at.strftime('%Y-%m-%d')
+    seen_at = run_at.strftime('%Y-%m-%d %H:%M:%S')
+    run_ats = rollup.setdefault('run_ats', [])
+    if seen_at in run_ats:
+        return rollup
+    rollup['run_ats'] = sorted(run_ats + [seen_at])
+    # 이번 실행 전 마지막 실행일 (streak 연속 판단 기준)
+    prev_day = max((d for d in rollup['run_days'] if d < trade_date), default=None)
+    if trade_date not in rollup['run_days']:
+        rollup['run_days'] = sorted(rollup['run_days'] + [trade_date])
+    rollup['runs'] += 1
+
+    for row in rows.itertuples(index=False):
+        stock = rollup['stocks'].setdefault(row.code, {
+            'name': None, 'market': None, 'appearances': 0, 'days': 0, 'posts_total': 0, 'avg_posts': 0.0,
+            'first_seen': seen_at, 'last_seen': seen_at, 'last_day': None, 'last_streak': 0, 'streak': 0,
+            'max_streak': 0,
+        })
+        stock['name'] = row.name if isinstance(row.name, str) else stock['name']
+        stock['market'] = row.market if isinstance(row.market, str) else stock['market']
+        stock['appearances'] += 1
+        stock['posts_total'] += int(row.recent_posts_count) if pd.notna(row.recent_posts_count) else 0
+        stock['avg_posts'] = round(stock['posts_total'] / stock['appearances'], 1)
+        stock['first_seen'] = min(stock['first_seen'], seen_at)
+        stock['last_seen'] = max(stock['last_seen'], seen_at)
+        if stock['last_day'] != trade_date:
+            last_streak = stock.get('last_streak', stock['streak'])
+            stock['last_streak'] = last_streak + 1 if stock['last_day'] is not None and stock['last_day'] == prev_day else 1
+            stock['max_streak'] = max(stock['max_streak'], stock['last_streak'])
+            stock['days'] += 1
+            stock['last_day'] = trade_date
+
+    # 현재 연속 기록: 가장 최근 실행일에 등장한 종목만 유지
+    latest_day = rollup['run_days'][-1]
+    for stock in rollup['stocks'].values():
+        stock['streak'] = stock['last_streak'] if stock['last_day'] == latest_day else 0
+    return rollup
+
+
+def update(df, run_at, directory=DEFAULT_DIR):
+    """Updates the weekly and monthly rollups containing `run_at` with one run's results."""
+    rows = history_store.normalize(df, run_at)
+    trade_date = pd.Timestamp(run_at).strftime('%Y-%m-%d')
+    for kind, key in (('weekly', week_key(trade_date)), ('monthly', month_key(trade_date))):
+        rollup = apply_run(load(kind, key, directory), rows, run_at)
+        _save(kind, key, rollup, directory)
+
+
+def to_frame(rollup):
+    """Rollup stocks as a report table (appearances descending)."""
+    columns = ['market', 'code', 'name', 'appearances', 'days', 'avg_posts', 'first_seen', 'last_seen',
+               'streak', 'max_streak']
+    rows = [dict(stock, code=code) for code, stock in rollup.get('stocks', {}).items()]
+    df = pd.DataFrame(rows, columns=columns)
+    return df.sort_values(['appearances', 'avg_posts'], ascending=False, kind='mergesort').reset_index(drop=True)
+
+
+def _empty_runs(index_path=None):
+    """
+    Runs that kept no stocks (they have no history rows) from the code index, as run_at timestamps.
+    The index keeps one entry per trading date/slot, so the slot start stands in for the run time.
+    """
+    # rebuild 전용 (리포트 워크플로에는 holidays가 설치되어 있지 않으므로 모듈 로드 시 import하지 않음)
+    try:
+        from src import code_index
+    except ImportError: # executed directly from src/
+        import code_index
+    index_path = index_path or code_index.DEFAULT_PATH
+    runs = []
+    for trade_date, slots in code_index.load(index_path).items():
+        for slot, codes in slots.items():
+            if not codes and slot.isdigit():
+                runs.append(pd.Timestamp(f"{trade_date} {slot[:2]}:{slot[2:]}:00"))
+    return runs
+
+
+def rebuild(directory=DEFAULT_DIR, history_dir=history_store.DEFAULT_DIR, index_path=None):
+    """
+    Recomputes every rollup from the history store (runs applied in time order). Runs that kept
+    no stocks are taken from the code index, which only covers its last KEEP_DAYS trading dates.
+    """
+    history = history_store.read(directory=history_dir)
+    runs = [(run_at, rows) for run_at, rows in history.groupby('run_at', sort=True)]
+    runs += [(run_at, history.iloc[0:0]) for run_at in _empty_runs(index_path)]
+    rollups = {}
+    for run_at, rows in sorted(runs, key=lambda run: run[0]):
+        trade_date = run_at.strftime('%Y-%m-%d')
+        for kind, key in (('weekly', week_key(trade_date)), ('monthly', month_key(trade_date))):
+            apply_run(rollups.setdefault((kind, key), _empty_rollup(key)), rows, run_at)
+    for (kind, key), rollup in rollups.items():
+        _save(kind, key, rollup, directory)
+    print(f"[Rollups] Rebuilt {len(rollups)} rollups from {len(runs)} runs into {directory}")
+    return len(rollups)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Weekly / monthly stock rollups")
+    parser.add_argument('command', choices=['rebuild'])
+    parser.add_argument('--dir', default=DEFAULT_DIR)
+    parser.add_argument('--history-dir', default=history_store.DEFAULT_DIR)
+    parser.add_argument('--code-index', default=None, help="default: data/code_index.json")
+    args = parser.parse_args(argv)
+    rebuild(args.dir, args.history_dir, args.code_index)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
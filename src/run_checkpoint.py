@@ -0,0 +1,98 @@
+"""
+Per-stock checkpoint journal for resuming interrupted scraper runs.
+
+종목 하나의 처리가 끝날 때마다 결과(통과 종목 데이터 또는 탈락)를 한 줄씩 기록합니다.
+같은 거래일/같은 실행 슬롯(10:00 / 13:00 / 15:00)에 다시 실행하면 기록된 종목은 재사용하고
+나머지만 수집하므로, 복구 비용은 잃어버린 작업량에 비례합니다.
+실행이 정상적으로 끝나면 clear()로 삭제됩니다.
+
+    .cache/checkpoints/run_2025-12-26_1500.jsonl
+    {"run_at": "2025-12-26 14:55:03"}
+    {"market": "KOSPI", "code": "005930", "threshold": 100, "kept": true, "stock": {...}}
+
+첫 줄의 run_at은 중단된 실행의 시각입니다. 재개한 실행은 이 시각을 그대로 사용하므로
+이력 저장(history_store.append_run)과 주간/월간 집계가 같은 실행을 두 번 기록하지 않습니다.
+"""
+
+import glob
+import json
+import os
+import threading
+from datetime import datetime
+
+DEFAULT_DIR = os.path.join(os.environ.get('STOCKBOT_CACHE_DIR', '.cache'), 'checkpoints')
+
+
+class RunCheckpoint:
+    def __init__(self, trade_date, slot, threshold, run_at=None, directory=DEFAULT_DIR):
+        """run_at: this run's start time; replaced by the interrupted run's run_at when resuming."""
+        self.directory = directory
+        self.path = os.path.join(directory, f"run_{trade_date}_{slot}.jsonl")
+        self.threshold = threshold
+        self.run_at = run_at.replace(microsecond=0) if run_at is not None else None
+        self._run_recorded = False
+        self._lock = threading.Lock()
+        self._done = {}
+        self.resumed = 0
+        self.load()
+
+    def load(self):
+        """Reads completed stocks; a torn last line (process killed mid-write) is ignored."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if 'run_at' in entry:
+                    self.run_at = datetime.strptime(entry['run_at'], '%Y-%m-%d %H:%M:%S')
+                    self._run_recorded = True
+                    continue
+                if entry.get('threshold') != self.threshold:
+                    continue
+                self._done[(entry['market'], entry['code'])] = entry.get('stock') if entry.get('kept') else None
+        if self._done:
+            print(f"[Checkpoint] Resuming: {len(self._done)} stocks already processed ({self.path})")
+
+    def get(self, stock):
+        """Returns (done, result) for `stock`; result is None for stocks that were dropped."""
+        key = (stock.get('market'), stock.get('code'))
+        with self._lock:
+            if key not in self._done:
+                return False, None
+            self.resumed += 1
+            result = self._done[key]
+        return True, (dict(result) if result is not None else None)
+
+    def record(self, stock, result):
+        """Appends one finished stock (result None = below threshold / pruned)."""
+        entry = {
+            'market': stock.get('market'),
+            'code': stock.get('code'),
+            'threshold': self.threshold,
+            'kept': result is not None,
+            'stock': result,
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            self._done[(entry['market'], entry['code'])] = result
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                if not self._run_recorded and self.run_at is not None:
+                    f.write(json.dumps({'run_at': self.run_at.strftime('%Y-%m-%d %H:%M:%S')}) + '\n')
+                    self._run_recorded = True
+                f.write(line + '\n')
+                f.flush()
+
+    def clear(self):
+        """Removes this run's journal and any left over from other dates/slots."""
+        with self._lock:
+            self._done = {}
+            self._run_recorded = False
+            for path in glob.glob(os.path.join(self.directory, 'run_*.jsonl')):
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"[Checkpoint] Failed to remove {path}: {e}")
@@ -1,8 +1,12 @@
 
 import os
-import requests
 import time
 
+try:
+    from src import http_client
+except ImportError: # executed directly from src/
+    import http_client
+
 class TelegramManager:
     """
     Centralized manager for Telegram notifications.
@@ -29,7 +33,7 @@ class TelegramManager:
         }
         
         try:
-            response = requests.post(self.api_base, json=payload, timeout=10)
+            response = http_client.post(self.api_base, json=payload, timeout=10)
             response.raise_for_status()
             print(f"[TelegramManager] Sent message (len={len(text)}). Status: 200")
             return True
@@ -40,7 +44,7 @@ class TelegramManager:
                 print("[TelegramManager] Retrying as Plain Text...")
                 payload.pop('parse_mode', None)
                 try:
-                    requests.post(self.api_base, json=payload, timeout=10)
+                    http_client.post(self.api_base, json=payload, timeout=10)
                     print("[TelegramManager] Retry successful.")
                     return True
                 except Exception as e2:
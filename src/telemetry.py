@@ -0,0 +1,149 @@
+"""
+Per-stage run telemetry (spans + HTTP request accounting).
+
+    with telemetry.span('board_crawl'):
+        get_discussion_stats(code)
+
+- span은 스레드별 스택으로 관리되며, http_client의 모든 시도(재시도 포함)는
+  그 요청을 보낸 스레드의 가장 안쪽 span에 집계됩니다 (span 밖의 요청은 'other').
+- 단계별로 duration(스레드 합산 초), wall(처음 시작~마지막 종료), 호출 수,
+  요청 수, 다운로드 bytes, 재시도 수, 오류 수(예외/4xx/5xx)를 기록합니다.
+- summary()는 status.json의 'run' 항목으로 저장되고 최근 실행 이력이 함께 유지됩니다.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from src import http_client
+except ImportError: # executed directly from src/
+    import http_client
+
+# status.json 'history'에 보관할 최근 실행 수
+HISTORY_SIZE = 30
+
+_local = threading.local()
+
+
+class _StageStats:
+    __slots__ = ('calls', 'seconds', 'first_start', 'last_end', 'requests', 'bytes', 'retries', 'errors')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.first_start = None
+        self.last_end = None
+        self.requests = 0
+        self.bytes = 0
+        self.retries = 0
+        self.errors = 0
+
+    def to_dict(self):
+        wall = (self.last_end - self.first_start) if self.first_start is not None and self.last_end is not None else 0.0
+        return {
+            'calls': self.calls,
+            'seconds': round(self.seconds, 3),
+            'wall_seconds': round(wall, 3),
+            'requests': self.requests,
+            'bytes': self.bytes,
+            'retries': self.retries,
+            'errors': self.errors,
+        }
+
+
+class Telemetry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {} # 최초 등장 순서 유지
+        self._started = time.perf_counter()
+
+    def _stage(self, name):
+        stats = self._stages.get(name)
+        if stats is None:
+            stats = self._stages[name] = _StageStats()
+        return stats
+
+    @contextmanager
+    def span(self, name):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            with self._lock:
+                stats = self._stage(name)
+                stats.calls += 1
+                stats.seconds += end - start
+                if stats.first_start is None or start < stats.first_start:
+                    stats.first_start = start
+                if stats.last_end is None or end > stats.last_end:
+                    stats.last_end = end
+
+    def current_stage(self):
+        stack = getattr(_local, 'stack', None)
+        return stack[-1] if stack else 'other'
+
+    def on_http_attempt(self, event):
+        """http_client hook: attributes one attempt to the calling thread's current stage."""
+        with self._lock:
+            stats = self._stage(self.current_stage())
+            stats.requests += 1
+            stats.bytes += event.get('bytes') or 0
+            if event.get('attempt'):
+                stats.retries += 1
+            if event.get('error') or (event.get('status') or 0) >= 400:
+                stats.errors += 1
+
+    def summary(self):
+        with self._lock:
+            stages = {name: stats.to_dict() for name, stats in self._stages.items()}
+        totals = {key: sum(s[key] for s in stages.values()) for key in ('requests', 'bytes', 'retries', 'errors')}
+        slowest = max(stages, key=lambda name: stages[name]['wall_seconds'], default=None)
+        return {
+            'total_seconds': round(time.perf_counter() - self._started, 3),
+            'slowest_stage': slowest,
+            **totals,
+            'stages': stages,
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"[Telemetry] Run {summary['total_seconds']:.1f}s, {summary['requests']} requests, "
+              f"{summary['bytes'] / 1e6:.1f} MB, {summary['retries']} retries, {summary['errors']} errors")
+        for name, s in summary['stages'].items():
+            print(f"[Telemetry]   {name:<12} wall {s['wall_seconds']:>7.1f}s  cpu+io {s['seconds']:>7.1f}s  "
+                  f"{s['requests']:>5} req  {s['bytes'] / 1e6:>6.1f} MB  {s['retries']} retries  {s['errors']} errors")
+
+
+# Process-wide telemetry; 모든 http_client 요청을 집계
+TELEMETRY = Telemetry()
+http_client.add_hook(TELEMETRY.on_http_attempt)
+
+
+def span(name):
+    return TELEMETRY.span(name)
+
+
+def summary():
+    return TELEMETRY.summary()
+
+
+def print_summary():
+    TELEMETRY.print_summary()
+
+
+def with_history(run_summary, previous_status, size=HISTORY_SIZE):
+    """Returns the rolling run history (newest first) including `run_summary`."""
+    history = []
+    if isinstance(previous_status, dict):
+        history = [h for h in previous_status.get('history', []) if isinstance(h, dict)]
+    entry = {k: v for k, v in run_summary.items() if k != 'stages'}
+    entry['stages'] = {name: {'wall_seconds': s['wall_seconds'], 'requests': s['requests']}
+                       for name, s in run_summary.get('stages', {}).items()}
+    return [entry] + history[:size - 1]
@@ -0,0 +1,69 @@
+"""
+KRX trading calendar (KST dates).
+
+휴장일 = 주말 + 한국 공휴일(holidays.KR) + 근로자의 날(5/1) + 연말 휴장일(12/31).
+날짜별 판정은 캐시되므로 이전 거래일 탐색을 반복해도 비용이 거의 없습니다.
+
+    trading_calendar.previous_trading_day('2025-12-26')  # '2025-12-24' (12/25 성탄절)
+"""
+
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import holidays
+
+# 공휴일은 아니지만 KRX가 쉬는 날 (month, day) -> 사유
+KRX_CLOSURES = {
+    (5, 1): "근로자의 날",
+    (12, 31): "연말 휴장일",
+}
+
+
+@lru_cache(maxsize=None)
+def _kr_holidays(year):
+    return holidays.KR(years=year)
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+@lru_cache(maxsize=4096)
+def closed_reason(value):
+    """Why the market is closed on `value` ('Weekend', holiday name, ...), or None on a trading day."""
+    day = _as_date(value)
+    if day.weekday() >= 5: # 5=Sat, 6=Sun
+        return "Weekend"
+    holiday = _kr_holidays(day.year).get(day)
+    if holiday:
+        return f"Holiday ({holiday})"
+    if (day.month, day.day) in KRX_CLOSURES:
+        return f"KRX Closed ({KRX_CLOSURES[(day.month, day.day)]})"
+    return None
+
+
+def is_trading_day(value):
+    return closed_reason(_as_date(value)) is None
+
+
+def previous_trading_day(value):
+    """The last trading day strictly before `value`, as 'YYYY-MM-DD'."""
+    day = _as_date(value) - timedelta(days=1)
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day.strftime('%Y-%m-%d')
+
+
+def session_slot(hour):
+    """Run slot name ('1000' / '1300' / '1500') for a KST hour, matching the scraper's threshold tiers."""
+    if 9 <= hour < 12:
+        return '1000'
+    elif 12 <= hour < 14:
+        return '1300'
+    elif 14 <= hour < 24:
+        return '1500'
+    return f"{hour:02d}00"
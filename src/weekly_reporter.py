@@ -6,7 +6,12 @@ from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
 import pandas as pd
 from datetime import datetime, timedelta
-import glob
+
+try:
+    from src import rollups, excel_export
+except ImportError: # executed directly (python src/weekly_reporter.py)
+    import rollups
+    import excel_export
 
 def send_weekly_report():
     print("[Weekly Report] Checking if today is the reporting day...")
@@ -25,52 +30,23 @@ def send_weekly_report():
     
     print(f"[Weekly Report] Starting Report Generation for {now_kst.strftime('%Y-%m-%d')}...")
 
-    # 1. Find CSV files for this week (Mon-Fri)
-    # Calculate start of week (Monday)
-    start_of_week = now_kst - timedelta(days=now_kst.weekday())
-    start_str = start_of_week.strftime("%Y%m%d")
-    
-    # Pattern: trending_integrated_YYYYMMDD_HHMMSS.csv
-    # We will gather ALL files and filter by date.
-    all_files = glob.glob("trending_integrated_*.csv")
-    weekly_files = []
-    
-    for f in all_files:
-        # Extract date part
-        try:
-            # f = trending_integrated_20251212_042058.csv
-            date_part = f.split('_')[2] # 20251212
-            if date_part >= start_str:
-                weekly_files.append(f)
-        except:
-            continue
-            
-    if not weekly_files:
-        print("[Weekly Report] No files found for this week.")
-        return
-
-    print(f"[Weekly Report] Found {len(weekly_files)} files: {weekly_files}")
+    # 1. Load this week's rollup (scraper 실행마다 갱신되는 주간 집계)
+    week = rollups.week_key(now_kst.strftime('%Y-%m-%d'))
+    rollup = rollups.load('weekly', week)
 
-    # 2. Merge Data
-    merged_data = []
-    for f in weekly_files:
-        try:
-            df = pd.read_csv(f)
-            # Add 'Source File' or 'Date' column if needed
-            df['Reports_Date'] = f.split('_')[2] + "_" + f.split('_')[3].replace('.csv','')
-            merged_data.append(df)
-        except Exception as e:
-            print(f"Error reading {f}: {e}")
-            
-    if not merged_data:
-        print("[Weekly Report] Failed to merge data.")
+    if not rollup['stocks']:
+        print(f"[Weekly Report] No runs found for this week ({week}).")
         return
 
-    final_df = pd.concat(merged_data, ignore_index=True)
+    run_count = rollup['runs']
+    print(f"[Weekly Report] {week}: {run_count} runs, {len(rollup['stocks'])} stocks")
+
+    # 2. Per-stock summary (등장 횟수, 평균 게시글 수, 처음/마지막 포착, 연속 등장 일수)
+    final_df = rollups.to_frame(rollup)
     
     # Save as Excel
     output_filename = f"Weekly_Stock_Report_{now_kst.strftime('%Y%m%d')}.xlsx"
-    final_df.to_excel(output_filename, index=False)
+    excel_export.write_frame(final_df, output_filename) # streaming (write-only) workbook
     print(f"[Weekly Report] Created Excel: {output_filename}")
 
     # 3. Send Email
@@ -92,7 +68,7 @@ def send_weekly_report():
     StockBot Weekly Report
     
     Date: {now_kst.strftime('%Y-%m-%d')}
-    Files Merged: {len(weekly_files)}
+    Runs Merged: {run_count}
     
     See attachment.
     """